@@ -0,0 +1,335 @@
+"""
+    Bankin Bridge transaction aggregation
+    =====================================
+
+    This module defines the ``TransactionAggregates`` class, which maintains the rollups used by
+    dashboards (per-account balances over time, monthly inflow/outflow and per-category totals)
+    in a single pass over a stream of transactions.
+
+    Amounts are accumulated as fixed-point integers (the amount multiplied by ``scale``) in
+    dictionaries keyed by integer tuples, so that sums are exact. The contribution of every
+    transaction is also kept in compact arrays: when an updated or deleted transaction is received
+    (eg. from ``Transaction.list_updated``), its previous contribution is retracted before the new
+    one is added, so that the rollups never need to be recomputed from scratch. Aggregates built
+    in parallel (eg. one per bank account or per process) can be merged.
+
+    NumPy is an optional dependency: when it is installed, batches of transactions are grouped
+    and summed with vectorized operations.
+
+"""
+
+from array import array
+from datetime import date
+from itertools import islice
+
+from .columnar import EPOCH_ORDINAL, MISSING_ID, TransactionColumns
+
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+
+# Number of transactions decoded and aggregated at once when consuming a stream (vectorized
+# grouping only pays off on large enough batches).
+AGGREGATION_BATCH_SIZE = 5000
+
+
+class TransactionAggregates:
+    """ Incrementally maintained rollups of transactions. """
+
+    def __init__(self, scale=100):
+        """ Initializes empty aggregates.
+
+        :param scale: fixed-point scale of the amounts (eg. 100 to accumulate amounts in cents)
+        :type scale: int
+
+        """
+        self.scale = scale
+
+        # Rollups: net change per (account, day), inflow and outflow per (account, month) and
+        # total per (category, month). Days and months are counted from 1970-01-01.
+        self._daily = {}
+        self._inflow = {}
+        self._outflow = {}
+        self._categories = {}
+
+        # Contributions of the transactions (one row per transaction, indexed by ID).
+        self._index = {}
+        self._account_id = array('q')
+        self._category_id = array('q')
+        self._day = array('i')
+        self._amount = array('q')
+        self._months = {}
+
+    def __len__(self):
+        return len(self._index)
+
+    def update(self, transactions):
+        """ Adds the given transactions to the aggregates, replacing the previous versions of the
+            transactions that were already aggregated. Deleted transactions are retracted.
+
+        A page returned by a ``list*`` method (ie. a dictionary containing a ``resources`` key), a
+        paginator or a ``TransactionColumns`` object can be passed as well.
+
+        :param transactions: transactions (dictionaries or models) to aggregate
+        :type transactions: iterable or dictionary
+        :return: the aggregates
+        :rtype: bridge.aggregation.TransactionAggregates
+
+        """
+        if isinstance(transactions, TransactionColumns):
+            if transactions.scale != self.scale:
+                raise ValueError('the columns must use the scale of the aggregates')
+            self._apply(transactions)
+            return self
+        if isinstance(transactions, dict):
+            transactions = transactions.get('resources') or []
+        transactions = iter(transactions)
+        while True:
+            columns = TransactionColumns(scale=self.scale)
+            columns.extend(islice(transactions, AGGREGATION_BATCH_SIZE))
+            if not len(columns):
+                return self
+            self._apply(columns)
+
+    def merge(self, other):
+        """ Merges aggregates computed separately into the current ones.
+
+        The transactions of ``other`` take precedence over the versions of the same transactions
+        aggregated in the current object, if any.
+
+        :param other: aggregates to merge
+        :type other: bridge.aggregation.TransactionAggregates
+        :return: the aggregates
+        :rtype: bridge.aggregation.TransactionAggregates
+
+        """
+        if other.scale != self.scale:
+            raise ValueError('aggregates using different scales cannot be merged')
+        for id in other._index.keys() & self._index.keys():
+            self._retract(self._index.pop(id))
+        offset = len(self._amount)
+        self._account_id.extend(other._account_id)
+        self._category_id.extend(other._category_id)
+        self._day.extend(other._day)
+        self._amount.extend(other._amount)
+        self._index.update((id, row + offset) for id, row in other._index.items())
+        for rollup, other_rollup in (
+            (self._daily, other._daily), (self._inflow, other._inflow),
+            (self._outflow, other._outflow), (self._categories, other._categories),
+        ):
+            _add_all(rollup, other_rollup.items())
+        return self
+
+    def balances(self, account_id, opening_balance=0, closing_balance=None):
+        """ Returns the balance of a bank account at the end of each day with transactions.
+
+        :param account_id: ID of the considered bank account
+        :param opening_balance: balance of the account before its first aggregated transaction
+        :param closing_balance: current balance of the account (eg. the ``balance`` returned by
+            ``Account.get``), used to compute the opening balance if specified
+        :type account_id: int
+        :type opening_balance: int or float
+        :type closing_balance: int or float
+        :return: list of ("YYYY-MM-DD", balance) tuples, ordered by date
+        :rtype: list
+
+        """
+        changes = sorted(
+            (day, amount) for (account, day), amount in self._daily.items() if account == account_id
+        )
+        if closing_balance is not None:
+            balance = round(closing_balance * self.scale) - sum(a for _, a in changes)
+        else:
+            balance = round(opening_balance * self.scale)
+        balances = []
+        for day, amount in changes:
+            balance += amount
+            balances.append((_format_day(day), balance / self.scale))
+        return balances
+
+    def monthly_cash_flow(self, account_id=None):
+        """ Returns the inflow (sum of the credits), outflow (sum of the debits) and net change of
+            each month, for a bank account or for all of them.
+
+        :param account_id: ID of the considered bank account (defaults to all the accounts)
+        :type account_id: int
+        :return: dictionary associating "YYYY-MM" months with dictionaries containing ``inflow``,
+            ``outflow`` and ``net`` keys, ordered by month
+        :rtype: dictionary
+
+        """
+        flows = {}
+        for index, rollup in ((0, self._inflow), (1, self._outflow), ):
+            for (account, month), amount in rollup.items():
+                if account_id is None or account == account_id:
+                    flows.setdefault(month, [0, 0])[index] += amount
+        return {
+            _format_month(month): {
+                'inflow': inflow / self.scale,
+                'outflow': outflow / self.scale,
+                'net': (inflow + outflow) / self.scale,
+            }
+            for month, (inflow, outflow) in sorted(flows.items())
+        }
+
+    def category_totals(self, month=None):
+        """ Returns the total amount of the transactions of each category.
+
+        :param month: "YYYY-MM" month to limit the totals to (defaults to all the months)
+        :type month: str
+        :return: dictionary associating category IDs (``None`` for uncategorized transactions)
+            with total amounts
+        :rtype: dictionary
+
+        """
+        month = _parse_month(month) if month is not None else None
+        totals = {}
+        for (category, category_month), amount in self._categories.items():
+            if month is None or category_month == month:
+                totals[category] = totals.get(category, 0) + amount
+        return {
+            (category if category != MISSING_ID else None): amount / self.scale
+            for category, amount in totals.items() if amount
+        }
+
+    def _apply(self, columns):
+        """ Replaces the contributions of the transactions of the given columns. """
+        index = self._index
+        start = len(self._amount)
+        rows = dict(zip(columns.id, range(start, start + len(columns))))
+        if len(rows) == len(columns) and index.keys().isdisjoint(rows):
+            # Fast path: the batch only contains new and distinct transactions, whose
+            # contributions are appended to the arrays at once.
+            index.update(rows)
+            amounts = [0 if d else a for a, d in zip(columns.amount, columns.is_deleted)]
+            self._account_id.extend(columns.account_id)
+            self._category_id.extend(columns.category_id)
+            self._day.extend(columns.date)
+            self._amount.extend(amounts)
+            positions = [p for p, d in enumerate(columns.is_deleted) if not d]
+        else:
+            positions = self._replace(columns)
+        if not positions:
+            return
+
+        if np is not None:
+            self._accumulate_vectorized(columns, positions)
+        else:
+            for position in positions:
+                self._add(
+                    columns.account_id[position], columns.category_id[position],
+                    columns.date[position], columns.amount[position], 1,
+                )
+
+    def _replace(self, columns):
+        """ Updates the rows of the transactions of the given columns (retracting the previous
+            contributions) and returns the positions of the contributions to add.
+        """
+        index = self._index
+        latest = {}
+        for position, id in enumerate(columns.id):
+            row = index.get(id)
+            if row is None:
+                row = index[id] = len(self._amount)
+                self._account_id.append(MISSING_ID)
+                self._category_id.append(MISSING_ID)
+                self._day.append(0)
+                self._amount.append(0)
+            elif row not in latest:
+                # Retracts the contribution of a version received in a previous batch (the last
+                # version of a transaction wins within a batch).
+                self._retract(row)
+            latest[row] = position
+
+        positions = []
+        for row, position in latest.items():
+            self._account_id[row] = columns.account_id[position]
+            self._category_id[row] = columns.category_id[position]
+            self._day[row] = columns.date[position]
+            if columns.is_deleted[position]:
+                self._amount[row] = 0
+            else:
+                self._amount[row] = columns.amount[position]
+                positions.append(position)
+        return positions
+
+    def _accumulate_vectorized(self, columns, positions):
+        positions = np.array(positions, dtype=np.intp)
+        account_ids = np.frombuffer(columns.account_id, dtype=np.int64)[positions]
+        category_ids = np.frombuffer(columns.category_id, dtype=np.int64)[positions]
+        days = np.frombuffer(columns.date, dtype=np.int32)[positions].astype(np.int64)
+        amounts = np.frombuffer(columns.amount, dtype=np.int64)[positions]
+        months = days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+
+        _group_add(self._daily, account_ids, days, amounts)
+        credits = amounts > 0
+        _group_add(self._inflow, account_ids[credits], months[credits], amounts[credits])
+        debits = amounts < 0
+        _group_add(self._outflow, account_ids[debits], months[debits], amounts[debits])
+        _group_add(self._categories, category_ids, months, amounts)
+
+    def _retract(self, row):
+        """ Removes the contribution of the given row from the rollups. """
+        amount = self._amount[row]
+        if amount:
+            self._add(self._account_id[row], self._category_id[row], self._day[row], amount, -1)
+            self._amount[row] = 0
+
+    def _add(self, account_id, category_id, day, amount, sign):
+        month = self._months.get(day)
+        if month is None:
+            value = date.fromordinal(day + EPOCH_ORDINAL)
+            month = self._months[day] = (value.year - 1970) * 12 + value.month - 1
+        signed = sign * amount
+        _add_all(self._daily, (((account_id, day), signed), ))
+        _add_all(
+            self._inflow if amount > 0 else self._outflow, (((account_id, month), signed), ),
+        )
+        _add_all(self._categories, (((category_id, month), signed), ))
+
+
+def _group_add(rollup, keys, subkeys, amounts):
+    """ Adds the given amounts to the rollup, grouped by (key, subkey) pairs. """
+    if not len(amounts):
+        return
+    # Encodes the pairs as single integers, then sums the amounts of each run of sorted codes.
+    key_values, key_codes = np.unique(keys, return_inverse=True)
+    subkey_values, subkey_codes = np.unique(subkeys, return_inverse=True)
+    codes = key_codes.ravel() * len(subkey_values) + subkey_codes.ravel()
+    order = np.argsort(codes, kind='stable')
+    codes = codes[order]
+    starts = np.flatnonzero(np.concatenate(([True], codes[1:] != codes[:-1])))
+    sums = np.add.reduceat(amounts[order], starts)
+    codes = codes[starts]
+    _add_all(rollup, zip(
+        zip(
+            key_values[codes // len(subkey_values)].tolist(),
+            subkey_values[codes % len(subkey_values)].tolist(),
+        ),
+        sums.tolist(),
+    ))
+
+
+def _add_all(rollup, items):
+    """ Adds the given (key, amount) items to the rollup, dropping the keys summing to zero. """
+    for key, amount in items:
+        total = rollup.get(key, 0) + amount
+        if total:
+            rollup[key] = total
+        else:
+            rollup.pop(key, None)
+
+
+def _format_day(day):
+    return date.fromordinal(day + EPOCH_ORDINAL).isoformat()
+
+
+def _format_month(month):
+    return '{:04d}-{:02d}'.format(1970 + month // 12, month % 12 + 1)
+
+
+def _parse_month(value):
+    return (int(value[:4]) - 1970) * 12 + int(value[5:7]) - 1
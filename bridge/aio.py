@@ -0,0 +1,471 @@
+"""
+    Bankin Bridge asyncio client
+    ============================
+
+    This module defines the ``AsyncClient`` class allowing to interact with the Bankin Bridge API
+    endpoints and methods from an asyncio event loop. Every entity method returns a coroutine and
+    every ``iter*`` method returns an asynchronous iterator following the pagination cursors.
+
+    The default transport relies on aiohttp (https://docs.aiohttp.org/), which can be installed
+    using the ``aio`` extra (eg. ``pip install bankin-bridge[aio]``).
+
+"""
+
+import asyncio
+
+from .aggregation import TransactionAggregates
+from .client import Client
+from .columnar import TransactionColumns
+from .entities.account import Account
+from .entities.bank import Bank
+from .entities.category import Category
+from .entities.item import Item
+from .entities.stock import Stock
+from .entities.transaction import Transaction, _get_date_bounds
+from .entities.user import User
+from .models import load_models
+from .pagination import Paginator
+from .polling import RefreshPoller
+from .transport import DEFAULT_TIMEOUT, Response
+from .utils import join_url
+
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    aiohttp = None
+
+
+class AsyncClient(Client):
+    """ The Bankin Bridge API asyncio client class. """
+
+    def __init__(
+        self, client_id, client_secret, access_token=None, base_url=None, http_max_retries=None,
+        pool_size=100, timeout=DEFAULT_TIMEOUT, transport=None, retry=None, rate_limiter=None,
+        cache=None, models=False, json_decoder=None, instrumentation=None,
+    ):
+        """ Initializes the Bankin Bridge asyncio client.
+
+        :param client_id: application's client id
+        :param client_secret: application's client secret
+        :param base_url: base URL of the API endpont (eg. "https://sync.bankin.com/v2/")
+        :param http_max_retries: maximum number of retries each connection should attempt
+        :param pool_size: maximum number of simultaneous connections to the service
+        :param timeout: connect and read timeouts in seconds, as a single value or a tuple
+        :param transport: object used to send the HTTP requests (defaults to an aiohttp transport)
+        :param retry: policy used to retry throttled or failed responses (no retry by default)
+        :param rate_limiter: rate limiter applied to every request (can be shared among clients)
+        :param cache: cache used to store the responses of GET requests (disabled by default)
+        :param models: whether to return resources as compact models (see ``bridge.models``)
+            instead of dictionaries
+        :param json_decoder: JSON decoder used to deserialize response bodies (see
+            ``bridge.Client``)
+        :param instrumentation: object whose hooks are called before and after each API call and
+            which records metrics (see ``bridge.instrumentation``; disabled by default)
+        :type client_id: str
+        :type client_secret: str
+        :type base_url: str
+        :type http_max_retries: int
+        :type pool_size: int
+        :type timeout: float or tuple
+        :type transport: bridge.aio.AiohttpTransport
+        :type retry: bridge.retry.RetryPolicy
+        :type rate_limiter: bridge.retry.RateLimiter
+        :type cache: bridge.cache.ResponseCache
+        :type models: bool
+        :type json_decoder: str or callable
+        :type instrumentation: bridge.instrumentation.Instrumentation
+        :return: :class:`AsyncClient <AsyncClient>` object
+        :rtype: bridge.aio.AsyncClient
+
+        """
+        # The settings shared with the synchronous client are initialized by ``Client``, using an
+        # aiohttp transport by default.
+        super().__init__(
+            client_id, client_secret, access_token=access_token, base_url=base_url,
+            timeout=timeout,
+            transport=transport or AiohttpTransport(
+                pool_size=pool_size, max_retries=http_max_retries or 3, timeout=timeout,
+            ),
+            retry=retry, rate_limiter=rate_limiter, cache=cache, models=models,
+            json_decoder=json_decoder, instrumentation=instrumentation,
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        """ Closes the underlying transport and its connection pool. """
+        await self.transport.close()
+
+    ##################################
+    # PRIVATE METHODS AND PROPERTIES #
+    ##################################
+
+    def _build_entity(self, entity_class):
+        """ Instantiates the asynchronous variant of the given entity class for this client. """
+        return ASYNC_ENTITIES[entity_class](self)
+
+    async def _call(self, http_method, path, params=None, data=None):
+        """ Calls the API endpoint. """
+        if self.instrumentation is not None:
+            return await self.instrumentation.measure_async(
+                self._call_endpoint, http_method, path, params, data,
+            )
+        return await self._call_endpoint(http_method, path, params, data)
+
+    async def _call_endpoint(self, http_method, path, params=None, data=None, event=None):
+        """ Calls the API endpoint, recording the details of the call in the given event. """
+        response_data = await self._request(
+            http_method, path, params=params, data=data, event=event,
+        )
+        return load_models(http_method, path, response_data) if self.models else response_data
+
+    async def _request(self, http_method, path, params=None, data=None, event=None):
+        """ Sends a request to the API endpoint and returns the deserialized response body. """
+        # Prepares the headers and parameters that will be used to forge the request.
+        headers = dict(self._headers)
+        params = params or {}
+
+        # Serves the response from the cache if possible.
+        cache_key, cache_entry = self._lookup_cache(http_method, path, params, headers)
+        if cache_entry is not None and self.cache.is_fresh(cache_entry):
+            if event is not None:
+                event.from_cache = True
+            return self.cache.load(cache_entry)
+
+        params.update({'client_id': self.client_id, 'client_secret': self.client_secret, })
+        if self.auth is not None:
+            self.auth(_AuthenticatedRequest(headers))
+
+        # Calls the API endpoint!
+        response = await self._send(
+            http_method, join_url(self.api_endpoint, path), event=event,
+            headers=headers, params=params, json=data,
+        )
+
+        if cache_key is not None:
+            return self._handle_cacheable_response(
+                response, path, cache_key, cache_entry, event=event,
+            )
+        return self._handle_response(response, event=event)
+
+    async def _send(self, http_method, url, event=None, **kwargs):
+        """ Sends a request using the transport, applying rate limiting and retries.
+
+        Connection errors are retried by the transport itself: only throttled or failed responses
+        are retried here.
+
+        """
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                wait_time = self.rate_limiter.reserve()
+                if event is not None:
+                    event.wait_time += wait_time
+                await asyncio.sleep(wait_time)
+
+            response = await self.transport.send(http_method, url, **kwargs)
+            if (
+                self.retry is None or
+                not self.retry.should_retry(http_method, attempt, response=response)
+            ):
+                if event is not None:
+                    event.retries = attempt
+                    event.record_response(response)
+                return response
+
+            delay = self.retry.get_delay(attempt, response)
+            if response.status_code == 429 and self.rate_limiter is not None:
+                self.rate_limiter.pause(delay)
+            await asyncio.sleep(delay)
+            if event is not None:
+                event.wait_time += delay
+            attempt += 1
+
+
+# HTTP methods whose requests can be replayed after a connection error (the request may have
+# reached the service before the connection was lost).
+IDEMPOTENT_METHODS = frozenset(('GET', 'HEAD', 'DELETE', ))
+
+
+class AiohttpTransport:
+    """ Sends HTTP requests using a pooled aiohttp session. """
+
+    def __init__(self, pool_size=100, max_retries=3, timeout=DEFAULT_TIMEOUT):
+        """ Initializes the transport.
+
+        :param pool_size: maximum number of simultaneous connections to the service
+        :param max_retries: maximum number of retries each connection should attempt (only
+            idempotent requests are retried)
+        :param timeout: connect and read timeouts in seconds, as a single value or a tuple
+        :type pool_size: int
+        :type max_retries: int
+        :type timeout: float or tuple
+
+        """
+        if aiohttp is None:
+            raise ImportError(
+                'aiohttp is required to use the asyncio client; '
+                'install it using "pip install bankin-bridge[aio]"',
+            )
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self._session = None
+
+    async def send(self, method, url, headers=None, params=None, json=None):
+        """ Sends a request and returns the corresponding response. """
+        if self._session is None:
+            connect_timeout, read_timeout = (
+                self.timeout if isinstance(self.timeout, tuple) else (self.timeout, self.timeout)
+            )
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size),
+                timeout=aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout),
+            )
+
+        max_retries = self.max_retries if method.upper() in IDEMPOTENT_METHODS else 0
+        for attempt in range(max_retries + 1):
+            try:
+                async with self._session.request(
+                    method, url, headers=headers, params=params, json=json,
+                ) as response:
+                    return Response(response.status, await response.read(), response.headers)
+            except aiohttp.ClientConnectionError:
+                if attempt == max_retries:
+                    raise
+
+    async def close(self):
+        """ Closes the underlying session. """
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+class AsyncPaginator(Paginator):
+    """ Lazily and asynchronously iterates over the resources of a cursor-paginated endpoint. """
+
+    def __iter__(self):
+        raise TypeError('asynchronous paginators must be iterated using "async for"')
+
+    def stream(self):
+        raise TypeError('asynchronous paginators do not support streaming')
+
+    def map_parallel(self, function, processes=None, chunksize=1, max_pending=None):
+        raise TypeError('asynchronous paginators do not support map_parallel')
+
+    async def __aiter__(self):
+        count = 0
+        async for page in self.pages():
+            for resource in page.get('resources', []):
+                if self.max_items is not None and count >= self.max_items:
+                    return
+                yield resource
+                count += 1
+
+    async def pages(self):
+        """ Yields the successive pages (as patched response dictionaries) of the endpoint. """
+        pages = self._prefetched_pages() if self.prefetch else self._fetched_pages()
+        async for page in pages:
+            yield page
+
+    async def _fetched_pages(self):
+        params = self._first_page_params()
+        fetched = 0
+        while params is not None:
+            page = await self._fetch_page(params)
+            yield page
+            resources = page.get('resources')
+            fetched += len(resources or [])
+            params = self._next_page_params(page, params, fetched) if resources else None
+
+    async def _prefetched_pages(self):
+        # Pages are fetched by a background task and handed over through a bounded queue.
+        pages = asyncio.Queue(maxsize=self.prefetch)
+
+        async def _produce():
+            try:
+                async for page in self._fetched_pages():
+                    await pages.put((page, None))
+            except Exception as e:
+                await pages.put((None, e))
+            else:
+                await pages.put((None, None))
+
+        producer = asyncio.ensure_future(_produce())
+        try:
+            while True:
+                page, error = await pages.get()
+                if error is not None:
+                    raise error
+                elif page is None:
+                    return
+                yield page
+        finally:
+            producer.cancel()
+
+
+class AsyncApiMixin:
+    """ Turns an entity class into its asynchronous variant. """
+
+    def _iter_paginated(self, path, params=None, max_items=None, page_size=None, prefetch=0):
+        """ Returns an asynchronous paginator over the resources of a cursor-paginated endpoint. """
+        return AsyncPaginator(
+            self, path, params=params, max_items=max_items, page_size=page_size, prefetch=prefetch,
+        )
+
+    async def _patch_paginated_response_data(self, data):
+        """ Awaits the given response data and patches it to extract pagination values. """
+        return super()._patch_paginated_response_data(await data)
+
+
+class AsyncAccount(AsyncApiMixin, Account):
+    """ Wraps the account-related API methods in coroutines. """
+
+
+class AsyncBank(AsyncApiMixin, Bank):
+    """ Wraps the bank-related API methods in coroutines. """
+
+
+class AsyncCategory(AsyncApiMixin, Category):
+    """ Wraps the category-related API methods in coroutines. """
+
+
+class AsyncItem(AsyncApiMixin, Item):
+    """ Wraps the item-related API methods in coroutines. """
+
+    async def wait_for_refresh(
+        self, ids, timeout=None, on_update=None, min_interval=1, max_interval=30,
+    ):
+        """ Waits for the refresh of many items to complete (see
+            ``bridge.entities.item.Item.wait_for_refresh``).
+        """
+        poller = RefreshPoller(
+            ids, timeout=timeout, min_interval=min_interval, max_interval=max_interval,
+        )
+        delay = poller.get_delay()
+        while delay is not None:
+            await asyncio.sleep(delay)
+            # The items that are due at the same time are polled concurrently.
+            ids = poller.pop_due()
+            statuses = await asyncio.gather(*(self.get_refresh_status(id) for id in ids))
+            for id, status in zip(ids, statuses):
+                if on_update is not None and status != poller.statuses.get(id):
+                    on_update(id, status)
+                if poller.update(id, status):
+                    yield id, status
+            delay = poller.get_delay()
+
+
+class AsyncStock(AsyncApiMixin, Stock):
+    """ Wraps the stock-related API methods in coroutines. """
+
+
+class AsyncTransaction(AsyncApiMixin, Transaction):
+    """ Wraps the transaction-related API methods in coroutines. """
+
+    async def to_columns(
+        self, since=None, until=None, account_id=None, max_items=None, page_size=500, prefetch=0,
+        scale=100,
+    ):
+        """ Fetches the transactions of the current user into compact columnar buffers (see
+            ``bridge.entities.transaction.Transaction.to_columns``).
+        """
+        columns = TransactionColumns(scale=scale)
+        async for page in self._iter_transactions(
+            since, until, account_id, max_items, page_size, prefetch,
+        ).pages():
+            columns.extend(page.get('resources', []))
+        return columns
+
+    async def aggregate(
+        self, since=None, until=None, account_id=None, max_items=None, page_size=500, prefetch=0,
+        scale=100,
+    ):
+        """ Computes the balances, monthly cash flow and category totals of the transactions of
+            the current user (see ``bridge.entities.transaction.Transaction.aggregate``).
+        """
+        aggregates = TransactionAggregates(scale=scale)
+        async for page in self._iter_transactions(
+            since, until, account_id, max_items, page_size, prefetch,
+        ).pages():
+            aggregates.update(page)
+        return aggregates
+
+    async def iter_range(
+        self, since=None, until=None, account_id=None, max_items=None, page_size=None, prefetch=0,
+    ):
+        """ Lazily iterates over the transactions made within a date range (see
+            ``bridge.entities.transaction.Transaction.iter_range``).
+        """
+        paginator = self._iter_transactions(
+            since, until, account_id, max_items, page_size, prefetch,
+        )
+        lower_bound, upper_bound = _get_date_bounds(since, until)
+        resources = paginator.__aiter__()
+        try:
+            async for transaction in resources:
+                transaction_date = transaction.get('date')
+                if transaction_date is None:
+                    yield transaction
+                elif lower_bound is not None and transaction_date < lower_bound:
+                    return
+                elif upper_bound is None or transaction_date <= upper_bound:
+                    yield transaction
+        finally:
+            await resources.aclose()
+
+
+class AsyncUser(AsyncApiMixin, User):
+    """ Wraps the user-related API methods in coroutines. """
+
+    async def authenticate(self, email, password, set_access_token=False):
+        """ Authenticates a user (see ``bridge.entities.user.User.authenticate``). """
+        data = await self._client._call(
+            'POST', 'authenticate', params={'email': email, 'password': password, },
+        )
+        if set_access_token:
+            self._client.set_access_token(data['access_token'])
+        return data
+
+    async def logout(self):
+        """ Logouts the authenticated user (see ``bridge.entities.user.User.logout``). """
+        response = await self._client._call('POST', 'logout')
+        self._client.remove_auth()
+        return response
+
+    async def update_credentials(self, id, current_password, new_password):
+        """ Updates the authenticated user's credentials (see
+            ``bridge.entities.user.User.update_credentials``).
+        """
+        response = await self._client._call(
+            'PUT',
+            'users/{}/password'.format(id),
+            {'current_password': current_password, 'new_password': new_password, },
+        )
+        self._client.remove_auth()
+        return response
+
+
+ASYNC_ENTITIES = {
+    Account: AsyncAccount,
+    Bank: AsyncBank,
+    Category: AsyncCategory,
+    Item: AsyncItem,
+    Stock: AsyncStock,
+    Transaction: AsyncTransaction,
+    User: AsyncUser,
+}
+
+
+class _AuthenticatedRequest:
+    """ Request-like object allowing to apply authentication classes to plain headers. """
+
+    __slots__ = ('headers', )
+
+    def __init__(self, headers):
+        self.headers = headers
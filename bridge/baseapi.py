@@ -9,6 +9,8 @@
 from itertools import chain
 from urllib.parse import parse_qsl, urlparse
 
+from .pagination import Paginator
+
 
 class BaseApi:
     """ Simple class to buid path for entities. """
@@ -22,6 +24,12 @@ class BaseApi:
         """ Builds a path using the configured endpoint and path arguments. """
         return '/'.join(chain((self.endpoint, ), map(str, args)))
 
+    def _iter_paginated(self, path, params=None, max_items=None, page_size=None, prefetch=0):
+        """ Returns a paginator lazily yielding the resources of a cursor-paginated endpoint. """
+        return Paginator(
+            self, path, params=params, max_items=max_items, page_size=page_size, prefetch=prefetch,
+        )
+
     def _patch_paginated_response_data(self, data):
         """ Patches the given paginated data in order to extract paginated values from the next or
             previous URI.
@@ -0,0 +1,271 @@
+"""
+    Bankin Bridge response cache
+    ============================
+
+    This module defines the ``ResponseCache`` class allowing the client to cache the responses of
+    ``GET`` requests (eg. near-static reference data such as banks and categories) and the cache
+    backends it can rely on.
+
+    Cache keys are built from the HTTP method, the endpoint path and the query parameters, but
+    never from the client credentials. Responses of endpoints that depend on the authenticated
+    user are keyed using a hash of the access token.
+
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlencode
+
+from .utils import get_endpoint_template
+
+
+DEFAULT_TTLS = {
+    'banks': 24 * 3600,
+    'banks/{id}': 24 * 3600,
+    'categories': 24 * 3600,
+    'categories/{id}': 24 * 3600,
+}
+
+PUBLIC_ENDPOINTS = frozenset(('banks', 'banks/{id}', 'categories', 'categories/{id}', ))
+
+SECRET_PARAMS = frozenset(('client_id', 'client_secret', 'password', ))
+
+
+class ResponseCache:
+    """ Caches the responses of GET requests using per-endpoint TTLs. """
+
+    def __init__(self, backend=None, ttls=None, public_endpoints=PUBLIC_ENDPOINTS):
+        """ Initializes the response cache.
+
+        :param backend: backend used to store the cache entries (defaults to an in-memory LRU)
+        :param ttls: mapping of endpoint templates (eg. "banks/{id}") to TTLs in seconds; the
+            endpoints that are not listed are never cached (defaults to banks and categories)
+        :param public_endpoints: endpoint templates whose responses do not depend on the user
+        :type backend: bridge.cache.BaseCacheBackend
+        :type ttls: dict
+        :type public_endpoints: iterable
+
+        """
+        self.backend = backend if backend is not None else MemoryCacheBackend()
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.public_endpoints = frozenset(public_endpoints)
+
+    def get_key(self, http_method, path, params=None, auth=None):
+        """ Returns the cache key of the given request or ``None`` if it should not be cached. """
+        template = get_endpoint_template(path)
+        if http_method.upper() != 'GET' or not self.ttls.get(template):
+            return None
+        query = urlencode(sorted(
+            (k, v) for k, v in (params or {}).items() if k not in SECRET_PARAMS
+        ))
+        identity = '' if template in self.public_endpoints else getattr(auth, 'identity', '')
+        return '{} {}?{}#{}'.format(http_method.upper(), path.strip('/'), query, identity)
+
+    def get(self, key):
+        """ Returns the cache entry associated with the given key, fresh or not, or ``None``. """
+        return self.backend.get(key)
+
+    def set(self, key, path, data, etag=None):
+        """ Caches the given response data. """
+        self.backend.set(key, {
+            'data': json.dumps(data),
+            'etag': etag,
+            'expires_at': time.time() + self.ttls.get(get_endpoint_template(path), 0),
+        })
+
+    def refresh(self, key, path, entry):
+        """ Extends the lifetime of an entry that was successfully revalidated. """
+        entry = dict(entry, expires_at=time.time() + self.ttls.get(get_endpoint_template(path), 0))
+        self.backend.set(key, entry)
+
+    def is_fresh(self, entry):
+        """ Returns whether the given cache entry can be used without revalidation. """
+        return entry['expires_at'] > time.time()
+
+    def load(self, entry):
+        """ Returns a new copy of the response data of the given cache entry. """
+        return json.loads(entry['data'])
+
+    def clear(self):
+        """ Removes all the cache entries. """
+        self.backend.clear()
+
+
+class BaseCacheBackend:
+    """ Base class of the cache backends; backends store JSON-serializable entries. """
+
+    def get(self, key):
+        """ Returns the entry associated with the given key or ``None``. """
+        raise NotImplementedError
+
+    def set(self, key, entry):
+        """ Associates the given entry with the given key. """
+        raise NotImplementedError
+
+    def delete(self, key):
+        """ Removes the entry associated with the given key, if any. """
+        raise NotImplementedError
+
+    def clear(self):
+        """ Removes all the entries. """
+        raise NotImplementedError
+
+
+class MemoryCacheBackend(BaseCacheBackend):
+    """ Stores the cache entries in memory, evicting the least recently used ones. """
+
+    def __init__(self, max_size=1024):
+        """ Initializes the backend.
+
+        :param max_size: maximum number of entries to keep
+        :type max_size: int
+
+        """
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteCacheBackend(BaseCacheBackend):
+    """ Stores the cache entries in a SQLite database, evicting the least recently used ones. """
+
+    def __init__(self, path, max_size=10000):
+        """ Initializes the backend.
+
+        :param path: path of the SQLite database (created if it does not exist)
+        :param max_size: maximum number of entries to keep
+        :type path: str
+        :type max_size: int
+
+        """
+        self.path = path
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS bridge_cache ('
+            'key TEXT PRIMARY KEY, entry TEXT NOT NULL, accessed_at REAL NOT NULL)',
+        )
+        self._connection.execute(
+            'CREATE INDEX IF NOT EXISTS bridge_cache_accessed_at ON bridge_cache (accessed_at)',
+        )
+
+    def get(self, key):
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT entry FROM bridge_cache WHERE key = ?', (key, ),
+            ).fetchone()
+            if row is None:
+                return None
+            self._connection.execute(
+                'UPDATE bridge_cache SET accessed_at = ? WHERE key = ?', (time.time(), key),
+            )
+        return json.loads(row[0])
+
+    def set(self, key, entry):
+        with self._lock:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO bridge_cache (key, entry, accessed_at) VALUES (?, ?, ?)',
+                (key, json.dumps(entry), time.time()),
+            )
+            self._connection.execute(
+                'DELETE FROM bridge_cache WHERE key IN ('
+                'SELECT key FROM bridge_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)',
+                (self.max_size, ),
+            )
+
+    def delete(self, key):
+        with self._lock:
+            self._connection.execute('DELETE FROM bridge_cache WHERE key = ?', (key, ))
+
+    def clear(self):
+        with self._lock:
+            self._connection.execute('DELETE FROM bridge_cache')
+
+    def close(self):
+        """ Closes the underlying database connection. """
+        self._connection.close()
+
+
+class KeyValueCacheBackend(BaseCacheBackend):
+    """ Stores the cache entries in a shared key-value store (eg. a memcached or Redis client).
+
+    The store can be any object providing ``get(key)``, ``set(key, value)`` and ``delete(key)``
+    methods (values are JSON strings); eviction is left to the store itself.
+
+    ``clear`` removes every key starting with the prefix when the store provides a
+    ``scan_iter(match)`` method (eg. a Redis client). Otherwise, it only removes the entries
+    written through the backend itself, whose keys are tracked in memory.
+
+    """
+
+    def __init__(self, store, prefix='bridge:'):
+        """ Initializes the backend.
+
+        :param store: key-value store client
+        :param prefix: prefix of the keys written to the store
+        :type prefix: str
+
+        """
+        self.store = store
+        self.prefix = prefix
+        self._scan_iter = getattr(store, 'scan_iter', None)
+        self._keys = set()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        value = self.store.get(self._get_store_key(key))
+        if value is None:
+            return None
+        return json.loads(value.decode('utf-8') if isinstance(value, bytes) else value)
+
+    def set(self, key, entry):
+        store_key = self._get_store_key(key)
+        self.store.set(store_key, json.dumps(entry))
+        if self._scan_iter is None:
+            with self._lock:
+                self._keys.add(store_key)
+
+    def delete(self, key):
+        store_key = self._get_store_key(key)
+        self.store.delete(store_key)
+        with self._lock:
+            self._keys.discard(store_key)
+
+    def clear(self):
+        if self._scan_iter is not None:
+            store_keys = list(self._scan_iter(match=self.prefix + '*'))
+        else:
+            with self._lock:
+                store_keys, self._keys = self._keys, set()
+        for store_key in store_keys:
+            self.store.delete(store_key)
+
+    def _get_store_key(self, key):
+        return self.prefix + hashlib.sha256(key.encode('utf-8')).hexdigest()
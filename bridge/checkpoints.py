@@ -0,0 +1,132 @@
+"""
+    Bankin Bridge checkpoint stores
+    ===============================
+
+    This module defines the stores allowing to persist the state of incremental synchronizations
+    (see ``bridge.sync.IncrementalSync``). A checkpoint is a dictionary associated with a string
+    key; it contains the ``since`` watermark of the last completed synchronization and the
+    ``after`` cursor of the synchronization in progress, if any.
+
+"""
+
+import json
+import sqlite3
+import threading
+
+from .utils import write_atomically
+
+
+class BaseCheckpointStore:
+    """ Base class of the checkpoint stores. """
+
+    def get(self, key):
+        """ Returns the checkpoint associated with the given key or ``None``. """
+        raise NotImplementedError
+
+    def set(self, key, checkpoint):
+        """ Associates the given checkpoint with the given key. """
+        raise NotImplementedError
+
+    def delete(self, key):
+        """ Removes the checkpoint associated with the given key, if any. """
+        raise NotImplementedError
+
+
+class MemoryCheckpointStore(BaseCheckpointStore):
+    """ Stores the checkpoints in memory. """
+
+    def __init__(self):
+        self._checkpoints = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            checkpoint = self._checkpoints.get(key)
+            return dict(checkpoint) if checkpoint is not None else None
+
+    def set(self, key, checkpoint):
+        with self._lock:
+            self._checkpoints[key] = dict(checkpoint)
+
+    def delete(self, key):
+        with self._lock:
+            self._checkpoints.pop(key, None)
+
+
+class JSONFileCheckpointStore(BaseCheckpointStore):
+    """ Stores the checkpoints in a JSON file, which is atomically rewritten on every update. """
+
+    def __init__(self, path):
+        """ Initializes the store.
+
+        :param path: path of the JSON file (created if it does not exist)
+        :type path: str
+
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            with open(path, encoding='utf-8') as f:
+                self._checkpoints = json.load(f)
+        except FileNotFoundError:
+            self._checkpoints = {}
+
+    def get(self, key):
+        with self._lock:
+            checkpoint = self._checkpoints.get(key)
+            return dict(checkpoint) if checkpoint is not None else None
+
+    def set(self, key, checkpoint):
+        with self._lock:
+            self._checkpoints[key] = dict(checkpoint)
+            self._dump()
+
+    def delete(self, key):
+        with self._lock:
+            if self._checkpoints.pop(key, None) is not None:
+                self._dump()
+
+    def _dump(self):
+        """ Atomically rewrites the file with the current checkpoints. """
+        write_atomically(self.path, json.dumps(self._checkpoints).encode('utf-8'))
+
+
+class SQLiteCheckpointStore(BaseCheckpointStore):
+    """ Stores the checkpoints in a SQLite database. """
+
+    def __init__(self, path):
+        """ Initializes the store.
+
+        :param path: path of the SQLite database (created if it does not exist)
+        :type path: str
+
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS bridge_checkpoints ('
+            'key TEXT PRIMARY KEY, checkpoint TEXT NOT NULL)',
+        )
+
+    def get(self, key):
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT checkpoint FROM bridge_checkpoints WHERE key = ?', (key, ),
+            ).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def set(self, key, checkpoint):
+        with self._lock:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO bridge_checkpoints (key, checkpoint) VALUES (?, ?)',
+                (key, json.dumps(checkpoint)),
+            )
+
+    def delete(self, key):
+        with self._lock:
+            self._connection.execute('DELETE FROM bridge_checkpoints WHERE key = ?', (key, ))
+
+    def close(self):
+        """ Closes the underlying database connection. """
+        self._connection.close()
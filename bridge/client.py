@@ -8,13 +8,21 @@
 
 """
 
-from urllib.parse import urljoin
+import copy
+import hashlib
+import time
 
 import requests
-from requests.adapters import HTTPAdapter
-from requests.exceptions import HTTPError
+from requests.exceptions import HTTPError, RequestException
 
 from .exceptions import ProtocolError, TransportError
+from .models import load_models
+from .serialization import StreamingPage, get_json_loads
+from .transport import DEFAULT_TIMEOUT, RequestsTransport
+from .utils import join_url
+
+
+STREAM_CHUNK_SIZE = 16 * 1024
 
 
 class Client:
@@ -22,17 +30,53 @@ class Client:
 
     def __init__(
         self, client_id, client_secret, access_token=None, base_url=None, http_max_retries=None,
+        pool_size=None, pool_block=False, timeout=DEFAULT_TIMEOUT, transport=None, retry=None,
+        rate_limiter=None, cache=None, models=False, json_decoder=None, single_flight=None,
+        instrumentation=None,
     ):
         """ Initializes the Bankin Bridge client.
 
+        A client (and its views returned by ``as_user``) can be shared between threads: requests
+        are sent through a single thread-safe connection pool whose size should be at least the
+        number of threads using the client.
+
         :param client_id: application's client id
         :param client_secret: application's client secret
         :param base_url: base URL of the API endpont (eg. "https://sync.bankin.com/v2/")
         :param http_max_retries: maximum number of retries each connection should attempt
+        :param pool_size: maximum number of connections to keep alive in the pool (default: 10)
+        :param pool_block: whether to wait for a free connection when the pool is exhausted instead
+            of opening a new connection that will be discarded after use
+        :param timeout: connect and read timeouts in seconds, as a single value or a tuple
+        :param transport: object used to send the HTTP requests (defaults to a transport relying on
+            a pooled ``requests.Session``)
+        :param retry: policy used to retry throttled or failed requests (no retry by default)
+        :param rate_limiter: rate limiter applied to every request (can be shared among clients)
+        :param cache: cache used to store the responses of GET requests (disabled by default)
+        :param models: whether to return resources as compact models (see ``bridge.models``)
+            instead of dictionaries
+        :param json_decoder: JSON decoder used to deserialize response bodies: ``"auto"`` (orjson
+            when it is installed, the standard library otherwise), ``"orjson"``, ``"json"`` or a
+            callable accepting bytes (defaults to ``response.json()``)
+        :param single_flight: object used to coalesce identical concurrent GET requests (see
+            ``bridge.coalescing``; disabled by default)
+        :param instrumentation: object whose hooks are called before and after each API call and
+            which records metrics (see ``bridge.instrumentation``; disabled by default)
         :type client_id: str
         :type client_secret: str
         :type base_url: str
         :type http_max_retries: int
+        :type pool_size: int
+        :type pool_block: bool
+        :type timeout: float or tuple
+        :type transport: bridge.transport.RequestsTransport
+        :type retry: bridge.retry.RetryPolicy
+        :type rate_limiter: bridge.retry.RateLimiter
+        :type cache: bridge.cache.ResponseCache
+        :type models: bool
+        :type json_decoder: str or callable
+        :type single_flight: bridge.coalescing.SingleFlight
+        :type instrumentation: bridge.instrumentation.Instrumentation
         :return: :class:`Client <Client>` object
         :rtype: bridge.client.Client
 
@@ -42,8 +86,22 @@ class Client:
         self.client_secret = client_secret
         self.api_endpoint = base_url or 'https://sync.bankin.com/v2/'
         self.api_version = '2018-06-15'
-        self.session = requests.Session()
-        self.session.mount(self.api_endpoint, HTTPAdapter(max_retries=http_max_retries or 3))
+        self._headers = {'Bankin-Version': self.api_version, }
+        self.timeout = timeout
+        self.transport = transport or RequestsTransport.from_settings(
+            self.api_endpoint,
+            max_retries=http_max_retries or 3,
+            pool_size=pool_size,
+            pool_block=pool_block,
+        )
+        self.session = getattr(self.transport, 'session', None)
+        self.retry = retry
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self.models = models
+        self.json_loads = get_json_loads(json_decoder)
+        self.single_flight = single_flight
+        self.instrumentation = instrumentation
 
         # Initializes auth-related classes.
         self.auth = None
@@ -67,6 +125,31 @@ class Client:
         """ Destroys any configured authentication abstraction. """
         self.auth = None
 
+    def as_user(self, access_token):
+        """ Returns a lightweight view of the client authenticated with a specific access token.
+
+        The returned client shares the settings, the HTTP session and the connection pool of the
+        current client but holds its own authentication: setting or removing the access token of
+        one of them never affects the other. This allows a single client to safely serve many
+        users concurrently (eg. from a thread pool).
+
+        :param access_token: access token of the considered user
+        :type access_token: str
+        :return: :class:`Client <Client>` object
+        :rtype: bridge.client.Client
+
+        """
+        client = copy.copy(self)
+        client._account = None
+        client._bank = None
+        client._category = None
+        client._item = None
+        client._stock = None
+        client._transaction = None
+        client._user = None
+        client.set_access_token(access_token)
+        return client
+
     ##########################
     # BANKIN BRIDGE ENTITIES #
     ##########################
@@ -81,7 +164,7 @@ class Client:
         """
         if self._account is None:
             from .entities.account import Account
-            self._account = Account(self)
+            self._account = self._build_entity(Account)
         return self._account
 
     @property
@@ -94,7 +177,7 @@ class Client:
         """
         if self._bank is None:
             from .entities.bank import Bank
-            self._bank = Bank(self)
+            self._bank = self._build_entity(Bank)
         return self._bank
 
     @property
@@ -107,7 +190,7 @@ class Client:
         """
         if self._category is None:
             from .entities.category import Category
-            self._category = Category(self)
+            self._category = self._build_entity(Category)
         return self._category
 
     @property
@@ -120,7 +203,7 @@ class Client:
         """
         if self._item is None:
             from .entities.item import Item
-            self._item = Item(self)
+            self._item = self._build_entity(Item)
         return self._item
 
     @property
@@ -133,7 +216,7 @@ class Client:
         """
         if self._stock is None:
             from .entities.stock import Stock
-            self._stock = Stock(self)
+            self._stock = self._build_entity(Stock)
         return self._stock
 
     @property
@@ -146,7 +229,7 @@ class Client:
         """
         if self._transaction is None:
             from .entities.transaction import Transaction
-            self._transaction = Transaction(self)
+            self._transaction = self._build_entity(Transaction)
         return self._transaction
 
     @property
@@ -159,28 +242,177 @@ class Client:
         """
         if self._user is None:
             from .entities.user import User
-            self._user = User(self)
+            self._user = self._build_entity(User)
         return self._user
 
     ##################################
     # PRIVATE METHODS AND PROPERTIES #
     ##################################
 
+    def _build_entity(self, entity_class):
+        """ Instantiates the given entity class for this client. """
+        return entity_class(self)
+
     def _call(self, http_method, path, params=None, data=None):
         """ Calls the API endpoint. """
-        # Prepares the headers and parameters that will be used to forge the request.
-        headers = {'Bankin-Version': self.api_version, }
+        if self.instrumentation is not None:
+            return self.instrumentation.measure(
+                self._call_endpoint, http_method, path, params, data,
+            )
+        return self._call_endpoint(http_method, path, params, data)
+
+    def _call_endpoint(self, http_method, path, params=None, data=None, event=None):
+        """ Calls the API endpoint, recording the details of the call in the given event. """
+        flight_key = (
+            self.single_flight.get_key(http_method, path, params, self.auth)
+            if self.single_flight is not None else None
+        )
+        if flight_key is not None:
+            response_data = self.single_flight.call(
+                flight_key, self._request, http_method, path, params=params, data=data, event=event,
+            )
+        else:
+            response_data = self._request(
+                http_method, path, params=params, data=data, event=event,
+            )
+        return load_models(http_method, path, response_data) if self.models else response_data
+
+    def _call_streaming(self, path, params=None):
+        """ Calls a paginated API endpoint and returns a ``StreamingPage`` whose resources are
+            parsed while the response body is being received.
+        """
+        params = dict(params or {}, client_id=self.client_id, client_secret=self.client_secret)
+
+        # Calls the API endpoint!
+        response = self._send(
+            'GET', join_url(self.api_endpoint, path),
+            headers=self._headers, params=params, json=None, auth=self.auth, timeout=self.timeout,
+            stream=True,
+        )
+
+        # Reads the whole body of unsuccessful responses in order to raise the appropriate error.
+        if response.status_code > 299:
+            self._handle_response(response)
+        return StreamingPage(response.iter_content(chunk_size=STREAM_CHUNK_SIZE))
+
+    def _call_raw(self, path, params=None):
+        """ Calls an API endpoint and returns the raw (undecoded) body of the response. """
+        params = dict(params or {}, client_id=self.client_id, client_secret=self.client_secret)
+
+        # Calls the API endpoint!
+        response = self._send(
+            'GET', join_url(self.api_endpoint, path),
+            headers=self._headers, params=params, json=None, auth=self.auth, timeout=self.timeout,
+        )
+
+        if response.status_code > 299:
+            self._handle_response(response)
+        return response.content
+
+    def _request(self, http_method, path, params=None, data=None, event=None):
+        """ Sends a request to the API endpoint and returns the deserialized response body. """
+        # Prepares the headers and parameters that will be used to forge the request (the constant
+        # headers are only copied when cache revalidation headers may be added to them).
+        headers = self._headers if self.cache is None else dict(self._headers)
         params = params or {}
+
+        # Serves the response from the cache if possible.
+        cache_key, cache_entry = self._lookup_cache(http_method, path, params, headers)
+        if cache_entry is not None and self.cache.is_fresh(cache_entry):
+            if event is not None:
+                event.from_cache = True
+            return self.cache.load(cache_entry)
+
         params.update({'client_id': self.client_id, 'client_secret': self.client_secret, })
 
         # Calls the API endpoint!
-        request = getattr(self.session, http_method.lower())
+        response = self._send(
+            http_method, join_url(self.api_endpoint, path), event=event,
+            headers=headers, params=params, json=data, auth=self.auth, timeout=self.timeout,
+        )
+
+        if cache_key is not None:
+            return self._handle_cacheable_response(
+                response, path, cache_key, cache_entry, event=event,
+            )
+        return self._handle_response(response, event=event)
+
+    def _lookup_cache(self, http_method, path, params, headers):
+        """ Returns the cache key and the cache entry (if any) of a request. The headers allowing
+            to revalidate a stale cache entry are added to the given headers.
+        """
+        if self.cache is None:
+            return None, None
+        cache_key = self.cache.get_key(http_method, path, params, self.auth)
+        cache_entry = self.cache.get(cache_key) if cache_key is not None else None
+        if cache_entry is not None and cache_entry.get('etag'):
+            headers['If-None-Match'] = cache_entry['etag']
+        return cache_key, cache_entry
+
+    def _handle_cacheable_response(self, response, path, cache_key, cache_entry, event=None):
+        """ Returns the deserialized body of a cacheable response and updates the cache. """
+        if response.status_code == 304 and cache_entry is not None:
+            self.cache.refresh(cache_key, path, cache_entry)
+            if event is not None:
+                event.from_cache = True
+            return self.cache.load(cache_entry)
+
+        response_data = self._handle_response(response, event=event)
+        if response.status_code == 200:
+            self.cache.set(cache_key, path, response_data, etag=response.headers.get('ETag'))
+        return response_data
 
+    def _send(self, http_method, url, event=None, **kwargs):
+        """ Sends a request using the transport, applying rate limiting and retries. """
+        # Authentications providing renewable access tokens (see ``bridge.tokens``) are resolved
+        # before each attempt and the request is sent again once if the token was rejected.
+        managed_auth = kwargs.get('auth') if hasattr(kwargs.get('auth'), 'resolve') else None
+        renewed = False
+        attempt = 0
+        while True:
+            if managed_auth is not None:
+                kwargs['auth'] = managed_auth.resolve()
+            if self.rate_limiter is not None:
+                if event is not None:
+                    started_at = time.perf_counter()
+                    self.rate_limiter.acquire()
+                    event.wait_time += time.perf_counter() - started_at
+                else:
+                    self.rate_limiter.acquire()
+
+            try:
+                response = self.transport.send(http_method, url, **kwargs)
+            except RequestException as e:
+                if self.retry is None or not self.retry.should_retry(http_method, attempt, error=e):
+                    if event is not None:
+                        event.retries = attempt
+                    raise
+                delay = self.retry.get_delay(attempt)
+            else:
+                if response.status_code == 401 and managed_auth is not None and not renewed:
+                    managed_auth.renew(kwargs['auth'])
+                    renewed = True
+                    continue
+                if (
+                    self.retry is None or
+                    not self.retry.should_retry(http_method, attempt, response=response)
+                ):
+                    if event is not None:
+                        event.retries = attempt
+                        event.record_response(response)
+                    return response
+                delay = self.retry.get_delay(attempt, response)
+                if response.status_code == 429 and self.rate_limiter is not None:
+                    self.rate_limiter.pause(delay)
+
+            self.retry.sleep(delay)
+            if event is not None:
+                event.wait_time += delay
+            attempt += 1
+
+    def _handle_response(self, response, event=None):
+        """ Ensures the given response is successful and returns its deserialized body. """
         try:
-            response = request(
-                urljoin(self.api_endpoint, path).strip('/'),
-                headers=headers, params=params, json=data, auth=self.auth,
-            )
             response.raise_for_status()
         except HTTPError:
             if response.status_code != 400:
@@ -193,7 +425,12 @@ class Client:
 
         # Ensures the response body can be deserialized to JSON.
         try:
-            response_data = response.json() if response.content else {}
+            if event is not None:
+                started_at = time.perf_counter()
+                response_data = self._decode(response) if response.content else {}
+                event.decode_time = time.perf_counter() - started_at
+            else:
+                response_data = self._decode(response) if response.content else {}
         except ValueError as e:
             raise ProtocolError(
                 'Unable to deserialize response body: {}'.format(e), response=response,
@@ -209,6 +446,12 @@ class Client:
 
         return response_data
 
+    def _decode(self, response):
+        """ Deserializes the JSON body of the given response. """
+        if self.json_loads is None:
+            return response.json()
+        return self.json_loads(response.content)
+
 
 class BankinBridgeOAuth(requests.auth.AuthBase):
     """ Authentication class for authentication with Bankin Bridge OAuth2. """
@@ -216,6 +459,11 @@ class BankinBridgeOAuth(requests.auth.AuthBase):
     def __init__(self, access_token):
         self._access_token = access_token
 
+    @property
+    def identity(self):
+        """ Returns a non-reversible identifier of the access token (eg. to build cache keys). """
+        return hashlib.sha256(self._access_token.encode('utf-8')).hexdigest()[:32]
+
     def __call__(self, r):
         """ Authorizes with the considered access token. """
         r.headers['Authorization'] = 'Bearer ' + self._access_token
@@ -0,0 +1,101 @@
+"""
+    Bankin Bridge request coalescing
+    ================================
+
+    This module defines the ``SingleFlight`` class allowing a client shared between threads to
+    coalesce identical concurrent ``GET`` requests: the first request is sent to the service while
+    the identical requests issued before it completes wait for its result instead of performing
+    their own round-trips.
+
+"""
+
+import copy
+import threading
+from urllib.parse import urlencode
+
+from .cache import SECRET_PARAMS
+
+
+class SingleFlight:
+    """ Coalesces identical concurrent GET requests into a single in-flight request.
+
+    Requests are identical when their HTTP method, path, query parameters and authenticated user
+    are the same. The ``hits`` counter is the number of requests that were served by an in-flight
+    request (ie. the number of round-trips saved) and the ``misses`` counter is the number of
+    requests that were actually sent.
+
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def get_key(self, http_method, path, params=None, auth=None):
+        """ Returns the key identifying the given request or ``None`` if it cannot be coalesced. """
+        if http_method.upper() != 'GET':
+            return None
+        query = urlencode(sorted(
+            (k, v) for k, v in (params or {}).items() if k not in SECRET_PARAMS
+        ))
+        return '{} {}?{}#{}'.format(
+            http_method.upper(), path.strip('/'), query, getattr(auth, 'identity', ''),
+        )
+
+    def call(self, key, function, *args, **kwargs):
+        """ Calls the given function unless a call associated with the same key is in flight, in
+            which case its result (or exception) is shared.
+
+        The result is kept as a snapshot that is never returned as is: when it is shared, every
+        caller (including the one that performed the call) receives its own copy of it, so that
+        the returned data can be safely modified by each of them.
+
+        """
+        with self._lock:
+            flight = self._calls.get(key)
+            if flight is None:
+                flight = self._calls[key] = _Flight()
+                self.misses += 1
+                leader = True
+            else:
+                self.hits += 1
+                flight.waiters += 1
+                leader = False
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return copy.deepcopy(flight.result)
+
+        try:
+            flight.result = function(*args, **kwargs)
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            # No caller can join the flight once it is removed, so the number of waiters is final.
+            with self._lock:
+                del self._calls[key]
+            shared = flight.waiters > 0
+            flight.done.set()
+        return copy.deepcopy(flight.result) if shared else flight.result
+
+    def reset_counters(self):
+        """ Resets the hit and miss counters. """
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+
+class _Flight:
+    """ State of an in-flight call. """
+
+    __slots__ = ('done', 'result', 'error', 'waiters', )
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
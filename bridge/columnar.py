@@ -0,0 +1,192 @@
+"""
+    Bankin Bridge columnar export
+    =============================
+
+    This module defines the ``TransactionColumns`` class allowing to accumulate transactions into
+    compact, growable columnar buffers (``array.array`` objects) as pages are fetched. Columns can
+    then be handed over to NumPy, pandas or Arrow without copying the buffers (where possible) and
+    without materializing per-row objects.
+
+    NumPy, pandas and pyarrow are optional dependencies that are only imported when the
+    corresponding conversion method is used.
+
+"""
+
+from array import array
+from datetime import date
+
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+MISSING_ID = -1
+
+
+class StringDictionary:
+    """ Interns strings: each distinct string is stored once and referenced by an integer code. """
+
+    __slots__ = ('codes', 'values', '_index', )
+
+    def __init__(self):
+        self.codes = array('i')
+        self.values = []
+        self._index = {}
+
+    def __len__(self):
+        return len(self.codes)
+
+    def append(self, value):
+        """ Appends a string (or ``None``, encoded as -1) to the column. """
+        if value is None:
+            self.codes.append(-1)
+            return
+        code = self._index.get(value)
+        if code is None:
+            code = self._index[value] = len(self.values)
+            self.values.append(value)
+        self.codes.append(code)
+
+    def decode(self):
+        """ Returns the list of the strings of the column. """
+        values = self.values
+        return [values[c] if c >= 0 else None for c in self.codes]
+
+
+class TransactionColumns:
+    """ Columnar buffers of transactions.
+
+    The following columns are maintained:
+
+    * ``id``, ``account_id`` and ``category_id``: signed 64-bit integers (-1 when missing)
+    * ``amount``: fixed-point signed 64-bit integers (the amount multiplied by ``scale``)
+    * ``date``: signed 32-bit integers (number of days since 1970-01-01, ie. ``datetime64[D]``)
+    * ``is_deleted``: signed 8-bit integers (0 or 1)
+    * ``description`` and ``currency_code``: interned strings (see ``StringDictionary``)
+
+    """
+
+    string_columns = ('description', 'currency_code', )
+
+    def __init__(self, scale=100):
+        """ Initializes empty columns.
+
+        :param scale: fixed-point scale of the amounts (eg. 100 to store amounts in cents)
+        :type scale: int
+
+        """
+        self.scale = scale
+        self.id = array('q')
+        self.account_id = array('q')
+        self.category_id = array('q')
+        self.amount = array('q')
+        self.date = array('i')
+        self.is_deleted = array('b')
+        self.description = StringDictionary()
+        self.currency_code = StringDictionary()
+        self._dates = {}
+
+    def __len__(self):
+        return len(self.id)
+
+    def extend(self, transactions):
+        """ Appends the given transactions (dictionaries or models) to the columns. """
+        # Binds the methods to local variables in order to keep the loop as tight as possible.
+        append_id = self.id.append
+        append_account_id = self.account_id.append
+        append_category_id = self.category_id.append
+        append_amount = self.amount.append
+        append_date = self.date.append
+        append_is_deleted = self.is_deleted.append
+        append_description = self.description.append
+        append_currency_code = self.currency_code.append
+        get_days = self._get_days
+        scale = self.scale
+
+        for transaction in transactions:
+            get = transaction.get
+            append_id(get('id'))
+            append_account_id(_get_reference_id(get('account')))
+            append_category_id(_get_reference_id(get('category')))
+            amount = get('amount')
+            append_amount(round(amount * scale) if amount is not None else 0)
+            append_date(get_days(get('date')))
+            append_is_deleted(1 if get('is_deleted') else 0)
+            append_description(get('description'))
+            append_currency_code(get('currency_code'))
+
+    def to_numpy(self):
+        """ Returns a dictionary of NumPy arrays; numeric columns share the underlying buffers.
+
+        Amounts are returned as fixed-point integers (see ``scale``) and strings as object arrays.
+        As the buffers are shared, the columns cannot be extended while the arrays are alive.
+
+        """
+        import numpy as np
+
+        columns = {
+            'id': np.frombuffer(self.id, dtype=np.int64),
+            'account_id': np.frombuffer(self.account_id, dtype=np.int64),
+            'category_id': np.frombuffer(self.category_id, dtype=np.int64),
+            'amount': np.frombuffer(self.amount, dtype=np.int64),
+            'date': np.frombuffer(self.date, dtype=np.int32).astype('datetime64[D]'),
+            'is_deleted': np.frombuffer(self.is_deleted, dtype=np.int8).astype(bool),
+        }
+        for name in self.string_columns:
+            column = getattr(self, name)
+            values = np.array(column.values + [None], dtype=object)
+            columns[name] = values[np.frombuffer(column.codes, dtype=np.int32)]
+        return columns
+
+    def to_pandas(self):
+        """ Returns a pandas DataFrame; amounts are converted to floats and strings to categories.
+        """
+        import numpy as np
+        import pandas as pd
+
+        columns = self.to_numpy()
+        columns['amount'] = columns['amount'] / self.scale
+        for name in self.string_columns:
+            column = getattr(self, name)
+            columns[name] = pd.Categorical.from_codes(
+                np.frombuffer(column.codes, dtype=np.int32), categories=column.values,
+            )
+        return pd.DataFrame(columns)
+
+    def to_arrow(self):
+        """ Returns a pyarrow Table built from the buffers; strings are dictionary-encoded. """
+        import pyarrow as pa
+
+        def _numeric_array(buffer, arrow_type):
+            return pa.Array.from_buffers(arrow_type, len(buffer), [None, pa.py_buffer(buffer)])
+
+        arrays = {
+            'id': _numeric_array(self.id, pa.int64()),
+            'account_id': _numeric_array(self.account_id, pa.int64()),
+            'category_id': _numeric_array(self.category_id, pa.int64()),
+            'amount': _numeric_array(self.amount, pa.int64()),
+            'date': _numeric_array(self.date, pa.date32()),
+            'is_deleted': _numeric_array(self.is_deleted, pa.int8()),
+        }
+        for name in self.string_columns:
+            column = getattr(self, name)
+            arrays[name] = pa.DictionaryArray.from_arrays(
+                pa.array(column.codes, type=pa.int32(), mask=[c < 0 for c in column.codes]),
+                pa.array(column.values, type=pa.string()),
+            )
+        return pa.table(arrays)
+
+    def _get_days(self, value):
+        """ Returns the number of days between 1970-01-01 and the given "YYYY-MM-DD" date. """
+        if value is None:
+            return 0
+        days = self._dates.get(value)
+        if days is None:
+            days = self._dates[value] = date(
+                int(value[:4]), int(value[5:7]), int(value[8:10]),
+            ).toordinal() - EPOCH_ORDINAL
+        return days
+
+
+def _get_reference_id(reference):
+    if reference is None:
+        return MISSING_ID
+    return reference['id'] if isinstance(reference, dict) else reference
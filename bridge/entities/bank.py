@@ -24,6 +24,24 @@ class Bank(BaseApi):
         """
         return self._client._call('GET', 'banks/{}'.format(id))
 
+    def iter(self, max_items=None, page_size=None, prefetch=0):
+        """ Lazily iterates over the available banks, following the pagination cursors.
+
+        :param max_items: maximum number of banks to yield
+        :param page_size: number of records to request per page (accepted values: 1 - 500)
+        :param prefetch: number of pages to fetch in the background while the current page is
+            processed
+        :type max_items: int
+        :type page_size: int
+        :type prefetch: int
+        :return: iterable yielding the banks one at a time
+        :rtype: bridge.pagination.Paginator
+
+        """
+        return self._iter_paginated(
+            'banks', max_items=max_items, page_size=page_size, prefetch=prefetch,
+        )
+
     def list(self, before=None, after=None, limit=None):
         """ List the available banks.
 
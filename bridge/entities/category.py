@@ -25,6 +25,24 @@ class Category(BaseApi):
         """
         return self._client._call('GET', 'categories/{}'.format(id))
 
+    def iter(self, max_items=None, page_size=None, prefetch=0):
+        """ Lazily iterates over the available categories, following the pagination cursors.
+
+        :param max_items: maximum number of categories to yield
+        :param page_size: number of records to request per page (accepted values: 1 - 500)
+        :param prefetch: number of pages to fetch in the background while the current page is
+            processed
+        :type max_items: int
+        :type page_size: int
+        :type prefetch: int
+        :return: iterable yielding the categories one at a time
+        :rtype: bridge.pagination.Paginator
+
+        """
+        return self._iter_paginated(
+            'categories', max_items=max_items, page_size=page_size, prefetch=prefetch,
+        )
+
     def list(self, before=None, after=None, limit=None):
         """ Returns a cursor-paginated list of categories.
 
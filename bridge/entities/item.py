@@ -7,7 +7,10 @@
 
 """
 
+import time
+
 from ..baseapi import BaseApi
+from ..polling import RefreshPoller
 
 
 class Item(BaseApi):
@@ -66,6 +69,25 @@ class Item(BaseApi):
         """
         return self._client._call('GET', 'items/{}/refresh/status'.format(id))
 
+    def iter(self, max_items=None, page_size=None, prefetch=0):
+        """ Lazily iterates over the items associated with the current user, following the
+            pagination cursors.
+
+        :param max_items: maximum number of items to yield
+        :param page_size: number of records to request per page (accepted values: 1 - 500)
+        :param prefetch: number of pages to fetch in the background while the current page is
+            processed
+        :type max_items: int
+        :type page_size: int
+        :type prefetch: int
+        :return: iterable yielding the items one at a time
+        :rtype: bridge.pagination.Paginator
+
+        """
+        return self._iter_paginated(
+            'items', max_items=max_items, page_size=page_size, prefetch=prefetch,
+        )
+
     def list(self, before=None, after=None, limit=None):
         """ List the items associated with the current user.
 
@@ -103,3 +125,40 @@ class Item(BaseApi):
 
         """
         return self._client._call('GET', 'connect/items/pro/confirmation/url')
+
+    def wait_for_refresh(self, ids, timeout=None, on_update=None, min_interval=1, max_interval=30):
+        """ Waits for the refresh of many items to complete (eg. after sending an item's MFA).
+
+        A single scheduler polls the refresh status of every item: each item is first polled at
+        a short interval which then grows exponentially (with jitter) until a terminal status
+        (eg. "finished") is reached. Items are yielded as soon as their refresh is over.
+
+        :param ids: IDs of the considered items
+        :param timeout: maximum number of seconds to wait (a ``RefreshTimeoutError`` is raised
+            once it is exceeded)
+        :param on_update: function called with the ID and the refresh status of an item every time
+            its status changes
+        :param min_interval: number of seconds to wait before polling an item for the second time
+        :param max_interval: maximum number of seconds to wait between two polls of an item
+        :type ids: iterable
+        :type timeout: float
+        :type on_update: callable
+        :type min_interval: float
+        :type max_interval: float
+        :return: iterable yielding (ID, refresh status) tuples as the refreshes complete
+        :rtype: generator
+
+        """
+        poller = RefreshPoller(
+            ids, timeout=timeout, min_interval=min_interval, max_interval=max_interval,
+        )
+        delay = poller.get_delay()
+        while delay is not None:
+            time.sleep(delay)
+            for id in poller.pop_due():
+                status = self.get_refresh_status(id)
+                if on_update is not None and status != poller.statuses.get(id):
+                    on_update(id, status)
+                if poller.update(id, status):
+                    yield id, status
+            delay = poller.get_delay()
@@ -24,6 +24,48 @@ class Stock(BaseApi):
         """
         return self._client._call('GET', 'stocks/{}'.format(id))
 
+    def iter(self, max_items=None, page_size=None, prefetch=0):
+        """ Lazily iterates over the user's stocks, following the pagination cursors.
+
+        :param max_items: maximum number of stocks to yield
+        :param page_size: number of records to request per page (accepted values: 1 - 500)
+        :param prefetch: number of pages to fetch in the background while the current page is
+            processed
+        :type max_items: int
+        :type page_size: int
+        :type prefetch: int
+        :return: iterable yielding the stocks one at a time
+        :rtype: bridge.pagination.Paginator
+
+        """
+        return self._iter_paginated(
+            'stocks', max_items=max_items, page_size=page_size, prefetch=prefetch,
+        )
+
+    def iter_updated(self, since=None, max_items=None, page_size=None, prefetch=0):
+        """ Lazily iterates over the user's stocks that were updated after a datetime.
+
+        :param since: datetime to use to retrieve the stocks
+        :param max_items: maximum number of stocks to yield
+        :param page_size: number of records to request per page (accepted values: 1 - 500)
+        :param prefetch: number of pages to fetch in the background while the current page is
+            processed
+        :type since: date or datetime
+        :type max_items: int
+        :type page_size: int
+        :type prefetch: int
+        :return: iterable yielding the stocks one at a time
+        :rtype: bridge.pagination.Paginator
+
+        """
+        return self._iter_paginated(
+            'stocks/updated',
+            params={'since': since.isoformat() if since is not None else None, },
+            max_items=max_items,
+            page_size=page_size,
+            prefetch=prefetch,
+        )
+
     def list(self, before=None, after=None, limit=None):
         """ Returns a user's cursor-paginated list of stocks.
 
@@ -8,7 +8,15 @@
 
 """
 
+import re
+from datetime import date, datetime
+
+from ..aggregation import TransactionAggregates
 from ..baseapi import BaseApi
+from ..columnar import TransactionColumns
+
+
+DATE_RE = re.compile(r'^\d{4}-\d{2}-\d{2}')
 
 
 class Transaction(BaseApi):
@@ -25,6 +33,166 @@ class Transaction(BaseApi):
         """
         return self._client._call('GET', 'transactions/{}'.format(id))
 
+    def iter(self, since=None, until=None, max_items=None, page_size=None, prefetch=0):
+        """ Lazily iterates over the transactions associated with the current user, following the
+            pagination cursors.
+
+        :param since: data to limit the results to the transactions created after the specified date
+        :param until:
+            data to limit the results to the transactions created before the specified date
+        :param max_items: maximum number of transactions to yield
+        :param page_size: number of records to request per page (accepted values: 1 - 500)
+        :param prefetch: number of pages to fetch in the background while the current page is
+            processed
+        :type since: date or datetime
+        :type until: date or datetime
+        :type max_items: int
+        :type page_size: int
+        :type prefetch: int
+        :return: iterable yielding the transactions one at a time
+        :rtype: bridge.pagination.Paginator
+
+        """
+        params = _get_range_params(since, until)
+        return self._iter_paginated(
+            'transactions',
+            params=params,
+            max_items=max_items,
+            page_size=page_size,
+            prefetch=prefetch,
+        )
+
+    def iter_by_account(
+        self, account_id, since=None, until=None, max_items=None, page_size=None, prefetch=0,
+    ):
+        """ Lazily iterates over the transactions associated with the current user for a given
+            bank account, following the pagination cursors.
+
+        :param account_id: ID of the considered bank account
+        :param since: data to limit the results to the transactions created after the specified date
+        :param until:
+            data to limit the results to the transactions created before the specified date
+        :param max_items: maximum number of transactions to yield
+        :param page_size: number of records to request per page (accepted values: 1 - 500)
+        :param prefetch: number of pages to fetch in the background while the current page is
+            processed
+        :type account_id: str or int
+        :type since: date or datetime
+        :type until: date or datetime
+        :type max_items: int
+        :type page_size: int
+        :type prefetch: int
+        :return: iterable yielding the transactions one at a time
+        :rtype: bridge.pagination.Paginator
+
+        """
+        params = _get_range_params(since, until)
+        return self._iter_paginated(
+            'accounts/{}/transactions'.format(account_id),
+            params=params,
+            max_items=max_items,
+            page_size=page_size,
+            prefetch=prefetch,
+        )
+
+    def iter_updated(self, since=None, max_items=None, page_size=None, prefetch=0):
+        """ Lazily iterates over the transactions of the current user that were updated after a
+            datetime, following the pagination cursors.
+
+        :param since: datetime to use to retrieve the transactions
+        :param max_items: maximum number of transactions to yield
+        :param page_size: number of records to request per page (accepted values: 1 - 500)
+        :param prefetch: number of pages to fetch in the background while the current page is
+            processed
+        :type since: date or datetime
+        :type max_items: int
+        :type page_size: int
+        :type prefetch: int
+        :return: iterable yielding the transactions one at a time
+        :rtype: bridge.pagination.Paginator
+
+        """
+        return self._iter_paginated(
+            'transactions/updated',
+            params=_get_range_params(since, None),
+            max_items=max_items,
+            page_size=page_size,
+            prefetch=prefetch,
+        )
+
+    def iter_updated_by_account(
+        self, account_id, since=None, max_items=None, page_size=None, prefetch=0,
+    ):
+        """ Lazily iterates over the transactions of the current user for a given bank account that
+            were updated after a datetime, following the pagination cursors.
+
+        :param account_id: ID of the considered bank account
+        :param since: datetime to use to retrieve the transactions
+        :param max_items: maximum number of transactions to yield
+        :param page_size: number of records to request per page (accepted values: 1 - 500)
+        :param prefetch: number of pages to fetch in the background while the current page is
+            processed
+        :type account_id: str or int
+        :type since: date or datetime
+        :type max_items: int
+        :type page_size: int
+        :type prefetch: int
+        :return: iterable yielding the transactions one at a time
+        :rtype: bridge.pagination.Paginator
+
+        """
+        return self._iter_paginated(
+            'accounts/{}/transactions/updated'.format(account_id),
+            params=_get_range_params(since, None),
+            max_items=max_items,
+            page_size=page_size,
+            prefetch=prefetch,
+        )
+
+    def iter_range(
+        self, since=None, until=None, account_id=None, max_items=None, page_size=None, prefetch=0,
+    ):
+        """ Lazily iterates over the transactions of the current user (or of one of its bank
+            accounts) made within a date range.
+
+        The range is sent to the service and also enforced on the client side: as transactions
+        are returned from the most recent to the oldest one, the pagination stops as soon as a
+        transaction older than ``since`` is received, so that no page beyond the range is fetched.
+
+        :param since: date to limit the results to the transactions made on or after this date
+        :param until: date to limit the results to the transactions made on or before this date
+        :param account_id: ID of the bank account to consider (defaults to all the accounts)
+        :param max_items: maximum number of transactions to yield
+        :param page_size: number of records to request per page (accepted values: 1 - 500)
+        :param prefetch: number of pages to fetch in the background while the current page is
+            processed
+        :type since: date or datetime
+        :type until: date or datetime
+        :type account_id: str or int
+        :type max_items: int
+        :type page_size: int
+        :type prefetch: int
+        :return: generator yielding the transactions one at a time
+        :rtype: generator
+
+        """
+        paginator = self._iter_transactions(
+            since, until, account_id, max_items, page_size, prefetch,
+        )
+        lower_bound, upper_bound = _get_date_bounds(since, until)
+        resources = iter(paginator)
+        try:
+            for transaction in resources:
+                transaction_date = transaction.get('date')
+                if transaction_date is None:
+                    yield transaction
+                elif lower_bound is not None and transaction_date < lower_bound:
+                    return
+                elif upper_bound is None or transaction_date <= upper_bound:
+                    yield transaction
+        finally:
+            resources.close()
+
     def list(self, since=None, until=None, before=None, after=None, limit=None):
         """ Lists the transactions associated with the current user.
 
@@ -43,13 +211,7 @@ class Transaction(BaseApi):
         :rtype: dictionary
 
         """
-        params = {
-            'since': since.isoformat() if since is not None else None,
-            'until': since.isoformat() if since is not None else None,
-            'before': before,
-            'after': after,
-            'limit': limit,
-        }
+        params = dict(_get_range_params(since, until), before=before, after=after, limit=limit)
         return self._patch_paginated_response_data(self._client._call(
             'GET', 'transactions', params={k: v for k, v in params.items() if v is not None},
         ))
@@ -76,7 +238,7 @@ class Transaction(BaseApi):
         :rtype: dictionary
 
         """
-        params = {'before': before, 'after': after, 'limit': limit, }
+        params = dict(_get_range_params(since, until), before=before, after=after, limit=limit)
         return self._patch_paginated_response_data(self._client._call(
             'GET',
             'accounts/{}/transactions'.format(account_id),
@@ -98,12 +260,7 @@ class Transaction(BaseApi):
         :rtype: dictionary
 
         """
-        params = {
-            'since': since.isoformat() if since is not None else None,
-            'before': before,
-            'after': after,
-            'limit': limit,
-        }
+        params = dict(_get_range_params(since, None), before=before, after=after, limit=limit)
         return self._patch_paginated_response_data(self._client._call(
             'GET',
             'transactions/updated',
@@ -130,14 +287,126 @@ class Transaction(BaseApi):
         :rtype: dictionary
 
         """
-        params = {
-            'since': since.isoformat() if since else None,
-            'before': before,
-            'after': after,
-            'limit': limit,
-        }
+        params = dict(_get_range_params(since, None), before=before, after=after, limit=limit)
         return self._patch_paginated_response_data(self._client._call(
             'GET',
             'accounts/{}/transactions/updated'.format(account_id),
             params={k: v for k, v in params.items() if v is not None},
         ))
+
+    def to_columns(
+        self, since=None, until=None, account_id=None, max_items=None, page_size=500, prefetch=0,
+        scale=100,
+    ):
+        """ Fetches the transactions of the current user into compact columnar buffers.
+
+        Pages are appended to the columns as soon as they are fetched, so that only a single page
+        of decoded transactions is held in memory at any time.
+
+        :param since: data to limit the results to the transactions created after the specified date
+        :param until:
+            data to limit the results to the transactions created before the specified date
+        :param account_id: ID of the bank account to consider (defaults to all the accounts)
+        :param max_items: maximum number of transactions to fetch
+        :param page_size: number of records to request per page (accepted values: 1 - 500)
+        :param prefetch: number of pages to fetch in the background while the current page is
+            processed
+        :param scale: fixed-point scale of the amounts (eg. 100 to store amounts in cents)
+        :type since: date or datetime
+        :type until: date or datetime
+        :type account_id: str or int
+        :type max_items: int
+        :type page_size: int
+        :type prefetch: int
+        :type scale: int
+        :return: columnar buffers that can be converted to NumPy arrays, a DataFrame, etc
+        :rtype: bridge.columnar.TransactionColumns
+
+        """
+        columns = TransactionColumns(scale=scale)
+        for page in self._iter_transactions(
+            since, until, account_id, max_items, page_size, prefetch,
+        ).pages():
+            columns.extend(page.get('resources', []))
+        return columns
+
+    def aggregate(
+        self, since=None, until=None, account_id=None, max_items=None, page_size=500, prefetch=0,
+        scale=100,
+    ):
+        """ Computes the balances, monthly cash flow and category totals of the transactions of
+            the current user in a single pass (see ``bridge.aggregation``).
+
+        The returned aggregates can then be kept up to date by passing the pages returned by
+        ``list_updated`` to their ``update`` method.
+
+        :param since: data to limit the results to the transactions created after the specified date
+        :param until:
+            data to limit the results to the transactions created before the specified date
+        :param account_id: ID of the bank account to consider (defaults to all the accounts)
+        :param max_items: maximum number of transactions to fetch
+        :param page_size: number of records to request per page (accepted values: 1 - 500)
+        :param prefetch: number of pages to fetch in the background while the current page is
+            processed
+        :param scale: fixed-point scale of the amounts (eg. 100 to accumulate amounts in cents)
+        :type since: date or datetime
+        :type until: date or datetime
+        :type account_id: str or int
+        :type max_items: int
+        :type page_size: int
+        :type prefetch: int
+        :type scale: int
+        :return: aggregates of the transactions
+        :rtype: bridge.aggregation.TransactionAggregates
+
+        """
+        return TransactionAggregates(scale=scale).update(self._iter_transactions(
+            since, until, account_id, max_items, page_size, prefetch,
+        ))
+
+    def _iter_transactions(self, since, until, account_id, max_items, page_size, prefetch):
+        """ Returns the paginator of the transactions of the user or of one of its accounts. """
+        if account_id is None:
+            return self.iter(
+                since=since, until=until, max_items=max_items, page_size=page_size,
+                prefetch=prefetch,
+            )
+        return self.iter_by_account(
+            account_id, since=since, until=until, max_items=max_items, page_size=page_size,
+            prefetch=prefetch,
+        )
+
+
+def _get_range_params(since, until):
+    """ Validates the given date range and returns the corresponding query parameters. Bounds can
+        be dates, datetimes or ISO 8601 strings (eg. ``updated_at`` values).
+    """
+    _get_date_bounds(since, until)
+    return {
+        'since': _format_bound(since),
+        'until': _format_bound(until),
+    }
+
+
+def _get_date_bounds(since, until):
+    """ Returns the given date range as "YYYY-MM-DD" strings comparable with transaction dates.
+    """
+    bounds = []
+    for name, value in (('since', since), ('until', until), ):
+        if value is None:
+            bounds.append(None)
+        elif isinstance(value, datetime):
+            bounds.append(value.date().isoformat())
+        elif isinstance(value, date):
+            bounds.append(value.isoformat())
+        elif isinstance(value, str) and DATE_RE.match(value):
+            bounds.append(value[:10])
+        else:
+            raise ValueError('{} must be a date, a datetime or an ISO 8601 string'.format(name))
+    if None not in bounds and bounds[0] > bounds[1]:
+        raise ValueError('since must not be after until')
+    return tuple(bounds)
+
+
+def _format_bound(value):
+    return value.isoformat() if isinstance(value, date) else value
@@ -33,3 +33,11 @@ class ProtocolError(BankinBridgeError):
         super().__init__(msg)
         self.response = response
         self.data = data
+
+
+class RefreshTimeoutError(BankinBridgeError):
+    """ Raised when the refresh of some items did not complete before a timeout. """
+
+    def __init__(self, msg, pending=None):
+        super().__init__(msg)
+        self.pending = pending or {}
@@ -0,0 +1,501 @@
+"""
+    Bankin Bridge bulk export
+    =========================
+
+    This module defines the ``Exporter`` class and the ``bridge-export`` command, which dump the
+    items, bank accounts and transactions of many users to NDJSON, CSV or Parquet files.
+
+    Pages are written to the output files as soon as they are fetched, so that the memory used by
+    an export does not depend on its size. The resources of each user and resource type are
+    written to a sequence of part files (eg. ``<user_id>/transactions-00000.ndjson.gz``): each
+    part is written to a temporary file that is only renamed once complete, and the pagination
+    cursor following it is then saved to a checkpoint store. An interrupted export thus resumes
+    from the last completed part.
+
+    The Parquet format relies on pyarrow and the zstd compression of NDJSON and CSV files relies
+    on zstandard; both are optional dependencies.
+
+"""
+
+import argparse
+import csv
+import gzip
+import io
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date
+
+from .checkpoints import JSONFileCheckpointStore, MemoryCheckpointStore, SQLiteCheckpointStore
+from .entities.transaction import _get_date_bounds
+from .tokens import authenticate_user
+
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+
+RESOURCE_TYPES = ('items', 'accounts', 'transactions', )
+
+FORMATS = ('ndjson', 'csv', 'parquet', )
+
+COMPRESSIONS = ('gzip', 'zstd', )
+
+# Columns of the CSV and Parquet files: (name, type) tuples where dotted names refer to the
+# members of nested objects (eg. "account.id").
+COLUMNS = {
+    'items': (
+        ('id', 'int'), ('status', 'int'), ('status_code_info', 'str'),
+        ('status_code_description', 'str'), ('bank.id', 'int'),
+    ),
+    'accounts': (
+        ('id', 'int'), ('name', 'str'), ('balance', 'float'), ('status', 'int'), ('type', 'str'),
+        ('currency_code', 'str'), ('is_pro', 'bool'), ('iban', 'str'), ('updated_at', 'str'),
+        ('item.id', 'int'), ('bank.id', 'int'),
+    ),
+    'transactions': (
+        ('id', 'int'), ('description', 'str'), ('raw_description', 'str'), ('amount', 'float'),
+        ('currency_code', 'str'), ('date', 'str'), ('updated_at', 'str'), ('is_deleted', 'bool'),
+        ('is_future', 'bool'), ('account.id', 'int'), ('category.id', 'int'),
+    ),
+}
+
+
+class NDJSONWriter:
+    """ Writes resources to a binary file object, one JSON document per line. """
+
+    def __init__(self, fileobj, resource_type):
+        self._fileobj = fileobj
+
+    def write(self, resources):
+        self._fileobj.write(''.join(
+            json.dumps(resource, separators=(',', ':')) + '\n' for resource in resources
+        ).encode('utf-8'))
+
+    def close(self):
+        self._fileobj.close()
+
+
+class CSVWriter:
+    """ Writes resources to a binary file object as CSV rows (see ``COLUMNS``). """
+
+    def __init__(self, fileobj, resource_type):
+        self._columns = COLUMNS[resource_type]
+        self._text = io.TextIOWrapper(fileobj, encoding='utf-8', newline='')
+        self._writer = csv.writer(self._text)
+        self._writer.writerow([name for name, _ in self._columns])
+
+    def write(self, resources):
+        self._writer.writerows(_get_row(resource, self._columns) for resource in resources)
+
+    def close(self):
+        self._text.close()
+
+
+class ParquetWriter:
+    """ Writes resources to a Parquet file, one row group per page (see ``COLUMNS``). """
+
+    def __init__(self, fileobj, resource_type, compression=None):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self._fileobj = fileobj
+        self._columns = COLUMNS[resource_type]
+        types = {'int': pa.int64(), 'float': pa.float64(), 'str': pa.string(), 'bool': pa.bool_()}
+        self._schema = pa.schema([(name, types[type_]) for name, type_ in self._columns])
+        self._writer = pq.ParquetWriter(
+            fileobj, self._schema, compression=compression or 'snappy',
+        )
+
+    def write(self, resources):
+        rows = [_get_row(resource, self._columns) for resource in resources]
+        self._writer.write_table(self._pa.Table.from_arrays(
+            [
+                self._pa.array([row[i] for row in rows], type=field.type)
+                for i, field in enumerate(self._schema)
+            ],
+            schema=self._schema,
+        ))
+
+    def close(self):
+        self._writer.close()
+        self._fileobj.close()
+
+
+class ExportReport:
+    """ Summary of a bulk export. """
+
+    def __init__(self):
+        self.completed = 0
+        self.failed = {}
+        self.counts = {}
+        self.files = 0
+        self.bytes = 0
+        self.elapsed = None
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return '<ExportReport completed={} failed={} counts={}>'.format(
+            self.completed, len(self.failed), self.counts,
+        )
+
+    def summary(self):
+        """ Returns a human-readable summary of the export, including its throughput. """
+        total = sum(self.counts.values())
+        elapsed = self.elapsed or 0.0
+        rate = total / elapsed if elapsed else 0.0
+        return (
+            'Exported {} resources ({}) of {} users to {} files ({:.1f} MB) in {:.1f}s: '
+            '{:.0f} resources/s, {:.2f} MB/s; {} users failed'
+        ).format(
+            total,
+            ', '.join('{}: {}'.format(k, v) for k, v in sorted(self.counts.items())) or 'none',
+            self.completed, self.files, self.bytes / 1e6, elapsed, rate,
+            self.bytes / 1e6 / elapsed if elapsed else 0.0, len(self.failed),
+        )
+
+    def add(self, resource_type, count):
+        with self._lock:
+            self.counts[resource_type] = self.counts.get(resource_type, 0) + count
+
+    def add_file(self, size):
+        with self._lock:
+            self.files += 1
+            self.bytes += size
+
+
+class Exporter:
+    """ Exports the resources of many users to files, with bounded concurrency and resumption. """
+
+    def __init__(
+        self, client, directory, format='ndjson', compression=None, resource_types=RESOURCE_TYPES,
+        checkpoints=None, max_workers=4, page_size=500, pages_per_part=20, since=None, until=None,
+        token_manager=None,
+    ):
+        """ Initializes the exporter.
+
+        :param client: client used to authenticate the users
+        :param directory: directory the files are written to (one subdirectory per user)
+        :param format: format of the files: "ndjson", "csv" or "parquet"
+        :param compression: compression of the files: ``None``, "gzip" or "zstd"
+        :param resource_types: resource types to export ("items", "accounts", "transactions")
+        :param checkpoints: store used to persist the progress of the export, allowing to resume
+            it (the progress is only kept in memory by default)
+        :param max_workers: maximum number of users exported simultaneously
+        :param page_size: number of records to request per page (accepted values: 1 - 500)
+        :param pages_per_part: number of pages written to each part file
+        :param since: date to limit the exported transactions to those made after it
+        :param until: date to limit the exported transactions to those made before it
+        :param token_manager: token manager used to obtain the access tokens of the users
+        :type client: bridge.client.Client
+        :type directory: str
+        :type format: str
+        :type compression: str
+        :type resource_types: tuple
+        :type checkpoints: bridge.checkpoints.BaseCheckpointStore
+        :type max_workers: int
+        :type page_size: int
+        :type pages_per_part: int
+        :type since: date or datetime
+        :type until: date or datetime
+        :type token_manager: bridge.tokens.TokenManager
+
+        """
+        if format not in FORMATS:
+            raise ValueError('Unknown format: {}'.format(format))
+        if compression not in (None, ) + COMPRESSIONS:
+            raise ValueError('Unknown compression: {}'.format(compression))
+        if compression == 'zstd' and format != 'parquet' and zstandard is None:
+            raise ImportError('zstandard is not installed')
+        for resource_type in resource_types:
+            if resource_type not in RESOURCE_TYPES:
+                raise ValueError('Unknown resource type: {}'.format(resource_type))
+        _get_date_bounds(since, until)
+        self.client = client
+        self.directory = directory
+        self.format = format
+        self.compression = compression
+        self.resource_types = tuple(resource_types)
+        self.checkpoints = checkpoints if checkpoints is not None else MemoryCheckpointStore()
+        self.max_workers = max_workers
+        self.page_size = page_size
+        self.pages_per_part = pages_per_part
+        self.since = since
+        self.until = until
+        self.token_manager = token_manager
+
+    def run(self, users):
+        """ Exports the given users and returns a report.
+
+        Users are described by dictionaries containing a ``user_id`` key and either an
+        ``access_token`` key or ``email`` and ``password`` keys. Users are consumed lazily from
+        the given iterable. Users without a ``user_id`` key are reported as failed under their
+        position in the iterable (eg. "#3").
+
+        :param users: iterable of the users to export
+        :type users: iterable
+        :return: :class:`ExportReport <ExportReport>` object
+        :rtype: bridge.export.ExportReport
+
+        """
+        started_at = time.monotonic()
+        report = ExportReport()
+        users = iter(users)
+        position = 0
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while True:
+                while len(running) < self.max_workers:
+                    credentials = next(users, None)
+                    if credentials is None:
+                        break
+                    position += 1
+                    user_id = credentials.get('user_id') if isinstance(credentials, dict) else None
+                    if user_id is None:
+                        # Invalid users are reported under their position instead of aborting
+                        # the export.
+                        report.failed['#{}'.format(position)] = ValueError(
+                            'The user must be a dictionary containing a "user_id" key',
+                        )
+                        continue
+                    future = executor.submit(self.export_user, credentials, report)
+                    running[future] = user_id
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    user_id = running.pop(future)
+                    try:
+                        future.result()
+                    except Exception as e:
+                        report.failed[user_id] = e
+                    else:
+                        report.completed += 1
+
+        report.elapsed = time.monotonic() - started_at
+        return report
+
+    def export_user(self, credentials, report):
+        """ Exports the resources of a single user (see ``run``). """
+        user_id = str(credentials['user_id'])
+        client = None
+        for resource_type in self.resource_types:
+            key = 'export:{}:{}'.format(user_id, resource_type)
+            checkpoint = self.checkpoints.get(key) or {'after': None, 'part': 0, 'done': False, }
+            if checkpoint['done']:
+                continue
+            if client is None:
+                client = authenticate_user(self.client, user_id, credentials, self.token_manager)
+            self._export_resources(client, user_id, resource_type, key, checkpoint, report)
+
+    def _export_resources(self, client, user_id, resource_type, key, checkpoint, report):
+        paginator = self._get_paginator(client, resource_type)
+        if checkpoint['after'] is not None:
+            paginator.params['after'] = checkpoint['after']
+        part = checkpoint['part']
+        writer = None
+        pages = 0
+        count = 0
+        try:
+            for page in paginator.pages():
+                resources = [_as_dict(r) for r in page.get('resources') or []]
+                if writer is None:
+                    writer = _PartWriter(self, user_id, resource_type, part)
+                writer.write(resources)
+                count += len(resources)
+                pages += 1
+
+                # Completes the current part once it is large enough: the export will resume from
+                # the next page if it is interrupted.
+                next_params = page.get('pagination', {}).get('next') or {}
+                if pages % self.pages_per_part == 0 and next_params.get('after'):
+                    report.add_file(writer.commit())
+                    # Resources are only counted once the part containing them is complete.
+                    report.add(resource_type, count)
+                    writer = None
+                    count = 0
+                    part += 1
+                    self.checkpoints.set(
+                        key, {'after': next_params['after'], 'part': part, 'done': False, },
+                    )
+        except BaseException:
+            if writer is not None:
+                writer.abort()
+            raise
+        if writer is not None:
+            report.add_file(writer.commit())
+            report.add(resource_type, count)
+        self.checkpoints.set(key, {'after': None, 'part': part, 'done': True, })
+
+    def _get_paginator(self, client, resource_type):
+        if resource_type == 'items':
+            return client.item.iter(page_size=self.page_size, prefetch=1)
+        elif resource_type == 'accounts':
+            return client.account.iter(page_size=self.page_size, prefetch=1)
+        return client.transaction.iter(
+            since=self.since, until=self.until, page_size=self.page_size, prefetch=1,
+        )
+
+
+class _PartWriter:
+    """ Writes a part file to a temporary path and moves it to its final path once complete. """
+
+    def __init__(self, exporter, user_id, resource_type, part):
+        directory = os.path.join(exporter.directory, user_id)
+        os.makedirs(directory, exist_ok=True)
+        extension = exporter.format
+        if exporter.format != 'parquet' and exporter.compression is not None:
+            extension += '.gz' if exporter.compression == 'gzip' else '.zst'
+        self.path = os.path.join(
+            directory, '{}-{:05d}.{}'.format(resource_type, part, extension),
+        )
+        self.tmp_path = '{}.tmp'.format(self.path)
+
+        if exporter.format != 'parquet' and exporter.compression == 'gzip':
+            fileobj = gzip.open(self.tmp_path, 'wb')
+        elif exporter.format != 'parquet' and exporter.compression == 'zstd':
+            fileobj = zstandard.open(self.tmp_path, 'wb')
+        else:
+            fileobj = open(self.tmp_path, 'wb')
+        try:
+            if exporter.format == 'parquet':
+                self._writer = ParquetWriter(fileobj, resource_type, exporter.compression)
+            elif exporter.format == 'csv':
+                self._writer = CSVWriter(fileobj, resource_type)
+            else:
+                self._writer = NDJSONWriter(fileobj, resource_type)
+        except BaseException:
+            fileobj.close()
+            os.remove(self.tmp_path)
+            raise
+
+    def write(self, resources):
+        self._writer.write(resources)
+
+    def commit(self):
+        """ Completes the part and returns its size in bytes. """
+        self._writer.close()
+        os.replace(self.tmp_path, self.path)
+        return os.path.getsize(self.path)
+
+    def abort(self):
+        try:
+            self._writer.close()
+        finally:
+            os.remove(self.tmp_path)
+
+
+def _as_dict(resource):
+    return resource if isinstance(resource, dict) else resource.to_dict()
+
+
+def _get_row(resource, columns):
+    row = []
+    for name, type_ in columns:
+        value = resource
+        for key in name.split('.'):
+            value = value.get(key) if isinstance(value, dict) else None
+        if value is not None and type_ == 'float':
+            value = float(value)
+        row.append(value)
+    return row
+
+
+def _parse_date(value):
+    """ Validates a date passed on the command line (eg. "2019-01-31" or an ISO 8601 datetime). """
+    try:
+        _get_date_bounds(value, None)
+        date.fromisoformat(value[:10])
+    except ValueError:
+        raise argparse.ArgumentTypeError('invalid date: {!r}'.format(value))
+    return value
+
+
+def _read_users(path):
+    """ Lazily reads the users to export from a JSON lines file ("-" for the standard input). """
+    f = sys.stdin if path == '-' else open(path, encoding='utf-8')
+    try:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def main(argv=None):
+    """ Entry point of the ``bridge-export`` command. """
+    from .client import Client
+
+    parser = argparse.ArgumentParser(
+        prog='bridge-export',
+        description=(
+            'Exports the items, bank accounts and transactions of many users. Users are read from '
+            'a JSON lines file whose lines contain a "user_id" key and either an "access_token" '
+            'key or "email" and "password" keys.'
+        ),
+    )
+    parser.add_argument('users', help='JSON lines file describing the users ("-" for stdin)')
+    parser.add_argument('-o', '--output', required=True, help='output directory')
+    parser.add_argument('-f', '--format', choices=FORMATS, default='ndjson')
+    parser.add_argument('-c', '--compression', choices=COMPRESSIONS)
+    parser.add_argument(
+        '-r', '--resources', default=','.join(RESOURCE_TYPES),
+        help='comma-separated resource types to export (default: %(default)s)',
+    )
+    parser.add_argument(
+        '--since', type=_parse_date, help='export the transactions made after this date',
+    )
+    parser.add_argument(
+        '--until', type=_parse_date, help='export the transactions made before this date',
+    )
+    parser.add_argument(
+        '--checkpoints',
+        help='file used to save the progress of the export and resume it (SQLite database if its '
+             'extension is .db or .sqlite, JSON file otherwise)',
+    )
+    parser.add_argument('-w', '--workers', type=int, default=4, help='users exported at once')
+    parser.add_argument('--page-size', type=int, default=500)
+    parser.add_argument('--pages-per-part', type=int, default=20)
+    parser.add_argument('--client-id', default=os.environ.get('BRIDGE_CLIENT_ID'))
+    parser.add_argument('--client-secret', default=os.environ.get('BRIDGE_CLIENT_SECRET'))
+    parser.add_argument('--base-url', default=os.environ.get('BRIDGE_BASE_URL'))
+    args = parser.parse_args(argv)
+
+    if not args.client_id or not args.client_secret:
+        parser.error('the client credentials are required (--client-id and --client-secret or '
+                     'the BRIDGE_CLIENT_ID and BRIDGE_CLIENT_SECRET environment variables)')
+
+    if args.checkpoints is None:
+        checkpoints = None
+    elif args.checkpoints.endswith(('.db', '.sqlite', )):
+        checkpoints = SQLiteCheckpointStore(args.checkpoints)
+    else:
+        checkpoints = JSONFileCheckpointStore(args.checkpoints)
+
+    # Each worker has at most two requests in flight (the current page and the prefetched one).
+    client = Client(
+        args.client_id, args.client_secret, base_url=args.base_url, pool_size=args.workers * 2,
+    )
+    try:
+        exporter = Exporter(
+            client, args.output, format=args.format, compression=args.compression,
+            resource_types=[r.strip() for r in args.resources.split(',') if r.strip()],
+            checkpoints=checkpoints, max_workers=args.workers, page_size=args.page_size,
+            pages_per_part=args.pages_per_part, since=args.since, until=args.until,
+        )
+    except (ImportError, ValueError) as e:
+        parser.error(str(e))
+    report = exporter.run(_read_users(args.users))
+
+    for user_id, error in report.failed.items():
+        print('Export of user {} failed: {!r}'.format(user_id, error), file=sys.stderr)
+    print(report.summary(), file=sys.stderr)
+    return 1 if report.failed else 0
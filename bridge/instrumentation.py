@@ -0,0 +1,340 @@
+"""
+    Bankin Bridge instrumentation
+    =============================
+
+    This module defines the ``Instrumentation`` class allowing to observe the requests performed by
+    a client (see the ``instrumentation`` option of ``bridge.Client``): hooks are called before and
+    after each API call and a ``ClientMetrics`` object records per-endpoint latency histograms,
+    transferred bytes, retries, waiting and decoding times.
+
+    Endpoints are identified by their templates (eg. "accounts/{id}/transactions"). Metrics can be
+    exposed using the Prometheus text format and API calls can be traced as OpenTelemetry spans
+    (the ``opentelemetry-api`` package is then required).
+
+"""
+
+import threading
+import time
+from datetime import timedelta
+
+from .utils import get_endpoint_template
+
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, )
+
+
+class RequestEvent:
+    """ Describes a single API call; durations are expressed in seconds.
+
+    The ``context`` dictionary can be used by hooks to keep track of their own state (eg. a span)
+    between the pre-request and the post-request hooks.
+
+    ``wait_time`` only covers the delays imposed by the client (rate limiter and retry backoffs).
+    The time spent waiting for a free connection of the pool (``pool_block=True``) is not measured
+    separately: it is only included in ``duration``.
+
+    """
+
+    __slots__ = (
+        'method', 'path', 'endpoint', 'started_at', 'duration', 'status_code', 'bytes_received',
+        'retries', 'wait_time', 'server_time', 'decode_time', 'from_cache', 'error', 'context',
+    )
+
+    def __init__(self, method, path):
+        self.method = method.upper()
+        self.path = path
+        self.endpoint = get_endpoint_template(path)
+        self.started_at = time.perf_counter()
+        self.duration = None
+        self.status_code = None
+        self.bytes_received = 0
+        self.retries = 0
+        self.wait_time = 0.0
+        self.server_time = None
+        self.decode_time = 0.0
+        self.from_cache = False
+        self.error = None
+        self.context = {}
+
+    def record_response(self, response):
+        """ Records the status code, the size and the server time (ie. the time elapsed until the
+            response headers were received) of the given response.
+        """
+        self.status_code = response.status_code
+        self.bytes_received = len(response.content or b'')
+        elapsed = getattr(response, 'elapsed', None)
+        if isinstance(elapsed, timedelta):
+            self.server_time = elapsed.total_seconds()
+
+
+class Histogram:
+    """ Counts observed values using fixed buckets (upper bounds). """
+
+    __slots__ = ('buckets', 'counts', 'count', 'sum', )
+
+    def __init__(self, buckets=DEFAULT_LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        """ Adds a value to the histogram. """
+        index = 0
+        for bound in self.buckets:
+            if value <= bound:
+                break
+            index += 1
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """ Returns the upper bound of the bucket containing the given quantile (or ``None``). """
+        if not self.count:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float('inf'), ), self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return bound
+        return float('inf')
+
+
+class EndpointMetrics:
+    """ Metrics of the calls to a single endpoint. """
+
+    __slots__ = (
+        'requests', 'errors', 'cache_hits', 'retries', 'bytes_received', 'wait_time',
+        'server_time', 'decode_time', 'latency',
+    )
+
+    def __init__(self, buckets=DEFAULT_LATENCY_BUCKETS):
+        self.requests = 0
+        self.errors = 0
+        self.cache_hits = 0
+        self.retries = 0
+        self.bytes_received = 0
+        self.wait_time = 0.0
+        self.server_time = 0.0
+        self.decode_time = 0.0
+        self.latency = Histogram(buckets)
+
+    def to_dict(self):
+        """ Returns a dictionary representation of the metrics. """
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'cache_hits': self.cache_hits,
+            'retries': self.retries,
+            'bytes_received': self.bytes_received,
+            'wait_time': self.wait_time,
+            'server_time': self.server_time,
+            'decode_time': self.decode_time,
+            'latency': {
+                'count': self.latency.count,
+                'sum': self.latency.sum,
+                'p50': self.latency.quantile(0.5),
+                'p95': self.latency.quantile(0.95),
+                'p99': self.latency.quantile(0.99),
+            },
+        }
+
+
+class ClientMetrics:
+    """ Aggregates the events of the API calls per HTTP method and endpoint template. """
+
+    def __init__(self, buckets=DEFAULT_LATENCY_BUCKETS):
+        """ Initializes the metrics.
+
+        :param buckets: upper bounds (in seconds) of the buckets of the latency histograms
+        :type buckets: iterable
+
+        """
+        self.buckets = tuple(buckets)
+        self.endpoints = {}
+        self._lock = threading.Lock()
+
+    def record(self, event):
+        """ Records a completed request event. """
+        key = (event.method, event.endpoint)
+        with self._lock:
+            metrics = self.endpoints.get(key)
+            if metrics is None:
+                metrics = self.endpoints[key] = EndpointMetrics(self.buckets)
+            metrics.requests += 1
+            metrics.errors += 1 if event.error is not None else 0
+            metrics.cache_hits += 1 if event.from_cache else 0
+            metrics.retries += event.retries
+            metrics.bytes_received += event.bytes_received
+            metrics.wait_time += event.wait_time
+            metrics.server_time += event.server_time or 0.0
+            metrics.decode_time += event.decode_time
+            metrics.latency.observe(event.duration)
+
+    def snapshot(self):
+        """ Returns a dictionary of the metrics keyed by "METHOD endpoint" strings. """
+        with self._lock:
+            return {
+                '{} {}'.format(method, endpoint): metrics.to_dict()
+                for (method, endpoint), metrics in sorted(self.endpoints.items())
+            }
+
+    def reset(self):
+        """ Removes all the recorded metrics. """
+        with self._lock:
+            self.endpoints.clear()
+
+    def to_prometheus(self, prefix='bridge_client'):
+        """ Returns the metrics using the Prometheus text exposition format. """
+        counters = (
+            ('requests', 'Number of API calls.'),
+            ('errors', 'Number of failed API calls.'),
+            ('cache_hits', 'Number of API calls served from the cache.'),
+            ('retries', 'Number of retried requests.'),
+            ('bytes_received', 'Number of bytes of the response bodies.'),
+            (
+                'wait_time',
+                'Seconds spent waiting for the rate limiter or between retries (excluding the '
+                'connection pool).',
+            ),
+            ('server_time', 'Seconds elapsed until the response headers were received.'),
+            ('decode_time', 'Seconds spent deserializing response bodies.'),
+        )
+        with self._lock:
+            endpoints = sorted(self.endpoints.items())
+            lines = []
+            for name, description in counters:
+                lines.append('# HELP {}_{}_total {}'.format(prefix, name, description))
+                lines.append('# TYPE {}_{}_total counter'.format(prefix, name))
+                for (method, endpoint), metrics in endpoints:
+                    lines.append('{}_{}_total{{{}}} {}'.format(
+                        prefix, name, _labels(method, endpoint), getattr(metrics, name),
+                    ))
+
+            name = '{}_request_duration_seconds'.format(prefix)
+            lines.append('# HELP {} Duration of the API calls.'.format(name))
+            lines.append('# TYPE {} histogram'.format(name))
+            for (method, endpoint), metrics in endpoints:
+                labels = _labels(method, endpoint)
+                cumulative = 0
+                for bound, count in zip(metrics.latency.buckets, metrics.latency.counts):
+                    cumulative += count
+                    lines.append('{}_bucket{{{},le="{}"}} {}'.format(
+                        name, labels, bound, cumulative,
+                    ))
+                lines.append('{}_bucket{{{},le="+Inf"}} {}'.format(
+                    name, labels, metrics.latency.count,
+                ))
+                lines.append('{}_sum{{{}}} {}'.format(name, labels, metrics.latency.sum))
+                lines.append('{}_count{{{}}} {}'.format(name, labels, metrics.latency.count))
+        return '\n'.join(lines) + '\n'
+
+
+class Instrumentation:
+    """ Calls hooks before and after each API call and records the corresponding metrics. """
+
+    def __init__(self, metrics=None, before_request=(), after_request=()):
+        """ Initializes the instrumentation.
+
+        :param metrics: object recording the metrics of the API calls (defaults to a new
+            ``ClientMetrics`` object; ``False`` disables the metrics)
+        :param before_request: functions called with a ``RequestEvent`` before each API call
+        :param after_request: functions called with the completed ``RequestEvent`` after each API
+            call (whether it succeeded or not)
+        :type metrics: bridge.instrumentation.ClientMetrics
+        :type before_request: iterable
+        :type after_request: iterable
+
+        """
+        self.metrics = ClientMetrics() if metrics is None else metrics or None
+        self.before_request = list(before_request)
+        self.after_request = list(after_request)
+
+    def add_hooks(self, before_request=None, after_request=None):
+        """ Registers a pre-request and/or a post-request hook. """
+        if before_request is not None:
+            self.before_request.append(before_request)
+        if after_request is not None:
+            self.after_request.append(after_request)
+
+    def start(self, http_method, path):
+        """ Returns the event of an API call that is about to start. """
+        event = RequestEvent(http_method, path)
+        for hook in self.before_request:
+            hook(event)
+        return event
+
+    def finish(self, event, error=None):
+        """ Completes the event of an API call, records its metrics and calls the post-request
+            hooks.
+        """
+        event.duration = time.perf_counter() - event.started_at
+        event.error = error
+        if self.metrics is not None:
+            self.metrics.record(event)
+        for hook in self.after_request:
+            hook(event)
+
+    def measure(self, function, http_method, path, *args):
+        """ Calls ``function(http_method, path, *args, event=event)`` within a request event. """
+        event = self.start(http_method, path)
+        try:
+            result = function(http_method, path, *args, event=event)
+        except Exception as e:
+            self.finish(event, error=e)
+            raise
+        self.finish(event)
+        return result
+
+    async def measure_async(self, function, http_method, path, *args):
+        """ Awaits ``function(http_method, path, *args, event=event)`` within a request event. """
+        event = self.start(http_method, path)
+        try:
+            result = await function(http_method, path, *args, event=event)
+        except Exception as e:
+            self.finish(event, error=e)
+            raise
+        self.finish(event)
+        return result
+
+
+class OpenTelemetryHooks:
+    """ Traces API calls as OpenTelemetry spans; register it using ``Instrumentation.add_hooks``
+        (eg. ``instrumentation.add_hooks(hooks.before_request, hooks.after_request)``).
+    """
+
+    def __init__(self, tracer=None):
+        """ Initializes the hooks.
+
+        :param tracer: OpenTelemetry tracer (defaults to the tracer of the "bridge" module)
+
+        """
+        if tracer is None:
+            from opentelemetry import trace
+            tracer = trace.get_tracer('bridge')
+        self.tracer = tracer
+
+    def before_request(self, event):
+        event.context['span'] = self.tracer.start_span(
+            '{} {}'.format(event.method, event.endpoint),
+            attributes={'http.method': event.method, 'bridge.endpoint': event.endpoint, },
+        )
+
+    def after_request(self, event):
+        span = event.context.pop('span', None)
+        if span is None:
+            return
+        if event.status_code is not None:
+            span.set_attribute('http.status_code', event.status_code)
+        span.set_attribute('bridge.retries', event.retries)
+        span.set_attribute('bridge.bytes_received', event.bytes_received)
+        span.set_attribute('bridge.from_cache', event.from_cache)
+        if event.error is not None:
+            span.record_exception(event.error)
+        span.end()
+
+
+def _labels(method, endpoint):
+    return 'method="{}",endpoint="{}"'.format(method, endpoint)
@@ -0,0 +1,249 @@
+"""
+    Bankin Bridge local transaction mirror
+    ======================================
+
+    This module defines the ``TransactionMirror`` class, which keeps a local copy of transactions
+    in a SQLite database so that read paths (eg. "this month's transactions of account X" or "all
+    the transactions of category Y") are answered from disk instead of costing API round-trips.
+
+    Transactions returned by ``Transaction.list``, ``list_by_account`` or ``list_updated`` (or by
+    the corresponding ``iter*`` methods) are upserted by ID: an update is only applied if it is
+    not older than the stored version (based on ``updated_at``) and deleted transactions are kept
+    as tombstones that are excluded from queries by default. The table is indexed on
+    ``(account_id, date)``, ``category_id`` and ``updated_at``.
+
+"""
+
+import json
+import sqlite3
+import threading
+from itertools import islice
+
+from .models import DateTimeField
+
+
+# Number of transactions written per SQL statement batch when ingesting.
+INGEST_BATCH_SIZE = 500
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS bridge_transactions ('
+    'id INTEGER PRIMARY KEY, account_id INTEGER, category_id INTEGER, date TEXT, '
+    'updated_at TEXT, amount REAL, is_deleted INTEGER NOT NULL DEFAULT 0, data TEXT NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS bridge_transactions_account_date '
+    'ON bridge_transactions (account_id, date)',
+    'CREATE INDEX IF NOT EXISTS bridge_transactions_category '
+    'ON bridge_transactions (category_id)',
+    'CREATE INDEX IF NOT EXISTS bridge_transactions_updated_at '
+    'ON bridge_transactions (updated_at)',
+)
+
+UPSERT_SQL = (
+    'INSERT INTO bridge_transactions '
+    '(id, account_id, category_id, date, updated_at, amount, is_deleted, data) '
+    'VALUES (?, ?, ?, ?, ?, ?, ?, ?) '
+    'ON CONFLICT (id) DO UPDATE SET '
+    'account_id = excluded.account_id, category_id = excluded.category_id, '
+    'date = excluded.date, updated_at = excluded.updated_at, amount = excluded.amount, '
+    'is_deleted = excluded.is_deleted, data = excluded.data '
+    'WHERE excluded.updated_at IS NULL OR bridge_transactions.updated_at IS NULL '
+    'OR excluded.updated_at >= bridge_transactions.updated_at'
+)
+
+
+class TransactionMirror:
+    """ Stores transactions in a SQLite database and answers queries from it. """
+
+    def __init__(self, path):
+        """ Initializes the mirror.
+
+        :param path: path of the SQLite database (created if it does not exist)
+        :type path: str
+
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute('PRAGMA journal_mode = WAL')
+        self._connection.execute('PRAGMA synchronous = NORMAL')
+        for statement in SCHEMA:
+            self._connection.execute(statement)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def ingest(self, transactions):
+        """ Upserts the given transactions (dictionaries or models) and returns their number.
+
+        A page returned by a ``list*`` method (ie. a dictionary containing a ``resources`` key) or
+        a paginator can be passed as well.
+
+        :param transactions: transactions to store
+        :type transactions: iterable or dictionary
+        :return: number of ingested transactions
+        :rtype: int
+
+        """
+        if isinstance(transactions, dict):
+            transactions = transactions.get('resources') or []
+        rows = map(_get_row, transactions)
+        count = 0
+        while True:
+            batch = list(islice(rows, INGEST_BATCH_SIZE))
+            if not batch:
+                return count
+            with self._lock:
+                self._connection.execute('BEGIN')
+                try:
+                    self._connection.executemany(UPSERT_SQL, batch)
+                except BaseException:
+                    self._connection.execute('ROLLBACK')
+                    raise
+                self._connection.execute('COMMIT')
+            count += len(batch)
+
+    def get(self, id):
+        """ Returns the stored transaction with the given ID (even if deleted) or ``None``. """
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT data FROM bridge_transactions WHERE id = ?', (id, ),
+            ).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def query(
+        self, account_id=None, category_id=None, since=None, until=None, updated_since=None,
+        include_deleted=False, limit=None,
+    ):
+        """ Returns the stored transactions matching the given criteria, from the most recent to
+            the oldest one.
+
+        :param account_id: ID of the bank account of the transactions
+        :param category_id: ID of the category of the transactions
+        :param since: date to limit the results to the transactions made on or after this date
+        :param until: date to limit the results to the transactions made on or before this date
+        :param updated_since: datetime to limit the results to the transactions updated after it
+        :param include_deleted: whether to include the transactions that were deleted
+        :param limit: maximum number of transactions to return
+        :type account_id: int
+        :type category_id: int
+        :type since: date
+        :type until: date
+        :type updated_since: datetime or str
+        :type include_deleted: bool
+        :type limit: int
+        :return: list of transactions (dictionaries)
+        :rtype: list
+
+        """
+        where, args = self._build_where(
+            account_id, category_id, since, until, updated_since, include_deleted,
+        )
+        sql = 'SELECT data FROM bridge_transactions{} ORDER BY date DESC, id DESC'.format(where)
+        if limit is not None:
+            sql += ' LIMIT ?'
+            args.append(limit)
+        with self._lock:
+            rows = self._connection.execute(sql, args).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def count(
+        self, account_id=None, category_id=None, since=None, until=None, updated_since=None,
+        include_deleted=False,
+    ):
+        """ Returns the number of stored transactions matching the given criteria (see ``query``).
+        """
+        where, args = self._build_where(
+            account_id, category_id, since, until, updated_since, include_deleted,
+        )
+        with self._lock:
+            return self._connection.execute(
+                'SELECT COUNT(*) FROM bridge_transactions{}'.format(where), args,
+            ).fetchone()[0]
+
+    def sum_amounts(
+        self, account_id=None, category_id=None, since=None, until=None, group_by=None,
+    ):
+        """ Returns the sum of the amounts of the stored transactions matching the given criteria
+            (see ``query``), optionally grouped by ``"account_id"`` or ``"category_id"``.
+        """
+        if group_by not in (None, 'account_id', 'category_id', ):
+            raise ValueError('Invalid group_by value: {}'.format(group_by))
+        where, args = self._build_where(account_id, category_id, since, until, None, False)
+        with self._lock:
+            if group_by is None:
+                return self._connection.execute(
+                    'SELECT COALESCE(SUM(amount), 0) FROM bridge_transactions{}'.format(where),
+                    args,
+                ).fetchone()[0]
+            return dict(self._connection.execute(
+                'SELECT {0}, SUM(amount) FROM bridge_transactions{1} GROUP BY {0}'.format(
+                    group_by, where,
+                ),
+                args,
+            ).fetchall())
+
+    def last_updated_at(self, account_id=None):
+        """ Returns the most recent ``updated_at`` value stored (eg. to be used as the ``since``
+            parameter of ``Transaction.list_updated``), or ``None``.
+        """
+        sql = 'SELECT MAX(updated_at) FROM bridge_transactions'
+        args = ()
+        if account_id is not None:
+            sql += ' WHERE account_id = ?'
+            args = (account_id, )
+        with self._lock:
+            return self._connection.execute(sql, args).fetchone()[0]
+
+    def close(self):
+        """ Closes the underlying database connection. """
+        self._connection.close()
+
+    def _build_where(
+        self, account_id, category_id, since, until, updated_since, include_deleted,
+    ):
+        """ Returns the WHERE clause and the arguments corresponding to the given criteria. """
+        clauses = []
+        args = []
+        if account_id is not None:
+            clauses.append('account_id = ?')
+            args.append(account_id)
+        if category_id is not None:
+            clauses.append('category_id = ?')
+            args.append(category_id)
+        if since is not None:
+            clauses.append('date >= ?')
+            args.append(since.isoformat())
+        if until is not None:
+            clauses.append('date <= ?')
+            args.append(until.isoformat())
+        if updated_since is not None:
+            clauses.append('updated_at > ?')
+            args.append(
+                updated_since if isinstance(updated_since, str)
+                else DateTimeField().serialize(updated_since)
+            )
+        if not include_deleted:
+            clauses.append('is_deleted = 0')
+        return (' WHERE ' + ' AND '.join(clauses) if clauses else ''), args
+
+
+def _get_row(transaction):
+    if not isinstance(transaction, dict):
+        transaction = transaction.to_dict()
+    amount = transaction.get('amount')
+    return (
+        transaction['id'],
+        _get_reference_id(transaction.get('account')),
+        _get_reference_id(transaction.get('category')),
+        transaction.get('date'),
+        transaction.get('updated_at'),
+        float(amount) if amount is not None else None,
+        1 if transaction.get('is_deleted') else 0,
+        json.dumps(transaction, separators=(',', ':')),
+    )
+
+
+def _get_reference_id(reference):
+    return reference.get('id') if isinstance(reference, dict) else reference
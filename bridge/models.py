@@ -0,0 +1,265 @@
+"""
+    Bankin Bridge resource models
+    =============================
+
+    This module defines compact model classes that can be used in place of the dictionaries
+    returned by the API (see the ``models`` option of ``bridge.Client``). Models rely on
+    ``__slots__``, flatten references to other resources (eg. ``{"category": {"id": 42}}`` becomes
+    ``category_id``) and lazily parse amounts (as ``Decimal``), dates and datetimes on first
+    access.
+
+    Models can still be read using the keys of the original dictionaries through their ``get``
+    method, which returns JSON-compatible values, and keys that are not described by a model are
+    kept in an ``extra`` dictionary.
+
+"""
+
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from .utils import get_endpoint_template
+
+
+class Field:
+    """ Describes a field whose raw value is parsed on first access. """
+
+    type = object
+
+    def __init__(self):
+        self.key = None
+        self.attr = None
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        value = getattr(instance, self.attr)
+        if value is not None and not isinstance(value, self.type):
+            value = self.parse(value)
+            setattr(instance, self.attr, value)
+        return value
+
+    def parse(self, value):
+        """ Converts a raw JSON value to the type of the field. """
+        raise NotImplementedError
+
+    def serialize(self, value):
+        """ Converts a parsed value back to a JSON-compatible value. """
+        raise NotImplementedError
+
+
+class DecimalField(Field):
+    """ Describes a numeric field (eg. amounts) parsed as a ``Decimal``. """
+
+    type = Decimal
+
+    def parse(self, value):
+        return Decimal(repr(value)) if isinstance(value, float) else Decimal(value)
+
+    def serialize(self, value):
+        return float(value)
+
+
+class DateField(Field):
+    """ Describes a field containing a date (eg. "2019-04-02"). """
+
+    type = date
+
+    def parse(self, value):
+        return datetime.strptime(value, '%Y-%m-%d').date()
+
+    def serialize(self, value):
+        return value.isoformat()
+
+
+class DateTimeField(Field):
+    """ Describes a field containing a UTC datetime (eg. "2019-04-02T13:15:51.000Z"). """
+
+    type = datetime
+
+    def parse(self, value):
+        fmt = '%Y-%m-%dT%H:%M:%S.%fZ' if '.' in value else '%Y-%m-%dT%H:%M:%SZ'
+        return datetime.strptime(value, fmt).replace(tzinfo=timezone.utc)
+
+    def serialize(self, value):
+        return '{}.{:03d}Z'.format(value.strftime('%Y-%m-%dT%H:%M:%S'), value.microsecond // 1000)
+
+
+class ModelMeta(type):
+    """ Builds the ``__slots__`` of model classes from their fields and references. """
+
+    def __new__(mcs, name, bases, namespace):
+        lazy_fields = []
+        for key, value in namespace.items():
+            if isinstance(value, Field):
+                value.key, value.attr = key, '_' + key
+                lazy_fields.append(value)
+        fields = tuple(namespace.get('fields', ()))
+        references = tuple(namespace.get('references', ()))
+        namespace['__slots__'] = tuple(namespace.get('__slots__', ())) + (
+            fields + tuple(r + '_id' for r in references) + tuple(f.attr for f in lazy_fields)
+        )
+        namespace['_lazy_fields'] = tuple(lazy_fields)
+        return super().__new__(mcs, name, bases, namespace)
+
+
+class Model(metaclass=ModelMeta):
+    """ Base class of the resource models. """
+
+    __slots__ = ('extra', )
+    fields = ()
+    references = ()
+
+    def __init__(self, data):
+        """ Initializes the model from a dictionary returned by the API. """
+        data = dict(data)
+        for key in self.fields:
+            setattr(self, key, data.pop(key, None))
+        for key in self.references:
+            value = data.pop(key, None)
+            setattr(self, key + '_id', value.get('id') if isinstance(value, dict) else value)
+        for field in self._lazy_fields:
+            setattr(self, field.attr, data.pop(field.key, None))
+        self.extra = data or None
+
+    def __getattr__(self, name):
+        # Only called for attributes that are not described by the model.
+        extra = object.__getattribute__(self, 'extra')
+        if extra is not None and name in extra:
+            return extra[name]
+        raise AttributeError(name)
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return '<{} id={!r}>'.format(type(self).__name__, self.get('id'))
+
+    def get(self, key, default=None):
+        """ Returns the JSON-compatible value associated with a key of the original dictionary. """
+        if key in self.fields:
+            return getattr(self, key)
+        elif key in self.references:
+            value = getattr(self, key + '_id')
+            return {'id': value} if value is not None else None
+        for field in self._lazy_fields:
+            if field.key == key:
+                value = getattr(self, field.attr)
+                if value is not None and isinstance(value, field.type):
+                    value = field.serialize(value)
+                return value
+        return self.extra.get(key, default) if self.extra is not None else default
+
+    def to_dict(self):
+        """ Returns a JSON-compatible dictionary representation of the model. """
+        data = dict(self.extra or {})
+        data.update((key, self.get(key)) for key in self.fields + self.references)
+        data.update((f.key, self.get(f.key)) for f in self._lazy_fields)
+        return data
+
+
+class Account(Model):
+    """ Compact representation of a bank account. """
+
+    fields = (
+        'id', 'resource_uri', 'resource_type', 'name', 'status', 'status_code_info',
+        'status_code_description', 'type', 'currency_code', 'is_pro', 'iban',
+    )
+    references = ('item', 'bank', )
+    balance = DecimalField()
+    updated_at = DateTimeField()
+
+
+class Bank(Model):
+    """ Compact representation of a bank. """
+
+    fields = (
+        'id', 'resource_uri', 'resource_type', 'name', 'country_code', 'automatic_refresh',
+        'primary_color', 'secondary_color', 'logo_url', 'form',
+    )
+
+
+class Category(Model):
+    """ Compact representation of a category. """
+
+    fields = ('id', 'resource_uri', 'resource_type', 'name', )
+    references = ('parent', )
+
+
+class Item(Model):
+    """ Compact representation of an item. """
+
+    fields = (
+        'id', 'resource_uri', 'resource_type', 'status', 'status_code_info',
+        'status_code_description', 'accounts',
+    )
+    references = ('bank', )
+
+
+class Stock(Model):
+    """ Compact representation of a stock. """
+
+    fields = (
+        'id', 'resource_uri', 'resource_type', 'label', 'ticker', 'isin', 'marketplace',
+        'stock_key', 'currency_code', 'is_deleted',
+    )
+    references = ('account', )
+    current_price = DecimalField()
+    quantity = DecimalField()
+    total_value = DecimalField()
+    average_purchase_price = DecimalField()
+    value_date = DateField()
+    created_at = DateTimeField()
+    updated_at = DateTimeField()
+
+
+class Transaction(Model):
+    """ Compact representation of a transaction. """
+
+    fields = (
+        'id', 'resource_uri', 'resource_type', 'description', 'raw_description', 'currency_code',
+        'is_deleted', 'is_future',
+    )
+    references = ('account', 'category', )
+    amount = DecimalField()
+    date = DateField()
+    updated_at = DateTimeField()
+
+
+MODELS = {
+    'accounts': Account,
+    'accounts/{id}': Account,
+    'accounts/{id}/transactions': Transaction,
+    'accounts/{id}/transactions/updated': Transaction,
+    'banks': Bank,
+    'banks/{id}': Bank,
+    'categories': Category,
+    'categories/{id}': Category,
+    'items': Item,
+    'items/{id}': Item,
+    'stocks': Stock,
+    'stocks/{id}': Stock,
+    'stocks/updated': Stock,
+    'transactions': Transaction,
+    'transactions/{id}': Transaction,
+    'transactions/updated': Transaction,
+}
+
+
+def get_model_class(http_method, path):
+    """ Returns the model class of the resources returned by the given request or ``None``. """
+    return MODELS.get(get_endpoint_template(path)) if http_method.upper() == 'GET' else None
+
+
+def load_models(http_method, path, data):
+    """ Converts the data returned by a GET request to the given path to models, if applicable.
+
+    Single resources are converted to models and the ``resources`` of paginated responses are
+    replaced by lists of models.
+
+    """
+    model_class = get_model_class(http_method, path)
+    if model_class is None or not isinstance(data, dict):
+        return data
+    elif 'resources' in data:
+        return dict(data, resources=[model_class(resource) for resource in data['resources']])
+    return model_class(data)
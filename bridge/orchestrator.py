@@ -0,0 +1,273 @@
+"""
+    Bankin Bridge bulk synchronization
+    ==================================
+
+    This module defines the ``SyncOrchestrator`` class allowing to synchronize the data (items,
+    bank accounts and transactions) of many users over a bounded worker pool, and the sinks the
+    synchronized resources are streamed to.
+
+    The synchronization of each user is split into small tasks (authentication, listing of the
+    items and bank accounts, then one task per page of transactions of each bank account). Tasks
+    are scheduled in a round-robin fashion across the users being synchronized, so that a user
+    owning many bank accounts cannot starve the others, and a failure only aborts the
+    synchronization of the user it relates to.
+
+"""
+
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from .tokens import authenticate_user
+
+
+class BaseSyncSink:
+    """ Base class of the sinks receiving the results of a bulk synchronization.
+
+    Sink methods are always called from the thread running the orchestrator, never concurrently.
+
+    """
+
+    def write(self, user_id, resource_type, resources):
+        """ Receives a batch of synchronized resources ("items", "accounts" or "transactions"). """
+
+    def user_completed(self, user_id, counts):
+        """ Called once the synchronization of a user completed successfully. """
+
+    def user_failed(self, user_id, error):
+        """ Called when the synchronization of a user failed (its other tasks are cancelled). """
+
+
+class MemorySyncSink(BaseSyncSink):
+    """ Keeps the synchronized resources in memory (eg. for tests or small batches). """
+
+    def __init__(self):
+        self.resources = {}
+        self.completed = []
+        self.failed = {}
+
+    def write(self, user_id, resource_type, resources):
+        self.resources.setdefault(user_id, {}).setdefault(resource_type, []).extend(resources)
+
+    def user_completed(self, user_id, counts):
+        self.completed.append(user_id)
+
+    def user_failed(self, user_id, error):
+        self.failed[user_id] = error
+
+
+class SyncReport:
+    """ Summary of a bulk synchronization. """
+
+    def __init__(self):
+        self.completed = 0
+        self.failed = {}
+        self.counts = {}
+        self.elapsed = None
+
+    def __repr__(self):
+        return '<SyncReport completed={} failed={} counts={}>'.format(
+            self.completed, len(self.failed), self.counts,
+        )
+
+
+class SyncOrchestrator:
+    """ Synchronizes the data of many users with bounded concurrency and fair scheduling. """
+
+    def __init__(
+        self, client, sink, max_workers=16, max_tasks_per_user=2, max_active_users=None,
+        rate_limiter=None, since=None, page_size=500, token_manager=None,
+    ):
+        """ Initializes the orchestrator.
+
+        :param client: client used to perform the calls (a view is created for every user)
+        :param sink: sink receiving the synchronized resources
+        :param max_workers: maximum number of tasks (ie. requests) running simultaneously
+        :param max_tasks_per_user: maximum number of tasks running simultaneously for a single user
+        :param max_active_users: maximum number of users being synchronized simultaneously (the
+            other users wait for their turn; defaults to twice the number of workers)
+        :param rate_limiter: rate limiter shared by the requests of every user
+        :param since: data to limit the results to the transactions created after the specified date
+        :param page_size: number of transactions to request per page (accepted values: 1 - 500)
+        :param token_manager: token manager used to obtain the access tokens of the users
+            authenticated using their email and password (see ``bridge.tokens``)
+        :type client: bridge.client.Client
+        :type sink: bridge.orchestrator.BaseSyncSink
+        :type max_workers: int
+        :type max_tasks_per_user: int
+        :type max_active_users: int
+        :type rate_limiter: bridge.retry.RateLimiter
+        :type since: date or datetime
+        :type page_size: int
+        :type token_manager: bridge.tokens.TokenManager
+
+        """
+        self.client = client
+        self.sink = sink
+        self.max_workers = max_workers
+        self.max_tasks_per_user = max_tasks_per_user
+        self.max_active_users = max_active_users or max_workers * 2
+        self.rate_limiter = rate_limiter
+        self.since = since
+        self.page_size = page_size
+        self.token_manager = token_manager
+
+    def run(self, users):
+        """ Synchronizes the given users and returns a report.
+
+        Users are described by dictionaries containing a ``user_id`` key and either an
+        ``access_token`` key or ``email`` and ``password`` keys (and optionally a ``since`` key
+        overriding the orchestrator's one). Users are consumed lazily from the given iterable.
+
+        :param users: iterable of the users to synchronize
+        :type users: iterable
+        :return: :class:`SyncReport <SyncReport>` object
+        :rtype: bridge.orchestrator.SyncReport
+
+        """
+        started_at = time.monotonic()
+        report = SyncReport()
+        users = iter(users)
+        exhausted = False
+        active = 0
+        ready = deque()
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while True:
+                # Admits new users as long as there is room for them.
+                while not exhausted and active < self.max_active_users:
+                    credentials = next(users, None)
+                    if credentials is None:
+                        exhausted = True
+                        break
+                    state = _UserState(credentials, self._authenticate)
+                    ready.append(state)
+                    active += 1
+
+                # Dispatches the tasks of the ready users in a round-robin fashion.
+                dispatched = True
+                while dispatched and len(running) < self.max_workers:
+                    dispatched = False
+                    for _ in range(len(ready)):
+                        if len(running) >= self.max_workers:
+                            break
+                        state = ready.popleft()
+                        if state.failed or not state.tasks:
+                            continue
+                        task = state.tasks.popleft()
+                        running[executor.submit(task, state)] = state
+                        state.running += 1
+                        dispatched = True
+                        if state.tasks and state.running < self.max_tasks_per_user:
+                            ready.append(state)
+
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    state = running.pop(future)
+                    state.running -= 1
+                    if not state.failed:
+                        self._handle_result(state, future, report)
+                    if state.failed or (not state.tasks and not state.running):
+                        if not state.running:
+                            active -= 1
+                            if not state.failed:
+                                self._complete(state, report)
+                    elif (
+                        state.tasks and state.running < self.max_tasks_per_user and
+                        state not in ready
+                    ):
+                        ready.append(state)
+
+        report.elapsed = time.monotonic() - started_at
+        return report
+
+    def _handle_result(self, state, future, report):
+        try:
+            resource_type, resources, tasks = future.result()
+        except Exception as e:
+            state.failed = True
+            state.tasks.clear()
+            report.failed[state.user_id] = e
+            self.sink.user_failed(state.user_id, e)
+            return
+        if resource_type is not None:
+            state.counts[resource_type] = state.counts.get(resource_type, 0) + len(resources)
+            report.counts[resource_type] = report.counts.get(resource_type, 0) + len(resources)
+            self.sink.write(state.user_id, resource_type, resources)
+        state.tasks.extend(tasks)
+
+    def _complete(self, state, report):
+        report.completed += 1
+        self.sink.user_completed(state.user_id, dict(state.counts))
+
+    ##########
+    # TASKS  #
+    ##########
+
+    # Tasks run in worker threads and return a (resource type, resources, next tasks) tuple.
+
+    def _authenticate(self, state):
+        state.client = authenticate_user(
+            self.client, state.user_id, state.credentials, self.token_manager,
+        )
+        if self.rate_limiter is not None:
+            state.client.rate_limiter = self.rate_limiter
+        return None, (), (self._list_items, self._list_accounts, )
+
+    def _list_items(self, state):
+        return 'items', list(state.client.item.iter()), ()
+
+    def _list_accounts(self, state):
+        accounts = list(state.client.account.iter())
+        since = state.credentials.get('since', self.since)
+        tasks = []
+        for account in accounts:
+            paginator = state.client.transaction.iter_by_account(
+                account['id'] if isinstance(account, dict) else account.id,
+                since=since, page_size=self.page_size,
+            )
+            tasks.append(_TransactionPageTask(paginator, paginator._first_page_params(), 0))
+        return 'accounts', accounts, tasks
+
+
+class _TransactionPageTask:
+    """ Fetches a single page of transactions and returns the task fetching the next one. """
+
+    __slots__ = ('paginator', 'params', 'fetched', )
+
+    def __init__(self, paginator, params, fetched):
+        self.paginator = paginator
+        self.params = params
+        self.fetched = fetched
+
+    def __call__(self, state):
+        page = self.paginator._fetch_page(self.params)
+        resources = page.get('resources') or []
+        fetched = self.fetched + len(resources)
+        next_params = (
+            self.paginator._next_page_params(page, self.params, fetched) if resources else None
+        )
+        tasks = (
+            (_TransactionPageTask(self.paginator, next_params, fetched), )
+            if next_params is not None else ()
+        )
+        return 'transactions', resources, tasks
+
+
+class _UserState:
+    """ State of the synchronization of a single user. """
+
+    __slots__ = ('credentials', 'user_id', 'client', 'tasks', 'running', 'failed', 'counts', )
+
+    def __init__(self, credentials, first_task):
+        self.credentials = credentials
+        self.user_id = credentials.get('user_id')
+        self.client = None
+        self.tasks = deque((first_task, ))
+        self.running = 0
+        self.failed = False
+        self.counts = {}
@@ -0,0 +1,287 @@
+"""
+    Bankin Bridge pagination helpers
+    ================================
+
+    This module defines the ``Paginator`` class allowing to lazily iterate over the resources
+    returned by cursor-paginated endpoints.
+
+"""
+
+import json
+import os
+import queue
+import re
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from .models import get_model_class
+
+
+MAX_PAGE_SIZE = 500
+
+PREFETCH_POLL_INTERVAL = 0.1
+
+# Matches the "next_uri" member of a raw page. Quotes are escaped within JSON strings, so the last
+# match is the member of the top-level "pagination" object, which follows the resources.
+NEXT_URI_RE = re.compile(rb'"next_uri"\s*:\s*("(?:[^"\\]|\\.)*"|null)')
+EMPTY_RESOURCES_RE = re.compile(rb'"resources"\s*:\s*\[\s*\]')
+
+
+class Paginator:
+    """ Lazily iterates over the resources of a cursor-paginated endpoint.
+
+    Pages are fetched one at a time by following the ``next_uri`` cursors returned by the
+    service, so that only a single page is held in memory at any time. When ``prefetch`` is set,
+    a background thread fetches up to ``prefetch`` pages ahead (as soon as their cursors are
+    known) while the current page is being processed.
+
+    """
+
+    def __init__(self, api, path, params=None, max_items=None, page_size=None, prefetch=0):
+        """ Initializes the paginator.
+
+        :param api: entity API object used to perform the calls
+        :param path: path of the paginated endpoint
+        :param params: extra query parameters to send with every page request
+        :param max_items: maximum number of resources to yield
+        :param page_size: number of records to request per page (accepted values: 1 - 500)
+        :param prefetch: number of pages to fetch in the background while the current page is
+            processed
+        :type api: bridge.baseapi.BaseApi
+        :type path: str
+        :type params: dict
+        :type max_items: int
+        :type page_size: int
+        :type prefetch: int
+
+        """
+        if page_size is not None and not 1 <= page_size <= MAX_PAGE_SIZE:
+            raise ValueError('page_size must be between 1 and {}'.format(MAX_PAGE_SIZE))
+        if max_items is not None and max_items < 0:
+            raise ValueError('max_items must be a positive integer')
+        if prefetch < 0:
+            raise ValueError('prefetch must be a positive integer')
+        self.api = api
+        self.path = path
+        self.params = {k: v for k, v in (params or {}).items() if v is not None}
+        self.max_items = max_items
+        self.page_size = page_size
+        self.prefetch = prefetch
+
+    def __iter__(self):
+        count = 0
+        for page in self.pages():
+            for resource in page.get('resources', []):
+                if self.max_items is not None and count >= self.max_items:
+                    return
+                yield resource
+                count += 1
+
+    def pages(self):
+        """ Yields the successive pages (as patched response dictionaries) of the endpoint. """
+        if self.prefetch:
+            yield from self._prefetched_pages()
+        else:
+            yield from self._fetched_pages()
+
+    def _fetched_pages(self):
+        params = self._first_page_params()
+        fetched = 0
+        while params is not None:
+            page = self._fetch_page(params)
+            yield page
+            resources = page.get('resources')
+            fetched += len(resources or [])
+            params = self._next_page_params(page, params, fetched) if resources else None
+
+    def stream(self):
+        """ Yields the resources of the endpoint as soon as they are received.
+
+        Unlike regular iteration, the resources of each page are parsed incrementally while the
+        response body is being downloaded, so that the first resources of a page can be processed
+        before the whole page has been received. Responses are never served from the cache.
+
+        """
+        client = self.api._client
+        model_class = get_model_class('GET', self.path) if client.models else None
+        params = self._first_page_params()
+        fetched = 0
+        while params is not None:
+            page = client._call_streaming(self.path, params=dict(params))
+            count = 0
+            for resource in page:
+                if self.max_items is not None and fetched + count >= self.max_items:
+                    return
+                yield model_class(resource) if model_class is not None else resource
+                count += 1
+            fetched += count
+            page_data = self.api._patch_paginated_response_data(page.data)
+            params = self._next_page_params(page_data, params, fetched) if count else None
+
+    def map_parallel(self, function, processes=None, chunksize=1, max_pending=None):
+        """ Applies a function to every resource of the endpoint in a pool of processes and yields
+            the results in order.
+
+        Pages are fetched by the calling thread and their raw (undecoded) bodies are sent to the
+        worker processes, which decode them and apply the function to their resources, so that
+        both decoding and CPU-heavy processing scale across cores while the next pages are being
+        fetched. At most ``max_pending`` tasks are submitted ahead of the results being consumed.
+        Pages are decoded using the JSON decoder of the client (the standard library by default).
+        The function and the decoder must be picklable (eg. defined at the top level of a module).
+
+        :param function: function applied to each resource (a dictionary or a model)
+        :param processes: number of worker processes (defaults to the number of CPUs)
+        :param chunksize: number of pages sent to a worker process at once
+        :param max_pending: maximum number of tasks submitted but not consumed yet (defaults to
+            twice the number of worker processes)
+        :type function: callable
+        :type processes: int
+        :type chunksize: int
+        :type max_pending: int
+        :return: generator yielding the results of the function one at a time
+        :rtype: generator
+
+        """
+        if self.max_items is not None:
+            raise ValueError('map_parallel does not support max_items')
+        if chunksize < 1:
+            raise ValueError('chunksize must be a positive integer')
+        client = self.api._client
+        model_class = get_model_class('GET', self.path) if client.models else None
+
+        processes = processes or os.cpu_count() or 1
+        max_pending = max_pending or 2 * processes
+        executor = ProcessPoolExecutor(max_workers=processes)
+        pending = deque()
+        try:
+            contents = []
+            for content in self._raw_pages():
+                contents.append(content)
+                if len(contents) == chunksize:
+                    pending.append(executor.submit(
+                        _transform_pages, function, contents, client.json_loads, model_class,
+                    ))
+                    contents = []
+                # Yields the results available in order, waiting for them once too many tasks are
+                # pending so that pages are not fetched faster than they are processed.
+                while pending and (len(pending) >= max_pending or pending[0].done()):
+                    yield from pending.popleft().result()
+            if contents:
+                pending.append(executor.submit(
+                    _transform_pages, function, contents, client.json_loads, model_class,
+                ))
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown()
+
+    def _raw_pages(self):
+        """ Yields the raw bodies of the successive pages of the endpoint. Only the cursor of the
+            next page is extracted from each body, which is not decoded otherwise.
+        """
+        client = self.api._client
+        params = self._first_page_params()
+        while params is not None:
+            content = client._call_raw(self.path, params=dict(params))
+            yield content
+            if EMPTY_RESOURCES_RE.search(content):
+                return
+            match = None
+            for match in NEXT_URI_RE.finditer(content):
+                pass
+            next_uri = json.loads(match.group(1).decode('utf-8')) if match is not None else None
+            page = self.api._patch_paginated_response_data(
+                {'pagination': {'previous_uri': None, 'next_uri': next_uri, }, },
+            )
+            params = self._next_page_params(page, params, None)
+
+    def _prefetched_pages(self):
+        # Pages are fetched by a background thread and handed over through a bounded queue; the
+        # thread stops as soon as the consumer stops iterating.
+        pages = queue.Queue(maxsize=self.prefetch)
+        stopped = threading.Event()
+
+        def _put(item):
+            while not stopped.is_set():
+                try:
+                    pages.put(item, timeout=PREFETCH_POLL_INTERVAL)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def _produce():
+            try:
+                for page in self._fetched_pages():
+                    if not _put((page, None)):
+                        return
+            except Exception as e:
+                _put((None, e))
+            else:
+                _put((None, None))
+
+        threading.Thread(target=_produce, name='bridge-prefetch', daemon=True).start()
+        try:
+            while True:
+                page, error = pages.get()
+                if error is not None:
+                    raise error
+                elif page is None:
+                    return
+                yield page
+        finally:
+            stopped.set()
+
+    def _fetch_page(self, params):
+        """ Fetches a single page using the given query parameters. """
+        return self.api._patch_paginated_response_data(
+            self.api._client._call('GET', self.path, params=dict(params)),
+        )
+
+    def _first_page_params(self):
+        """ Returns the query parameters of the first page or ``None`` if nothing is to fetch. """
+        if self.max_items == 0:
+            return None
+        params = dict(self.params)
+        limit = self._limit(0)
+        if limit is not None:
+            params['limit'] = limit
+        return params
+
+    def _next_page_params(self, page, params, fetched):
+        """ Returns the query parameters of the page following the given (non-empty) one or
+            ``None``.
+        """
+        next_params = page.get('pagination', {}).get('next')
+        if not next_params:
+            return None
+        if self.max_items is not None and fetched >= self.max_items:
+            return None
+        params = {k: v for k, v in params.items() if k not in ('before', 'after', )}
+        params.update(next_params)
+        limit = self._limit(fetched)
+        if limit is not None:
+            params['limit'] = limit
+        return params
+
+    def _limit(self, fetched):
+        """ Returns the page size to request given the number of resources already fetched. """
+        if self.max_items is None:
+            return self.page_size
+        remaining = self.max_items - fetched
+        return min(self.page_size or MAX_PAGE_SIZE, remaining)
+
+
+def _transform_pages(function, contents, json_loads=None, model_class=None):
+    """ Decodes the given raw pages and applies the function to their resources (this function
+        is run by the worker processes of ``Paginator.map_parallel``).
+    """
+    loads = json_loads or json.loads
+    results = []
+    for content in contents:
+        for resource in loads(content).get('resources') or []:
+            results.append(function(model_class(resource) if model_class is not None else resource))
+    return results
@@ -0,0 +1,109 @@
+"""
+    Bankin Bridge refresh polling
+    =============================
+
+    This module defines the ``RefreshPoller`` class, which schedules the polling of the refresh
+    status of many items: each item is first polled at a short interval which then grows
+    exponentially (with jitter) until its refresh reaches a terminal status.
+
+"""
+
+import heapq
+import itertools
+import random
+import time
+
+from .exceptions import RefreshTimeoutError
+
+
+# The refresh of an item is over once it is finished, or when it waits for the user to provide
+# information (eg. a one-time password).
+TERMINAL_REFRESH_STATUSES = frozenset(('finished', 'finished-error', 'info-requested', ))
+
+
+class RefreshPoller:
+    """ Schedules the polling of the refresh status of many items. """
+
+    def __init__(
+        self, ids, timeout=None, min_interval=1, max_interval=30, backoff_factor=2, jitter=True,
+        terminal_statuses=TERMINAL_REFRESH_STATUSES, clock=time.monotonic,
+    ):
+        """ Initializes the poller; every item is due immediately.
+
+        :param ids: IDs of the items to poll
+        :param timeout: maximum number of seconds to wait for the refreshes to complete
+        :param min_interval: number of seconds to wait before polling an item for the second time
+        :param max_interval: maximum number of seconds to wait between two polls of an item
+        :param backoff_factor: factor applied to the polling interval of an item after each poll
+        :param jitter: whether to randomize the polling intervals
+        :param terminal_statuses: refresh statuses after which an item is not polled anymore
+        :param clock: function returning the current time in seconds
+        :type ids: iterable
+        :type timeout: float
+        :type min_interval: float
+        :type max_interval: float
+        :type backoff_factor: float
+        :type jitter: bool
+        :type terminal_statuses: iterable
+        :type clock: callable
+
+        """
+        self.max_interval = max_interval
+        self.backoff_factor = backoff_factor
+        self.jitter = jitter
+        self.terminal_statuses = frozenset(terminal_statuses)
+        self.clock = clock
+        self.statuses = {}
+        now = clock()
+        self.deadline = now + timeout if timeout is not None else None
+        self._counter = itertools.count()
+        self._intervals = {}
+        self._schedule = []
+        for id in ids:
+            self._intervals[id] = min_interval
+            self._schedule.append((now, next(self._counter), id))
+        heapq.heapify(self._schedule)
+
+    @property
+    def pending(self):
+        """ Returns the IDs of the items whose refresh is not over. """
+        return [id for _, _, id in sorted(self._schedule)]
+
+    def get_delay(self):
+        """ Returns the number of seconds to wait before the next poll or ``None`` if every item
+            reached a terminal status. Raises ``RefreshTimeoutError`` if the next poll would occur
+            after the deadline.
+        """
+        if not self._schedule:
+            return None
+        now = self.clock()
+        due_at = self._schedule[0][0]
+        if self.deadline is not None and due_at > self.deadline:
+            raise RefreshTimeoutError(
+                'The refresh of {} item(s) did not complete in time'.format(len(self._schedule)),
+                pending={id: self.statuses.get(id) for id in self.pending},
+            )
+        return max(0, due_at - now)
+
+    def pop_due(self):
+        """ Returns the IDs of the items to poll now; the caller should first wait for the delay
+            returned by ``get_delay``.
+        """
+        now = self.clock()
+        ids = [heapq.heappop(self._schedule)[2]]
+        while self._schedule and self._schedule[0][0] <= now:
+            ids.append(heapq.heappop(self._schedule)[2])
+        return ids
+
+    def update(self, id, status):
+        """ Records the polled refresh status of an item and returns whether it is terminal;
+            non-terminal items are scheduled to be polled again.
+        """
+        self.statuses[id] = status
+        if status.get('status') in self.terminal_statuses:
+            return True
+        interval = self._intervals[id]
+        self._intervals[id] = min(self.max_interval, interval * self.backoff_factor)
+        delay = random.uniform(interval / 2, interval) if self.jitter else interval
+        heapq.heappush(self._schedule, (self.clock() + delay, next(self._counter), id))
+        return False
@@ -0,0 +1,199 @@
+"""
+    Bankin Bridge record/replay transports
+    ======================================
+
+    This module defines the ``RecordingTransport`` class, which records the request/response pairs
+    sent through another transport into an on-disk archive, and the ``ReplayTransport`` class,
+    which replays them without any network I/O (eg. for deterministic load tests or offline runs).
+
+    An archive is made of two files: a data file containing the compressed response bodies and an
+    index file (``<path>.idx``, one JSON document per line) associating each request key (HTTP
+    method, path and query parameters) with the location of its response in the data file. Only
+    the index is loaded in memory: response bodies are read from a memory map of the data file
+    when they are replayed. Client credentials, access tokens and passwords are never recorded.
+
+"""
+
+import json
+import mmap
+import re
+import threading
+import time
+import zlib
+from datetime import timedelta
+from urllib.parse import urlencode, urlparse
+
+from .cache import SECRET_PARAMS
+from .transport import Response
+
+
+SECRET_FIELDS = ('access_token', 'refresh_token', 'password', 'client_secret', )
+
+SECRET_FIELDS_RE = re.compile(
+    r'("(?:' + '|'.join(SECRET_FIELDS) + r')"\s*:\s*)"(?:[^"\\]|\\.)*"'
+)
+
+RECORDED_HEADERS = ('Content-Type', 'ETag', 'Retry-After', )
+
+SCRUBBED_VALUE = '[scrubbed]'
+
+
+def get_request_key(method, url, params=None):
+    """ Returns the key identifying a request in an archive; secret parameters are ignored. """
+    query = urlencode(sorted(
+        (k, str(v)) for k, v in (params or {}).items() if k not in SECRET_PARAMS
+    ))
+    return '{} {}?{}'.format(method.upper(), urlparse(url).path.strip('/'), query)
+
+
+def scrub_body(content):
+    """ Replaces the values of the secret fields (eg. access tokens) of a JSON body. """
+    if not any(field.encode('ascii') in content for field in SECRET_FIELDS):
+        return content
+    text = content.decode('utf-8')
+    return SECRET_FIELDS_RE.sub(r'\1"' + SCRUBBED_VALUE + '"', text).encode('utf-8')
+
+
+class RecordingTransport:
+    """ Sends requests through another transport and records the responses into an archive. """
+
+    def __init__(self, transport, path, compression_level=6):
+        """ Initializes the transport; records are appended to the archive if it exists.
+
+        :param transport: transport used to actually send the requests
+        :param path: path of the data file of the archive
+        :param compression_level: zlib compression level of the response bodies
+        :type transport: bridge.transport.RequestsTransport
+        :type path: str
+        :type compression_level: int
+
+        """
+        self.transport = transport
+        self.path = path
+        self.compression_level = compression_level
+        self._lock = threading.Lock()
+        self._data_file = open(path, 'ab')
+        self._index_file = open(path + '.idx', 'a', encoding='utf-8')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def session(self):
+        """ Returns the session of the underlying transport, if any. """
+        return getattr(self.transport, 'session', None)
+
+    def send(
+        self, method, url, headers=None, params=None, json=None, auth=None, timeout=None, **kwargs
+    ):
+        """ Sends a request using the underlying transport and records its response. """
+        response = self.transport.send(
+            method, url, headers=headers, params=params, json=json, auth=auth, timeout=timeout,
+            **kwargs
+        )
+        self.record(method, url, params, response)
+        return response
+
+    def record(self, method, url, params, response):
+        """ Appends a response to the archive. """
+        body = zlib.compress(scrub_body(response.content or b''), self.compression_level)
+        elapsed = getattr(response, 'elapsed', None)
+        entry = {
+            'key': get_request_key(method, url, params),
+            'status_code': response.status_code,
+            'headers': {
+                name: response.headers[name]
+                for name in RECORDED_HEADERS if name in response.headers
+            },
+            'elapsed': elapsed.total_seconds() if isinstance(elapsed, timedelta) else None,
+            'length': len(body),
+        }
+        with self._lock:
+            entry['offset'] = self._data_file.tell()
+            self._data_file.write(body)
+            self._data_file.flush()
+            self._index_file.write(_dumps(entry) + '\n')
+            self._index_file.flush()
+
+    def close(self):
+        """ Closes the files of the archive. """
+        with self._lock:
+            self._data_file.close()
+            self._index_file.close()
+
+
+class ReplayTransport:
+    """ Replays the responses of an archive without any network I/O.
+
+    The successive requests sharing the same key are answered using the successive responses that
+    were recorded for this key (starting over once all of them were replayed).
+
+    """
+
+    def __init__(self, path, realtime=False, speed=1.0):
+        """ Initializes the transport.
+
+        :param path: path of the data file of the archive
+        :param realtime: whether to wait for the recorded duration of each request
+        :param speed: speed factor applied to the recorded durations (eg. 2 to replay twice as
+            fast) when ``realtime`` is set
+        :type path: str
+        :type realtime: bool
+        :type speed: float
+
+        """
+        self.path = path
+        self.realtime = realtime
+        self.speed = speed
+        self.index = {}
+        with open(path + '.idx', encoding='utf-8') as f:
+            for line in f:
+                entry = json.loads(line)
+                self.index.setdefault(entry.pop('key'), []).append(entry)
+        self._positions = {}
+        self._lock = threading.Lock()
+        self._data_file = open(path, 'rb')
+        self._data = (
+            mmap.mmap(self._data_file.fileno(), 0, access=mmap.ACCESS_READ)
+            if self.index else b''
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def send(
+        self, method, url, headers=None, params=None, json=None, auth=None, timeout=None, **kwargs
+    ):
+        """ Returns the recorded response of the given request. """
+        key = get_request_key(method, url, params)
+        entries = self.index.get(key)
+        if not entries:
+            raise LookupError('No recorded response for: {}'.format(key))
+        with self._lock:
+            position = self._positions.get(key, 0)
+            self._positions[key] = (position + 1) % len(entries)
+        entry = entries[position]
+
+        if self.realtime and entry['elapsed']:
+            time.sleep(entry['elapsed'] / self.speed)
+        content = zlib.decompress(self._data[entry['offset']:entry['offset'] + entry['length']])
+        return Response(
+            entry['status_code'], content, headers=dict(entry['headers']),
+            elapsed=timedelta(seconds=entry['elapsed']) if entry['elapsed'] is not None else None,
+        )
+
+    def close(self):
+        """ Closes the data file of the archive. """
+        if self.index:
+            self._data.close()
+        self._data_file.close()
+
+
+def _dumps(entry):
+    return json.dumps(entry, separators=(',', ':'), sort_keys=True)
@@ -0,0 +1,161 @@
+"""
+    Bankin Bridge retry and throttling helpers
+    ==========================================
+
+    This module defines the ``RetryPolicy`` class, which decides whether and when unsuccessful
+    requests should be retried, and the ``RateLimiter`` class, a thread-safe token bucket allowing
+    to keep the request rate of one or many clients under the quota of the service.
+
+"""
+
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from requests.exceptions import ConnectionError, Timeout
+
+
+class RetryPolicy:
+    """ Retries throttled or failed requests using an exponential backoff with jitter. """
+
+    def __init__(
+        self, max_retries=3, backoff_factor=0.5, max_backoff=60, jitter=True,
+        retry_statuses=(429, 500, 502, 503, 504), retry_methods=('GET', 'DELETE', ),
+        respect_retry_after=True,
+    ):
+        """ Initializes the retry policy.
+
+        :param max_retries: maximum number of retries for a single request
+        :param backoff_factor: base delay in seconds (the n-th retry waits up to factor * 2 ** n)
+        :param max_backoff: maximum delay in seconds between two attempts (requests whose
+            ``Retry-After`` header asks for a longer delay are not retried)
+        :param jitter: whether to randomize the delays ("full jitter") to spread the retries
+        :param retry_statuses: HTTP status codes that should be retried
+        :param retry_methods: HTTP methods that can safely be retried (idempotent methods)
+        :param respect_retry_after: whether to honour the ``Retry-After`` header of responses
+        :type max_retries: int
+        :type backoff_factor: float
+        :type max_backoff: float
+        :type jitter: bool
+        :type retry_statuses: tuple
+        :type retry_methods: tuple
+        :type respect_retry_after: bool
+
+        """
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.retry_statuses = frozenset(retry_statuses)
+        self.retry_methods = frozenset(m.upper() for m in retry_methods)
+        self.respect_retry_after = respect_retry_after
+
+    def should_retry(self, http_method, attempt, response=None, error=None):
+        """ Returns whether the given attempt (starting at 0) should be retried.
+
+        :param http_method: HTTP method of the request
+        :param attempt: number of the attempt that just failed
+        :param response: response obtained for the attempt, if any
+        :param error: exception raised by the attempt, if any
+        :rtype: bool
+
+        """
+        if attempt >= self.max_retries or http_method.upper() not in self.retry_methods:
+            return False
+        if error is not None:
+            return isinstance(error, (ConnectionError, Timeout, ))
+        if response is None or response.status_code not in self.retry_statuses:
+            return False
+        # Gives up instead of retrying earlier than requested by the service, which would only
+        # lead to further throttled attempts.
+        retry_after = self.get_retry_after(response) if self.respect_retry_after else None
+        return retry_after is None or retry_after <= self.max_backoff
+
+    def get_delay(self, attempt, response=None):
+        """ Returns the number of seconds to wait before retrying the given attempt. """
+        retry_after = self.get_retry_after(response) if self.respect_retry_after else None
+        if retry_after is not None:
+            return retry_after
+        delay = min(self.backoff_factor * (2 ** attempt), self.max_backoff)
+        return random.uniform(0, delay) if self.jitter else delay
+
+    def get_retry_after(self, response):
+        """ Returns the delay in seconds requested by the ``Retry-After`` header, if any. """
+        value = getattr(response, 'headers', None) and response.headers.get('Retry-After')
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_date = parsedate_to_datetime(value)
+        except (TypeError, ValueError, IndexError):
+            return None
+        if retry_date.tzinfo is None:
+            retry_date = retry_date.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_date - datetime.now(timezone.utc)).total_seconds())
+
+    def sleep(self, delay):
+        """ Waits for the given number of seconds. """
+        if delay > 0:
+            time.sleep(delay)
+
+
+class RateLimiter:
+    """ Thread-safe token bucket limiting the rate of the requests sent to the service.
+
+    A single rate limiter can be shared by many clients (or client views) in order to enforce a
+    global quota. Requests that exceed the available tokens are queued: each of them is assigned a
+    delay so that the configured rate is never exceeded.
+
+    """
+
+    def __init__(self, rate, burst=None, clock=time.monotonic):
+        """ Initializes the rate limiter.
+
+        :param rate: number of requests allowed per second
+        :param burst: maximum number of requests that can be sent at once (defaults to the rate)
+        :param clock: monotonic clock used to compute the refills
+        :type rate: float
+        :type burst: int
+        :type clock: callable
+
+        """
+        if rate <= 0:
+            raise ValueError('rate must be a positive number')
+        self.rate = rate
+        self.burst = max(burst or rate, 1)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._tokens = self.burst
+        self._updated_at = clock()
+        self._paused_until = 0
+
+    def reserve(self, tokens=1):
+        """ Reserves tokens and returns the number of seconds to wait before using them. """
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            self._tokens -= tokens
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0
+            return max(delay, self._paused_until - now)
+
+    def acquire(self, tokens=1):
+        """ Blocks until the given number of tokens is available. """
+        delay = self.reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
+
+    def pause(self, seconds):
+        """ Prevents any request from being sent during the given number of seconds.
+
+        This is used when the service throttles a request (eg. through a ``Retry-After`` header)
+        so that all the threads sharing the rate limiter back off at once.
+
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, self._clock() + seconds)
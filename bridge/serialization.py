@@ -0,0 +1,162 @@
+"""
+    Bankin Bridge serialization helpers
+    ===================================
+
+    This module defines the helpers allowing to choose the JSON decoder used by the client (eg.
+    orjson when it is installed) and the ``StreamingPage`` class, which incrementally parses the
+    ``resources`` array of a paginated response while its body is being received.
+
+"""
+
+import codecs
+import json
+
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+def get_json_loads(json_decoder):
+    """ Returns the function used to deserialize JSON documents for the given decoder setting.
+
+    :param json_decoder: ``None`` to rely on ``response.json()``, ``"auto"`` to use orjson when it
+        is installed (or the standard library otherwise), ``"orjson"``, ``"json"`` or any callable
+        accepting bytes and returning the deserialized document
+    :type json_decoder: str or callable
+    :return: the deserialization function or ``None``
+    :rtype: callable
+
+    """
+    if json_decoder is None or callable(json_decoder):
+        return json_decoder
+    elif json_decoder == 'auto':
+        return orjson.loads if orjson is not None else json.loads
+    elif json_decoder == 'orjson':
+        if orjson is None:
+            raise ImportError('orjson is not installed')
+        return orjson.loads
+    elif json_decoder == 'json':
+        return json.loads
+    raise ValueError('Unknown JSON decoder: {}'.format(json_decoder))
+
+
+class StreamingPage:
+    """ Incrementally parses a paginated JSON response body.
+
+    Iterating over a streaming page yields the items of its ``resources`` array as soon as each
+    of them has been entirely received. Once the iteration is over, the other members of the
+    response body (eg. ``pagination``) are available in the ``data`` dictionary.
+
+    """
+
+    def __init__(self, chunks, key='resources', encoding='utf-8'):
+        """ Initializes the streaming page.
+
+        :param chunks: iterable of the chunks (bytes) of the response body
+        :param key: key of the array whose items should be streamed
+        :param encoding: encoding of the response body
+        :type chunks: iterable
+        :type key: str
+        :type encoding: str
+
+        """
+        self.key = key
+        self.data = {}
+        self._chunks = iter(chunks)
+        self._decoder = json.JSONDecoder()
+        self._incremental_decode = codecs.getincrementaldecoder(encoding)().decode
+        self._buffer = ''
+        self._position = 0
+        self._consumed = False
+
+    def __iter__(self):
+        if self._consumed:
+            raise RuntimeError('streaming pages can only be iterated once')
+        self._consumed = True
+
+        self._expect('{')
+        if self._peek() == '}':
+            return
+        while True:
+            member = self._parse_value()
+            self._expect(':')
+            if member == self.key and self._peek() == '[':
+                for item in self._iter_array():
+                    yield item
+            else:
+                self.data[member] = self._parse_value()
+            token = self._next_token()
+            if token == '}':
+                return
+            elif token != ',':
+                raise ValueError('Expecting "," or "}}" at position {}'.format(self._position))
+
+    def _iter_array(self):
+        self._expect('[')
+        if self._peek() == ']':
+            self._position += 1
+            return
+        while True:
+            yield self._parse_value()
+            token = self._next_token()
+            if token == ']':
+                return
+            elif token != ',':
+                raise ValueError('Expecting "," or "]" at position {}'.format(self._position))
+
+    def _parse_value(self):
+        """ Parses the value starting at the current position, reading more data if needed. """
+        self._skip_whitespaces()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._position)
+            except ValueError:
+                if not self._read():
+                    raise
+                continue
+            # Numbers (and literals) could be truncated at the end of the buffer.
+            if end == len(self._buffer) and not isinstance(value, (dict, list, str)):
+                if self._read():
+                    continue
+            self._position = end
+            self._compact()
+            return value
+
+    def _expect(self, token):
+        if self._next_token() != token:
+            raise ValueError('Expecting "{}" at position {}'.format(token, self._position))
+
+    def _next_token(self):
+        char = self._peek()
+        self._position += 1
+        return char
+
+    def _peek(self):
+        self._skip_whitespaces()
+        if self._position >= len(self._buffer) and not self._read():
+            raise ValueError('Unexpected end of the response body')
+        return self._buffer[self._position]
+
+    def _skip_whitespaces(self):
+        while True:
+            while self._position < len(self._buffer) and self._buffer[self._position] in ' \t\n\r':
+                self._position += 1
+            if self._position < len(self._buffer) or not self._read():
+                return
+
+    def _read(self):
+        """ Appends the next chunk of the body to the buffer and returns whether data was read. """
+        for chunk in self._chunks:
+            text = self._incremental_decode(chunk) if isinstance(chunk, bytes) else chunk
+            if text:
+                self._buffer += text
+                return True
+        return False
+
+    def _compact(self):
+        """ Drops the already parsed part of the buffer in order to keep memory usage constant. """
+        if self._position > 65536:
+            self._buffer = self._buffer[self._position:]
+            self._position = 0
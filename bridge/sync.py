@@ -0,0 +1,170 @@
+"""
+    Bankin Bridge synchronization helpers
+    =====================================
+
+    This module defines high-level helpers allowing to efficiently retrieve the data of a user,
+    such as ``sync_user_transactions`` which fetches the transactions of many bank accounts
+    concurrently, or the ``IncrementalSync`` class which only retrieves the resources updated
+    since the previous synchronization.
+
+"""
+
+import heapq
+from concurrent.futures import ThreadPoolExecutor
+
+
+def sync_user_transactions(
+    client, accounts=None, since=None, until=None, max_workers=8, page_size=None,
+):
+    """ Lazily yields the transactions of many bank accounts, fetched concurrently.
+
+    One paginated stream is opened per bank account and the pages of all the streams are fetched
+    across a bounded thread pool: each stream has at most one page being fetched in advance while
+    the previous one is being consumed. The streams are merged into a single stream ordered by
+    date, from the most recent transaction to the oldest one (which is the order used by the
+    service).
+
+    :param client: client (or client view) authenticated as the considered user
+    :param accounts: bank accounts (or bank account IDs) to consider (defaults to all the bank
+        accounts of the user)
+    :param since: data to limit the results to the transactions created after the specified date
+    :param until: data to limit the results to the transactions created before the specified date
+    :param max_workers: maximum number of pages fetched simultaneously
+    :param page_size: number of records to request per page (accepted values: 1 - 500)
+    :type client: bridge.client.Client
+    :type accounts: iterable
+    :type since: date or datetime
+    :type until: date or datetime
+    :type max_workers: int
+    :type page_size: int
+    :return: generator yielding the transactions one at a time
+    :rtype: generator
+
+    """
+    if accounts is None:
+        accounts = client.account.iter()
+    account_ids = [a['id'] if isinstance(a, dict) else getattr(a, 'id', a) for a in accounts]
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        streams = [
+            _prefetched_resources(executor, client.transaction.iter_by_account(
+                account_id, since=since, until=until, page_size=page_size,
+            ))
+            for account_id in account_ids
+        ]
+        for transaction in heapq.merge(*streams, key=_transaction_sort_key, reverse=True):
+            yield transaction
+    finally:
+        # The pages prefetched for a consumer that stopped early are never requested.
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+class IncrementalSync:
+    """ Retrieves the resources of a user that were updated since the previous synchronization.
+
+    The state of each synchronization is persisted in a checkpoint store, per user, resource type
+    and bank account: the ``since`` watermark (the most recent ``updated_at`` value seen during
+    the last completed synchronization) and, while a synchronization is in progress, the ``after``
+    cursor of the next page to fetch. An interrupted synchronization thus resumes from the page
+    that was being processed when it stopped: the resources of this page may be yielded twice, so
+    consumers should upsert them.
+
+    """
+
+    def __init__(self, client, store, user_id, page_size=None):
+        """ Initializes the incremental synchronization.
+
+        :param client: client (or client view) authenticated as the considered user
+        :param store: store used to persist the checkpoints
+        :param user_id: identifier of the user, used to build the checkpoint keys
+        :param page_size: number of records to request per page (accepted values: 1 - 500)
+        :type client: bridge.client.Client
+        :type store: bridge.checkpoints.BaseCheckpointStore
+        :type user_id: str
+        :type page_size: int
+
+        """
+        self.client = client
+        self.store = store
+        self.user_id = user_id
+        self.page_size = page_size
+
+    def stocks(self):
+        """ Lazily yields the stocks updated since the previous synchronization. """
+        return self._sync(
+            self.get_key('stocks'), self.client.stock.iter_updated(page_size=self.page_size),
+        )
+
+    def transactions(self, account_id=None):
+        """ Lazily yields the transactions updated since the previous synchronization.
+
+        :param account_id: ID of the bank account to consider (defaults to all the accounts)
+        :type account_id: str or int
+        :return: generator yielding the transactions one at a time
+        :rtype: generator
+
+        """
+        if account_id is None:
+            paginator = self.client.transaction.iter_updated(page_size=self.page_size)
+        else:
+            paginator = self.client.transaction.iter_updated_by_account(
+                account_id, page_size=self.page_size,
+            )
+        return self._sync(self.get_key('transactions', account_id), paginator)
+
+    def get_key(self, resource_type, account_id=None):
+        """ Returns the checkpoint key of the given resource type and bank account. """
+        return '{}:{}:{}'.format(
+            self.user_id, resource_type, account_id if account_id is not None else '*',
+        )
+
+    def reset(self, resource_type, account_id=None):
+        """ Forgets the checkpoint of the given resource type and bank account. """
+        self.store.delete(self.get_key(resource_type, account_id))
+
+    def _sync(self, key, paginator):
+        checkpoint = self.store.get(key) or {'since': None, 'after': None, }
+        paginator.params.update({
+            k: v for k, v in (('since', checkpoint['since']), ('after', checkpoint['after']))
+            if v is not None
+        })
+        watermark = checkpoint.get('pending_since') or checkpoint['since']
+
+        for page in paginator.pages():
+            for resource in page.get('resources', []):
+                updated_at = resource.get('updated_at')
+                if updated_at and (watermark is None or updated_at > watermark):
+                    watermark = updated_at
+                yield resource
+
+            # The whole page was consumed: the synchronization will resume from the next one.
+            next_params = page.get('pagination', {}).get('next') or {}
+            if next_params.get('after') and page.get('resources'):
+                checkpoint['after'] = next_params['after']
+                checkpoint['pending_since'] = watermark
+                self.store.set(key, checkpoint)
+
+        self.store.set(key, {'since': watermark, 'after': None, })
+
+
+def _prefetched_resources(executor, paginator):
+    """ Returns a generator yielding the resources of a paginator whose next page is always
+        fetched in advance. The first page is requested immediately.
+    """
+    pages = paginator.pages()
+    return _iter_prefetched_resources(executor, pages, executor.submit(next, pages, None))
+
+
+def _iter_prefetched_resources(executor, pages, future):
+    while True:
+        page = future.result()
+        if page is None:
+            return
+        future = executor.submit(next, pages, None)
+        for resource in page.get('resources', []):
+            yield resource
+
+
+def _transaction_sort_key(transaction):
+    return (transaction.get('date') or '', transaction.get('id') or 0)
@@ -0,0 +1,260 @@
+"""
+    Bankin Bridge access tokens
+    ===========================
+
+    This module defines the ``TokenManager`` class, which caches the access tokens of many users
+    until they expire (in memory or in a token store), authenticates users again shortly before
+    their token expires and deduplicates concurrent authentications of the same user. Clients
+    returned by ``TokenManager.as_user`` transparently authenticate again and retry a request
+    once when it is rejected with a 401 response.
+
+"""
+
+import hashlib
+import json
+import threading
+import time
+
+import requests
+
+from .client import BankinBridgeOAuth
+from .models import DateTimeField
+from .utils import write_atomically
+
+
+# Lifetime of access tokens whose expiry is not specified by the authentication response.
+DEFAULT_TOKEN_LIFETIME = 2 * 60 * 60
+
+
+class MemoryTokenStore:
+    """ Stores the access tokens in memory. """
+
+    def __init__(self):
+        self._tokens = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """ Returns the token (a dictionary) associated with the given key or ``None``. """
+        with self._lock:
+            token = self._tokens.get(key)
+            return dict(token) if token is not None else None
+
+    def set(self, key, token):
+        """ Associates the given token with the given key. """
+        with self._lock:
+            self._tokens[key] = dict(token)
+
+    def delete(self, key):
+        """ Removes the token associated with the given key, if any. """
+        with self._lock:
+            self._tokens.pop(key, None)
+
+
+class FileTokenStore(MemoryTokenStore):
+    """ Stores the access tokens in a file, which is atomically rewritten on every update.
+
+    The content of the file can be encrypted using the ``encrypt`` and ``decrypt`` hooks (eg. the
+    ``encrypt`` and ``decrypt`` methods of a ``cryptography.fernet.Fernet`` object).
+
+    """
+
+    def __init__(self, path, encrypt=None, decrypt=None):
+        """ Initializes the store.
+
+        :param path: path of the file (created if it does not exist)
+        :param encrypt: function encrypting the content of the file (bytes to bytes)
+        :param decrypt: function decrypting the content of the file (bytes to bytes)
+        :type path: str
+        :type encrypt: callable
+        :type decrypt: callable
+
+        """
+        super().__init__()
+        self.path = path
+        self.encrypt = encrypt
+        self.decrypt = decrypt
+        try:
+            with open(path, 'rb') as f:
+                content = f.read()
+        except FileNotFoundError:
+            content = None
+        if content:
+            self._tokens = json.loads((decrypt(content) if decrypt else content).decode('utf-8'))
+
+    def set(self, key, token):
+        with self._lock:
+            self._tokens[key] = dict(token)
+            self._dump()
+
+    def delete(self, key):
+        with self._lock:
+            if self._tokens.pop(key, None) is not None:
+                self._dump()
+
+    def _dump(self):
+        """ Atomically rewrites the file (only readable by its owner) with the current tokens. """
+        content = json.dumps(self._tokens).encode('utf-8')
+        if self.encrypt is not None:
+            content = self.encrypt(content)
+        write_atomically(self.path, content, mode=0o600)
+
+
+class TokenManager:
+    """ Caches the access tokens of many users and authenticates them again when needed. """
+
+    def __init__(self, client, store=None, refresh_margin=60, clock=time.time):
+        """ Initializes the token manager.
+
+        :param client: client used to authenticate the users
+        :param store: store used to persist the tokens (defaults to an in-memory store)
+        :param refresh_margin: number of seconds before the expiry of a token from which users
+            are authenticated again
+        :param clock: function returning the current UNIX timestamp
+        :type client: bridge.client.Client
+        :type store: bridge.tokens.MemoryTokenStore
+        :type refresh_margin: float
+        :type clock: callable
+
+        """
+        self.client = client
+        self.store = store if store is not None else MemoryTokenStore()
+        self.refresh_margin = refresh_margin
+        self.clock = clock
+        self.authentications = 0
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def get_token(self, user_id, email, password):
+        """ Returns a valid access token of the given user, authenticating the user if needed.
+
+        :param user_id: ID identifying the user in the store
+        :param email: user's email address
+        :param password: user's password
+        :type user_id: str
+        :type email: str
+        :type password: str
+        :return: access token
+        :rtype: str
+
+        """
+        key = str(user_id)
+        token = self.store.get(key)
+        if self._is_valid(token):
+            return token['access_token']
+
+        # Only a single thread authenticates a given user at a time: the other ones wait for it
+        # and then use the token it obtained.
+        with self._get_lock(key):
+            token = self.store.get(key)
+            if self._is_valid(token):
+                return token['access_token']
+            data = self.client.user.authenticate(email, password)
+            with self._lock:
+                self.authentications += 1
+            token = {
+                'access_token': data['access_token'],
+                'expires_at': (
+                    DateTimeField().parse(data['expires_at']).timestamp()
+                    if data.get('expires_at') else self.clock() + DEFAULT_TOKEN_LIFETIME
+                ),
+            }
+            self.store.set(key, token)
+            return token['access_token']
+
+    def invalidate(self, user_id, access_token=None):
+        """ Discards the cached token of the given user (only if it is the given access token, when
+            specified, so that a token obtained in the meantime by another thread is kept).
+        """
+        key = str(user_id)
+        with self._get_lock(key):
+            token = self.store.get(key)
+            if token is not None and access_token in (None, token['access_token']):
+                self.store.delete(key)
+
+    def as_user(self, user_id, email, password):
+        """ Returns a view of the client authenticated as the given user whose access token is
+            obtained from the manager (see ``Client.as_user``).
+
+        :param user_id: ID identifying the user in the store
+        :param email: user's email address
+        :param password: user's password
+        :type user_id: str
+        :type email: str
+        :type password: str
+        :return: :class:`Client <Client>` object
+        :rtype: bridge.client.Client
+
+        """
+        client = self.client.as_user(self.get_token(user_id, email, password))
+        client.auth = ManagedTokenAuth(self, user_id, email, password)
+        return client
+
+    def _get_lock(self, key):
+        with self._lock:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = self._locks[key] = threading.Lock()
+            return lock
+
+    def _is_valid(self, token):
+        return token is not None and token['expires_at'] - self.refresh_margin > self.clock()
+
+
+def authenticate_user(client, user_id, credentials, token_manager=None):
+    """ Returns a view of the client authenticated as a user of a bulk operation (see
+        ``bridge.orchestrator`` and ``bridge.export``).
+
+    :param client: client used to authenticate the user
+    :param user_id: ID identifying the user in the token manager
+    :param credentials: dictionary containing either an ``access_token`` key or ``email`` and
+        ``password`` keys
+    :param token_manager: token manager used to obtain the access token of a user authenticated
+        using its email and password
+    :type client: bridge.client.Client
+    :type user_id: str
+    :type credentials: dictionary
+    :type token_manager: bridge.tokens.TokenManager
+    :return: :class:`Client <Client>` object
+    :rtype: bridge.client.Client
+
+    """
+    access_token = credentials.get('access_token')
+    if access_token is None and token_manager is not None:
+        return token_manager.as_user(user_id, credentials['email'], credentials['password'])
+    if access_token is None:
+        access_token = client.user.authenticate(
+            credentials['email'], credentials['password'],
+        )['access_token']
+    return client.as_user(access_token)
+
+
+class ManagedTokenAuth(requests.auth.AuthBase):
+    """ Authentication using the access token of a user provided by a ``TokenManager``.
+
+    The client resolves this object into a ``BankinBridgeOAuth`` object before each request and
+    calls its ``renew`` method when a request is rejected with a 401 response.
+
+    """
+
+    def __init__(self, manager, user_id, email, password):
+        self.manager = manager
+        self.user_id = user_id
+        self._email = email
+        self._password = password
+
+    @property
+    def identity(self):
+        """ Returns an identifier of the user that does not change when its token is renewed. """
+        return hashlib.sha256('user:{}'.format(self.user_id).encode('utf-8')).hexdigest()[:32]
+
+    def resolve(self):
+        """ Returns the authentication to use to send a request. """
+        return BankinBridgeOAuth(self.manager.get_token(self.user_id, self._email, self._password))
+
+    def renew(self, auth):
+        """ Discards the rejected access token used by the given authentication. """
+        self.manager.invalidate(self.user_id, auth._access_token)
+
+    def __call__(self, r):
+        """ Authorizes with the current access token of the user. """
+        return self.resolve()(r)
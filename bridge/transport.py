@@ -0,0 +1,166 @@
+"""
+    Bankin Bridge transports
+    ========================
+
+    This module defines the transports allowing the Bankin Bridge client to send HTTP requests.
+    A transport is any object providing a ``send`` method accepting the HTTP method, the URL and
+    the ``headers``, ``params``, ``json``, ``auth`` and ``timeout`` keyword arguments (and the
+    ``stream`` keyword argument when streaming pages), and returning a response object compatible
+    with ``requests.Response``.
+
+"""
+
+import json
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.exceptions import HTTPError
+
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_TIMEOUT = (10, 60)
+
+# Maximum number of template requests kept by ``PreparedRequestsTransport`` objects.
+MAX_REQUEST_TEMPLATES = 64
+
+
+class RequestsTransport:
+    """ Sends HTTP requests using a pooled ``requests.Session``.
+
+    ``requests`` sessions can be shared between threads as long as their configuration (mounted
+    adapters, default headers, etc) is not modified concurrently, which is never done by the
+    client once initialized.
+
+    """
+
+    def __init__(self, session):
+        """ Initializes the transport.
+
+        :param session: session used to send the requests
+        :type session: requests.Session
+
+        """
+        self.session = session
+
+    @classmethod
+    def from_settings(cls, base_url, max_retries=3, pool_size=None, pool_block=False):
+        """ Creates a transport whose session is mounted with a connection pool for the given URL.
+
+        :param base_url: base URL of the API endpoint
+        :param max_retries: maximum number of retries each connection should attempt
+        :param pool_size: maximum number of connections to keep alive in the pool
+        :param pool_block: whether to wait for a free connection when the pool is exhausted
+        :type base_url: str
+        :type max_retries: int
+        :type pool_size: int
+        :type pool_block: bool
+        :return: :class:`RequestsTransport <RequestsTransport>` object
+        :rtype: bridge.transport.RequestsTransport
+
+        """
+        session = requests.Session()
+        session.mount(base_url, HTTPAdapter(
+            max_retries=max_retries,
+            pool_maxsize=pool_size or DEFAULT_POOL_SIZE,
+            pool_block=pool_block,
+        ))
+        return cls(session)
+
+    def send(
+        self, method, url, headers=None, params=None, json=None, auth=None, timeout=None,
+        stream=False,
+    ):
+        """ Sends a request and returns the corresponding response. When ``stream`` is set, the
+            body of the response is only downloaded as its content is iterated over.
+        """
+        request = getattr(self.session, method.lower())
+        kwargs = {'stream': True, } if stream else {}
+        return request(
+            url, headers=headers, params=params, json=json, auth=auth, timeout=timeout, **kwargs
+        )
+
+
+class PreparedRequestsTransport(RequestsTransport):
+    """ Sends HTTP requests using a pooled ``requests.Session`` while bypassing the per-request
+        work of ``Session.request`` that does not change between requests.
+
+    ``Session.request`` merges the session settings and looks up the proxy, certificate and
+    ``.netrc`` settings from the environment for every request. This transport prepares a
+    template request once per HTTP method and set of headers (and resolves the environment
+    settings once per host), then only copies the template and applies the URL, the query
+    parameters, the body and the authentication of each request before sending it with
+    ``Session.send``. The session settings and the environment are thus assumed not to change
+    once requests were sent; requests fall back to ``Session.request`` when the session holds
+    cookies.
+
+    """
+
+    def __init__(self, session):
+        super().__init__(session)
+        self._templates = {}
+        self._settings = {}
+
+    def send(
+        self, method, url, headers=None, params=None, json=None, auth=None, timeout=None,
+        stream=False,
+    ):
+        """ Sends a request and returns the corresponding response. When ``stream`` is set, the
+            body of the response is only downloaded as its content is iterated over.
+        """
+        if self.session.cookies:
+            return super().send(
+                method, url, headers=headers, params=params, json=json, auth=auth,
+                timeout=timeout, stream=stream,
+            )
+
+        template_key = (method, tuple(headers.items()) if headers else ())
+        template = self._templates.get(template_key)
+        if template is None:
+            template = self.session.prepare_request(
+                requests.Request(method.upper(), url, headers=headers),
+            )
+            # Headers may vary between requests (eg. cache revalidation headers).
+            if len(self._templates) < MAX_REQUEST_TEMPLATES:
+                self._templates[template_key] = template
+        request = template.copy()
+        request.prepare_url(url, params)
+        if json is not None:
+            request.prepare_body(None, None, json)
+        if auth is not None:
+            request.prepare_auth(auth, url)
+
+        settings_key = (url.split('/', 3)[2] if '//' in url else '', stream)
+        settings = self._settings.get(settings_key)
+        if settings is None:
+            settings = self._settings[settings_key] = self.session.merge_environment_settings(
+                url, {}, stream, None, None,
+            )
+        return self.session.send(request, timeout=timeout, allow_redirects=True, **settings)
+
+
+class Response:
+    """ Minimal fully-read HTTP response returned by transports that do not rely on ``requests``
+        (eg. asynchronous or replay transports).
+    """
+
+    __slots__ = ('status_code', 'content', 'headers', 'elapsed', )
+
+    def __init__(self, status_code, content, headers=None, elapsed=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+        self.elapsed = elapsed
+
+    def iter_content(self, chunk_size=1):
+        """ Iterates over the response body in chunks of the given size. """
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i:i + chunk_size]
+
+    def json(self):
+        """ Deserializes the response body. """
+        return json.loads(self.content.decode('utf-8'))
+
+    def raise_for_status(self):
+        """ Raises an ``HTTPError`` if the response is unsuccessful. """
+        if self.status_code >= 400:
+            raise HTTPError('{} error'.format(self.status_code), response=self)
@@ -0,0 +1,65 @@
+"""
+    Bankin Bridge utilities
+    =======================
+
+    This module defines various helpers used across the Bankin Bridge client implementation.
+
+"""
+
+import functools
+import os
+import re
+from urllib.parse import urljoin
+
+
+ID_SEGMENT_RE = re.compile(
+    r'^(\d+|[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})$', re.IGNORECASE,
+)
+
+
+def get_endpoint_template(path):
+    """ Returns the template of the given endpoint path, where identifiers are replaced by
+        ``{id}`` (eg. "accounts/42/transactions" gives "accounts/{id}/transactions").
+    """
+    return '/'.join(
+        '{id}' if ID_SEGMENT_RE.match(segment) else segment
+        for segment in path.strip('/').split('/')
+    )
+
+
+def write_atomically(path, content, mode=0o666):
+    """ Writes the given bytes to a temporary file and moves it over the file at the given path,
+        so that the file is never left partially written.
+
+    :param path: path of the file
+    :param content: content of the file
+    :param mode: permissions of the file when it is created (subject to the umask)
+    :type path: str
+    :type content: bytes
+    :type mode: int
+
+    """
+    tmp_path = '{}.tmp'.format(path)
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, mode)
+    with open(fd, 'wb') as f:
+        f.write(content)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def join_url(base_url, path):
+    """ Returns the URL of the given path relative to the given base URL, without leading or
+        trailing slashes. Gives the same result as ``urljoin(base_url, path).strip('/')`` but
+        simple relative paths (eg. "accounts/42") are appended to the base URL without parsing.
+    """
+    if not path or path[0] == '/' or '.' in path or ':' in path:
+        return urljoin(base_url, path).strip('/')
+    return (_get_url_prefix(base_url) + path).rstrip('/')
+
+
+@functools.lru_cache(maxsize=16)
+def _get_url_prefix(base_url):
+    """ Returns the prefix of the URLs of the relative paths resolved against the given base URL.
+    """
+    return urljoin(base_url, '_')[:-1]
@@ -30,6 +30,15 @@ setup(
     install_requires=[
         'requests>=2.0',
     ],
+    extras_require={
+        'aio': ['aiohttp>=3.0'],
+        'export': ['pyarrow', 'zstandard'],
+    },
+    entry_points={
+        'console_scripts': [
+            'bridge-export=bridge.export:main',
+        ],
+    },
     classifiers=[
         'Development Status :: 3 - Alpha',
         'Environment :: Web Environment',
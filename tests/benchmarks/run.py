@@ -0,0 +1,300 @@
+"""
+    Bankin Bridge benchmarks
+    ========================
+
+    This module runs the client benchmarks against a local mock Bankin Bridge server and writes
+    machine-readable (JSON) results. Results can be compared with a baseline (eg. the results of
+    the previous release) in order to detect performance regressions:
+
+        $ python -m tests.benchmarks.run --output results.json
+        $ python -m tests.benchmarks.run --baseline results.json --tolerance 0.2
+
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import bridge
+from bridge import Client
+from bridge.aggregation import TransactionAggregates
+from bridge.retry import RetryPolicy
+from bridge.serialization import get_json_loads
+from bridge.sync import sync_user_transactions
+from bridge.transport import PreparedRequestsTransport, RequestsTransport, Response
+
+from .server import MockBridgeServer
+
+
+BENCHMARKS = []
+
+
+def benchmark(function):
+    """ Registers a benchmark function; benchmarks accept a scale factor and return a dictionary
+        containing at least the number of ``operations`` performed and the elapsed ``seconds``.
+    """
+    BENCHMARKS.append(function)
+    return function
+
+
+class _StaticTransport:
+    """ Returns the same response to every request without any network I/O. """
+
+    def __init__(self, content):
+        self.content = content
+
+    def send(self, method, url, **kwargs):
+        return Response(200, self.content)
+
+
+class _StaticAdapter(HTTPAdapter):
+    """ Returns the same response to every request sent through a ``requests`` session. """
+
+    def __init__(self, content):
+        super().__init__()
+        self.content = content
+
+    def send(self, request, **kwargs):
+        response = requests.Response()
+        response.status_code = 200
+        response._content = self.content
+        response.request = request
+        response.url = request.url
+        return response
+
+
+def _timed(function, *args, **kwargs):
+    started_at = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - started_at
+
+
+@benchmark
+def call_overhead(scale):
+    """ Measures the overhead of ``Client._call`` itself (no network I/O). """
+    client = Client('id', 'secret', access_token='token', transport=_StaticTransport(b'{"id": 1}'))
+    operations = 20000 * scale
+
+    def _run():
+        for i in range(operations):
+            client.bank.get(i)
+
+    _, seconds = _timed(_run)
+    return {'operations': operations, 'seconds': seconds, }
+
+
+def _requests_overhead_benchmark(transport_class):
+    def _run(scale):
+        session = requests.Session()
+        session.mount('https://', _StaticAdapter(b'{"id": 1}'))
+        client = Client('id', 'secret', access_token='token', transport=transport_class(session))
+        operations = 2000 * scale
+
+        def _calls():
+            for i in range(operations):
+                client.bank.get(i)
+
+        _, seconds = _timed(_calls)
+        return {'operations': operations, 'seconds': seconds, }
+
+    _run.__name__ = 'call_overhead_{}'.format(transport_class.__name__)
+    _run.__doc__ = (
+        'Measures the overhead of ``Client._call`` and of ``requests`` using {} (no network I/O).'
+    ).format(transport_class.__name__)
+    return _run
+
+
+benchmark(_requests_overhead_benchmark(RequestsTransport))
+benchmark(_requests_overhead_benchmark(PreparedRequestsTransport))
+
+
+@benchmark
+def call_roundtrip(scale):
+    """ Measures single-resource calls to the local server (HTTP keep-alive included). """
+    with MockBridgeServer() as server:
+        client = Client('id', 'secret', access_token='token', base_url=server.base_url)
+        operations = 500 * scale
+
+        def _run():
+            for i in range(operations):
+                client.bank.get(i)
+
+        _, seconds = _timed(_run)
+    return {'operations': operations, 'seconds': seconds, }
+
+
+@benchmark
+def pagination(scale):
+    """ Measures the full pagination of a large set of transactions. """
+    with MockBridgeServer(accounts=1, transactions_per_account=20000 * scale) as server:
+        client = Client('id', 'secret', access_token='token', base_url=server.base_url)
+        count, seconds = _timed(
+            lambda: sum(1 for _ in client.transaction.iter_by_account(1, page_size=500)),
+        )
+        requests = server.requests
+    return {'operations': count, 'seconds': seconds, 'requests': requests, }
+
+
+@benchmark
+def pagination_prefetch(scale):
+    """ Measures the full pagination of transactions with a latency, prefetching pages. """
+    with MockBridgeServer(
+        accounts=1, transactions_per_account=5000 * scale, latency=0.01,
+    ) as server:
+        client = Client('id', 'secret', access_token='token', base_url=server.base_url)
+        count, seconds = _timed(lambda: sum(
+            1 for _ in client.transaction.iter_by_account(1, page_size=100, prefetch=2)
+        ))
+    return {'operations': count, 'seconds': seconds, }
+
+
+@benchmark
+def multi_user_sync(scale):
+    """ Measures the concurrent synchronization of the transactions of many users. """
+    users = 8 * scale
+    with MockBridgeServer(accounts=4, transactions_per_account=1000, latency=0.005) as server:
+        client = Client('id', 'secret', base_url=server.base_url, pool_size=32)
+
+        def _sync_user(i):
+            user_client = client.as_user('token-{}'.format(i))
+            return sum(1 for _ in sync_user_transactions(user_client, page_size=500))
+
+        def _run():
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                return sum(executor.map(_sync_user, range(users)))
+
+        count, seconds = _timed(_run)
+    return {'operations': count, 'seconds': seconds, 'users': users, }
+
+
+@benchmark
+def throttled_pagination(scale):
+    """ Measures the pagination of transactions when every 5th request is throttled (429). """
+    with MockBridgeServer(
+        accounts=1, transactions_per_account=5000 * scale, throttle_every=5,
+    ) as server:
+        client = Client(
+            'id', 'secret', access_token='token', base_url=server.base_url,
+            retry=RetryPolicy(max_retries=5, backoff_factor=0.001),
+        )
+        count, seconds = _timed(
+            lambda: sum(1 for _ in client.transaction.iter_by_account(1, page_size=100)),
+        )
+        throttled = server.throttled
+    return {'operations': count, 'seconds': seconds, 'throttled': throttled, }
+
+
+def _decode_benchmark(decoder):
+    def _run(scale):
+        server = MockBridgeServer(transactions_per_account=500)
+        page = json.dumps({
+            'resources': [server.get_transaction(1, i) for i in range(500)],
+            'pagination': {'previous_uri': None, 'next_uri': None, },
+        }).encode('utf-8')
+        loads = get_json_loads(decoder)
+        operations = 200 * scale
+
+        def _decode():
+            for _ in range(operations):
+                loads(page)
+
+        _, seconds = _timed(_decode)
+        return {'operations': operations * 500, 'seconds': seconds, 'page_bytes': len(page), }
+
+    _run.__name__ = 'json_decode_{}'.format(decoder)
+    _run.__doc__ = 'Measures the decoding of pages of transactions using {}.'.format(decoder)
+    return _run
+
+
+benchmark(_decode_benchmark('json'))
+try:
+    get_json_loads('orjson')
+except ImportError:  # pragma: no cover
+    pass
+else:
+    benchmark(_decode_benchmark('orjson'))
+
+
+@benchmark
+def aggregation(scale):
+    """ Measures the aggregation of transactions (balances, cash flow and category totals). """
+    server = MockBridgeServer(transactions_per_account=1000)
+    transactions = [
+        server.get_transaction(account_id, i)
+        for account_id in range(1, 20 * scale + 1) for i in range(1000)
+    ]
+    _, seconds = _timed(lambda: TransactionAggregates().update(transactions))
+    return {'operations': len(transactions), 'seconds': seconds, }
+
+
+def run(names=None, scale=1, repeat=3):
+    """ Runs the benchmarks and returns the results (the best of ``repeat`` runs). """
+    results = {}
+    for function in BENCHMARKS:
+        if names and function.__name__ not in names:
+            continue
+        runs = [function(scale) for _ in range(repeat)]
+        best = min(runs, key=lambda r: r['seconds'])
+        results[function.__name__] = dict(
+            best,
+            description=function.__doc__.strip(),
+            ops_per_second=best['operations'] / best['seconds'] if best['seconds'] else None,
+        )
+    return {
+        'version': bridge.__version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': time.time(),
+        'scale': scale,
+        'results': results,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """ Returns the names of the benchmarks whose throughput regressed compared to the baseline.
+    """
+    regressions = []
+    for name, result in results['results'].items():
+        reference = baseline['results'].get(name)
+        if not reference or not reference.get('ops_per_second') or not result['ops_per_second']:
+            continue
+        if result['ops_per_second'] < reference['ops_per_second'] * (1 - tolerance):
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Runs the Bankin Bridge client benchmarks.')
+    parser.add_argument('names', nargs='*', help='names of the benchmarks to run (default: all)')
+    parser.add_argument('--output', help='path of the JSON file to write the results to')
+    parser.add_argument('--baseline', help='path of the JSON results to compare with')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed slowdown ratio')
+    parser.add_argument('--scale', type=int, default=1, help='scale factor of the workloads')
+    parser.add_argument('--repeat', type=int, default=3, help='number of runs per benchmark')
+    args = parser.parse_args(argv)
+
+    results = run(args.names, scale=args.scale, repeat=args.repeat)
+    output = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for name in regressions:
+            print('Regression: {}'.format(name), file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,169 @@
+"""
+    Mock Bankin Bridge server
+    =========================
+
+    This module defines a local stand-in HTTP server emulating the Bankin Bridge API endpoints used
+    by the benchmarks: cursor-paginated accounts and transactions, single resources, configurable
+    latency and payload sizes, and 429 throttling.
+
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+
+DEFAULT_PAGE_SIZE = 50
+
+
+class MockBridgeServer:
+    """ Serves emulated Bankin Bridge API responses from a background thread. """
+
+    def __init__(
+        self, accounts=4, transactions_per_account=1000, latency=0, description_size=32,
+        throttle_every=None,
+    ):
+        """ Initializes the server.
+
+        :param accounts: number of bank accounts of every user
+        :param transactions_per_account: number of transactions of every bank account
+        :param latency: number of seconds to wait before sending each response
+        :param description_size: length of the description of the transactions (payload size)
+        :param throttle_every: if set, every n-th request is rejected with a 429 response
+        :type accounts: int
+        :type transactions_per_account: int
+        :type latency: float
+        :type description_size: int
+        :type throttle_every: int
+
+        """
+        self.accounts = accounts
+        self.transactions_per_account = transactions_per_account
+        self.latency = latency
+        self.description_size = description_size
+        self.throttle_every = throttle_every
+        self.requests = 0
+        self.throttled = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    @property
+    def base_url(self):
+        """ Returns the base URL to use to initialize the clients. """
+        return 'http://127.0.0.1:{}/v2/'.format(self._server.server_address[1])
+
+    def start(self):
+        """ Starts serving requests on a random port. """
+        handler = type('Handler', (_RequestHandler, ), {'mock': self, })
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """ Stops the server. """
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def get_transaction(self, account_id, index):
+        """ Returns the emulated transaction at the given index (most recent first). """
+        day = 1 + index % 28
+        return {
+            'id': account_id * 10 ** 7 + index,
+            'resource_uri': '/v2/transactions/{}'.format(account_id * 10 ** 7 + index),
+            'resource_type': 'transaction',
+            'description': ('Transaction {} '.format(index) * self.description_size)[
+                :self.description_size
+            ],
+            'raw_description': 'CB TRANSACTION {}'.format(index),
+            'amount': -round(10 + (index * 7.31) % 990, 2),
+            'date': '2019-{:02d}-{:02d}'.format(12 - (index // 28) % 12, 29 - day),
+            'updated_at': '2019-04-02T13:15:51.000Z',
+            'currency_code': 'EUR',
+            'is_deleted': False,
+            'category': {'id': 1 + index % 300, 'resource_uri': '/v2/categories/1', },
+            'account': {'id': account_id, 'resource_uri': '/v2/accounts/{}'.format(account_id), },
+            'is_future': False,
+        }
+
+    def handle(self, method, path, params):
+        """ Returns the status code, the headers and the body of the response to a request. """
+        with self._lock:
+            self.requests += 1
+            throttle = (
+                self.throttle_every is not None and self.requests % self.throttle_every == 0
+            )
+            if throttle:
+                self.throttled += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if throttle:
+            return 429, {'Retry-After': '0', }, {'type': 'too_many_requests', }
+
+        segments = path.strip('/').split('/')[1:]
+        if segments == ['accounts']:
+            resources = [
+                {'id': i, 'name': 'Account {}'.format(i), 'balance': 1000.0, 'item': {'id': 1}}
+                for i in range(1, self.accounts + 1)
+            ]
+            return self._paginate(path, params, len(resources), lambda i: resources[i])
+        elif len(segments) == 3 and segments[0] == 'accounts' and segments[2] == 'transactions':
+            account_id = int(segments[1])
+            return self._paginate(
+                path, params, self.transactions_per_account,
+                lambda i: self.get_transaction(account_id, i),
+            )
+        elif segments == ['transactions']:
+            total = self.accounts * self.transactions_per_account
+            return self._paginate(path, params, total, lambda i: self.get_transaction(
+                1 + i // self.transactions_per_account, i % self.transactions_per_account,
+            ))
+        elif len(segments) == 2 and segments[0] in ('banks', 'categories', ):
+            return 200, {}, {'id': int(segments[1]), 'name': 'Resource {}'.format(segments[1]), }
+        return 404, {}, {'type': 'not_found', }
+
+    def _paginate(self, path, params, total, get_resource):
+        offset = int(params.get('after') or 0)
+        limit = int(params.get('limit') or DEFAULT_PAGE_SIZE)
+        end = min(total, offset + limit)
+        next_uri = None
+        if end < total:
+            next_uri = '{}?{}'.format(path, urlencode({'after': end, 'limit': limit, }))
+        return 200, {}, {
+            'resources': [get_resource(i) for i in range(offset, end)],
+            'pagination': {'previous_uri': None, 'next_uri': next_uri, },
+        }
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    mock = None
+
+    def do_GET(self):
+        parsed_url = urlparse(self.path)
+        status_code, headers, data = self.mock.handle(
+            'GET', parsed_url.path, dict(parse_qsl(parsed_url.query)),
+        )
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status_code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
@@ -31,3 +31,24 @@ class TestAccount:
 
         assert result == {'results': []}
         assert mocked_get.call_args[0][0] == 'https://sync.bankin.com/v2/accounts'
+
+    @unittest.mock.patch('requests.Session.get')
+    def test_can_iterate_over_all_the_accounts(self, mocked_get):
+        first_response = unittest.mock.Mock(status_code=200, content='{}')
+        first_response.json.return_value = {
+            'resources': [{'id': '1'}],
+            'pagination': {'previous_uri': None, 'next_uri': '/v2/accounts?after=cursor-1'},
+        }
+        last_response = unittest.mock.Mock(status_code=200, content='{}')
+        last_response.json.return_value = {
+            'resources': [{'id': '2'}],
+            'pagination': {'previous_uri': None, 'next_uri': None},
+        }
+        mocked_get.side_effect = [first_response, last_response]
+
+        client = Client('id-123456789', 'secret-123456789', access_token='accesstoken-123456789')
+        result = list(client.account.iter())
+
+        assert result == [{'id': '1'}, {'id': '2'}]
+        assert mocked_get.call_args[0][0] == 'https://sync.bankin.com/v2/accounts'
+        assert mocked_get.call_args[1]['params']['after'] == 'cursor-1'
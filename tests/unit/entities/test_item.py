@@ -113,3 +113,29 @@ class TestItem:
             mocked_get.call_args[0][0] ==
             'https://sync.bankin.com/v2/connect/items/pro/confirmation/url'
         )
+
+    @unittest.mock.patch('time.sleep')
+    @unittest.mock.patch('requests.Session.get')
+    def test_can_wait_for_the_refresh_of_many_items(self, mocked_get, mocked_sleep):
+        statuses = {
+            'https://sync.bankin.com/v2/items/1/refresh/status': [
+                {'status': 'retrieving-data'}, {'status': 'finished'},
+            ],
+            'https://sync.bankin.com/v2/items/2/refresh/status': [{'status': 'finished-error'}],
+        }
+
+        def get(url, **kwargs):
+            mocked_response = unittest.mock.Mock(status_code=200, content='{}')
+            mocked_response.json.return_value = statuses[url].pop(0)
+            return mocked_response
+
+        mocked_get.side_effect = get
+        on_update = unittest.mock.Mock()
+
+        client = Client('id-123456789', 'secret-123456789', access_token='accesstoken-123456789')
+        result = list(client.item.wait_for_refresh([1, 2], on_update=on_update))
+
+        assert result == [(2, {'status': 'finished-error'}), (1, {'status': 'finished'})]
+        assert mocked_get.call_count == 3
+        assert on_update.call_count == 3
+        assert 0.5 <= mocked_sleep.call_args_list[-1][0][0] <= 1
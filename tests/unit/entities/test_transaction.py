@@ -0,0 +1,69 @@
+import datetime as dt
+import unittest.mock
+
+import pytest
+
+from bridge import Client
+
+
+def _page(resources, next_uri=None):
+    response = unittest.mock.Mock(status_code=200, content='{}')
+    response.json.return_value = {
+        'resources': resources,
+        'pagination': {'previous_uri': None, 'next_uri': next_uri},
+    }
+    return response
+
+
+class TestTransaction:
+    @unittest.mock.patch('requests.Session.get')
+    def test_sends_the_date_range_when_listing_transactions(self, mocked_get):
+        mocked_get.return_value = _page([])
+        client = Client('id-123456789', 'secret-123456789', access_token='accesstoken-123456789')
+
+        client.transaction.list(since=dt.date(2019, 1, 1), until=dt.date(2019, 1, 31))
+        client.transaction.list_by_account(
+            42, since=dt.date(2019, 2, 1), until=dt.datetime(2019, 2, 28, 12, 30),
+        )
+
+        assert mocked_get.call_args_list[0][1]['params']['since'] == '2019-01-01'
+        assert mocked_get.call_args_list[0][1]['params']['until'] == '2019-01-31'
+        assert mocked_get.call_args_list[1][0][0] == (
+            'https://sync.bankin.com/v2/accounts/42/transactions'
+        )
+        assert mocked_get.call_args_list[1][1]['params']['since'] == '2019-02-01'
+        assert mocked_get.call_args_list[1][1]['params']['until'] == '2019-02-28T12:30:00'
+
+    def test_validates_date_ranges(self):
+        client = Client('id-123456789', 'secret-123456789')
+
+        with pytest.raises(ValueError):
+            client.transaction.list(since=dt.date(2019, 2, 1), until=dt.date(2019, 1, 1))
+        with pytest.raises(ValueError):
+            client.transaction.iter_by_account(42, since='yesterday')
+        with pytest.raises(ValueError):
+            client.transaction.list_updated(since=1554206400)
+
+    @unittest.mock.patch('requests.Session.get')
+    def test_stops_paginating_once_transactions_fall_outside_the_range(self, mocked_get):
+        mocked_get.side_effect = [
+            _page([
+                {'id': 1, 'date': '2019-02-03'},
+                {'id': 2, 'date': '2019-01-31'},
+                {'id': 3, 'date': '2019-01-15'},
+            ], next_uri='/v2/transactions?after=cursor-1'),
+            _page([
+                {'id': 4, 'date': '2019-01-02'},
+                {'id': 5, 'date': '2018-12-31'},
+            ], next_uri='/v2/transactions?after=cursor-2'),
+            _page([{'id': 6, 'date': '2018-12-30'}]),
+        ]
+        client = Client('id-123456789', 'secret-123456789', access_token='accesstoken-123456789')
+
+        result = list(client.transaction.iter_range(
+            since=dt.date(2019, 1, 1), until=dt.date(2019, 1, 31), page_size=3,
+        ))
+
+        assert [t['id'] for t in result] == [2, 3, 4]
+        assert mocked_get.call_count == 2
+        assert mocked_get.call_args_list[0][1]['params']['until'] == '2019-01-31'
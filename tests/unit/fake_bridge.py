@@ -0,0 +1,104 @@
+import json
+import threading
+import time
+from urllib.parse import urlparse
+
+from bridge.transport import Response
+
+
+class FakeBridgeTransport:
+    """ Emulates the items, bank accounts and transactions of users identified by their token.
+
+    Every user has a single item and ``accounts`` bank accounts (IDs 1 to ``accounts``) holding
+    ``transactions`` transactions each (the i-th transaction of the bank account N has the ID
+    ``N * 100 + i``). Transactions are listed by bank account or for the whole user, paginated
+    with numeric ``after`` offsets. Transaction pages fail with a 500 error for the tokens listed
+    in ``failing_tokens`` and when starting at or after the ``failing_after`` offset.
+
+    Requests are recorded in ``requests`` and the number of requests running simultaneously is
+    tracked per token (``max_running``) and globally (``max_running_total``).
+
+    """
+
+    def __init__(
+        self, accounts=2, transactions=5, latency=0, failing_tokens=(), failing_after=None,
+    ):
+        self.accounts = accounts
+        self.transactions = transactions
+        self.latency = latency
+        self.failing_tokens = failing_tokens
+        self.failing_after = failing_after
+        self.requests = []
+        self.running = {}
+        self.max_running = {}
+        self.max_running_total = 0
+        self._lock = threading.Lock()
+
+    def send(self, method, url, headers=None, params=None, json=None, auth=None, timeout=None):
+        path = urlparse(url).path.strip('/').split('/')[1:]
+        params = params or {}
+        with self._lock:
+            self.requests.append((path, dict(params)))
+        if path == ['authenticate']:
+            return response({'access_token': 'token-' + params['email']})
+        token = auth._access_token
+        with self._lock:
+            self.running[token] = self.running.get(token, 0) + 1
+            self.max_running[token] = max(self.max_running.get(token, 0), self.running[token])
+            self.max_running_total = max(self.max_running_total, sum(self.running.values()))
+        try:
+            time.sleep(self.latency)
+            return self._get_response(token, path, params)
+        finally:
+            with self._lock:
+                self.running[token] -= 1
+
+    def _get_response(self, token, path, params):
+        if path == ['items']:
+            return page([{'id': 1, 'status': 0, 'bank': {'id': 408}}], None)
+        elif path == ['accounts']:
+            return page([
+                {'id': i, 'name': 'Account {}'.format(i), 'balance': 10.5, 'item': {'id': 1}}
+                for i in range(1, self.accounts + 1)
+            ], None)
+
+        offset = int(params.get('after') or 0)
+        if token in self.failing_tokens or (
+            self.failing_after is not None and offset >= self.failing_after
+        ):
+            return Response(500, b'{"type": "internal_error"}')
+        # Transactions of a bank account or of every bank account of the user.
+        account_ids = [int(path[1])] if path[0] == 'accounts' else range(1, self.accounts + 1)
+        count = len(account_ids) * self.transactions
+        end = min(count, offset + int(params.get('limit') or 50))
+        return page(
+            [
+                self._get_transaction(account_ids[i // self.transactions], i % self.transactions)
+                for i in range(offset, end)
+            ],
+            'after={}'.format(end) if end < count else None,
+        )
+
+    def _get_transaction(self, account_id, index):
+        return {
+            'id': account_id * 100 + index,
+            'amount': -index,
+            'date': '2019-01-01',
+            'account': {'id': account_id},
+        }
+
+
+def page(resources, next_query):
+    """ Returns a response containing a page of the given resources. """
+    return response({
+        'resources': resources,
+        'pagination': {
+            'previous_uri': None,
+            'next_uri': '/v2/x?{}'.format(next_query) if next_query else None,
+        },
+    })
+
+
+def response(data):
+    """ Returns a successful response containing the given JSON data. """
+    return Response(200, json.dumps(data).encode('utf-8'))
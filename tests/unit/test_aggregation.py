@@ -0,0 +1,169 @@
+import pickle
+import random
+import unittest.mock
+
+import pytest
+
+from bridge import Client
+from bridge.aggregation import TransactionAggregates
+from bridge.columnar import TransactionColumns
+
+
+def _transaction(id, amount, date, account_id=1, category_id=None, is_deleted=False):
+    return {
+        'id': id,
+        'amount': amount,
+        'date': date,
+        'account': {'id': account_id},
+        'category': {'id': category_id} if category_id is not None else None,
+        'is_deleted': is_deleted,
+    }
+
+
+TRANSACTIONS = [
+    _transaction(1, 2500.0, '2019-01-02', category_id=230),
+    _transaction(2, -45.5, '2019-01-02', category_id=270),
+    _transaction(3, -12.25, '2019-01-15', category_id=270),
+    _transaction(4, -800.0, '2019-02-01', category_id=180),
+    _transaction(5, 100.0, '2019-02-03', account_id=2),
+    _transaction(6, -10.0, '2019-02-03', account_id=2),
+]
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def vectorized(request, monkeypatch):
+    if request.param == 'python':
+        monkeypatch.setattr('bridge.aggregation.np', None)
+    else:
+        pytest.importorskip('numpy')
+    return request.param
+
+
+class TestTransactionAggregates:
+    def test_computes_the_balances_of_each_account(self, vectorized):
+        aggregates = TransactionAggregates().update(TRANSACTIONS)
+
+        assert len(aggregates) == 6
+        assert aggregates.balances(1) == [
+            ('2019-01-02', 2454.5), ('2019-01-15', 2442.25), ('2019-02-01', 1642.25),
+        ]
+        assert aggregates.balances(2, opening_balance=10) == [('2019-02-03', 100.0)]
+        assert aggregates.balances(1, closing_balance=1000)[-1] == ('2019-02-01', 1000.0)
+
+    def test_computes_the_monthly_cash_flow(self, vectorized):
+        aggregates = TransactionAggregates().update(TRANSACTIONS)
+
+        assert aggregates.monthly_cash_flow() == {
+            '2019-01': {'inflow': 2500.0, 'outflow': -57.75, 'net': 2442.25},
+            '2019-02': {'inflow': 100.0, 'outflow': -810.0, 'net': -710.0},
+        }
+        assert aggregates.monthly_cash_flow(2) == {
+            '2019-02': {'inflow': 100.0, 'outflow': -10.0, 'net': 90.0},
+        }
+
+    def test_computes_the_totals_of_each_category(self, vectorized):
+        aggregates = TransactionAggregates().update(TRANSACTIONS)
+
+        assert aggregates.category_totals() == {230: 2500.0, 270: -57.75, 180: -800.0, None: 90.0}
+        assert aggregates.category_totals('2019-01') == {230: 2500.0, 270: -57.75}
+
+    def test_replaces_updated_and_deleted_transactions(self, vectorized):
+        aggregates = TransactionAggregates().update(TRANSACTIONS)
+
+        aggregates.update({'resources': [
+            _transaction(2, -50.0, '2019-01-03', category_id=270),
+            _transaction(4, -800.0, '2019-02-01', category_id=180, is_deleted=True),
+            _transaction(7, 20.0, '2019-03-01', category_id=230),
+        ]})
+
+        assert len(aggregates) == 7
+        expected = TransactionAggregates().update([
+            _transaction(1, 2500.0, '2019-01-02', category_id=230),
+            _transaction(2, -50.0, '2019-01-03', category_id=270),
+            _transaction(3, -12.25, '2019-01-15', category_id=270),
+            _transaction(5, 100.0, '2019-02-03', account_id=2),
+            _transaction(6, -10.0, '2019-02-03', account_id=2),
+            _transaction(7, 20.0, '2019-03-01', category_id=230),
+        ])
+        assert aggregates.balances(1) == expected.balances(1)
+        assert aggregates.monthly_cash_flow() == expected.monthly_cash_flow()
+        assert aggregates.category_totals() == expected.category_totals()
+        assert '2019-02' not in aggregates.monthly_cash_flow(1)
+
+    def test_keeps_the_last_version_of_a_transaction_within_a_batch(self, vectorized):
+        aggregates = TransactionAggregates().update([
+            _transaction(1, 10.0, '2019-01-01'), _transaction(1, 15.0, '2019-01-01'),
+        ])
+
+        assert aggregates.balances(1) == [('2019-01-01', 15.0)]
+
+    def test_can_merge_aggregates_computed_separately(self, vectorized):
+        left = TransactionAggregates().update(TRANSACTIONS[:3])
+        # Partial aggregates can be computed in other processes.
+        right = pickle.loads(pickle.dumps(TransactionAggregates().update(
+            TRANSACTIONS[3:] + [_transaction(3, -1.0, '2019-01-15', category_id=270)],
+        )))
+
+        merged = left.merge(right)
+
+        assert len(merged) == 6
+        assert merged.category_totals() == {230: 2500.0, 270: -46.5, 180: -800.0, None: 90.0}
+        assert merged.balances(1)[-1] == ('2019-02-01', 1653.5)
+
+        merged.update([_transaction(5, 50.0, '2019-02-03', account_id=2)])
+
+        assert merged.balances(2) == [('2019-02-03', 40.0)]
+
+    def test_gives_the_same_results_with_and_without_numpy(self, monkeypatch):
+        pytest.importorskip('numpy')
+        rng = random.Random(42)
+        transactions = [
+            _transaction(
+                rng.randrange(300), rng.randrange(-10000, 10000) / 100,
+                '2019-{:02d}-{:02d}'.format(rng.randrange(1, 13), rng.randrange(1, 29)),
+                account_id=rng.randrange(1, 4), category_id=rng.choice([None, 1, 2, 3]),
+                is_deleted=rng.random() < 0.1,
+            )
+            for _ in range(2000)
+        ]
+
+        vectorized = TransactionAggregates().update(transactions)
+        monkeypatch.setattr('bridge.aggregation.np', None)
+        python = TransactionAggregates().update(transactions)
+
+        assert vectorized._daily == python._daily
+        assert vectorized._inflow == python._inflow
+        assert vectorized._outflow == python._outflow
+        assert vectorized._categories == python._categories
+
+    def test_accepts_transaction_columns(self):
+        columns = TransactionColumns()
+        columns.extend(TRANSACTIONS)
+
+        aggregates = TransactionAggregates().update(columns)
+
+        assert aggregates.category_totals('2019-02') == {180: -800.0, None: 90.0}
+        with pytest.raises(ValueError):
+            TransactionAggregates(scale=1000).update(columns)
+
+
+class TestTransactionAggregate:
+    @unittest.mock.patch('requests.Session.get')
+    def test_aggregates_every_page(self, mocked_get):
+        first_page = unittest.mock.Mock(status_code=200, content='{}')
+        first_page.json.return_value = {
+            'resources': TRANSACTIONS[:4],
+            'pagination': {'previous_uri': None, 'next_uri': '/v2/transactions?after=c&limit=4'},
+        }
+        last_page = unittest.mock.Mock(status_code=200, content='{}')
+        last_page.json.return_value = {
+            'resources': TRANSACTIONS[4:],
+            'pagination': {'previous_uri': None, 'next_uri': None},
+        }
+        mocked_get.side_effect = [first_page, last_page]
+        client = Client('id-123456789', 'secret-123456789', access_token='accesstoken-123456789')
+
+        aggregates = client.transaction.aggregate(page_size=4)
+
+        assert len(aggregates) == 6
+        assert mocked_get.call_count == 2
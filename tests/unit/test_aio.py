@@ -0,0 +1,242 @@
+import asyncio
+import datetime as dt
+import json
+
+import pytest
+
+from bridge import Client
+from bridge.aio import AiohttpTransport, AsyncClient, AsyncPaginator, Response
+from bridge.exceptions import ProtocolError, TransportError
+
+
+class FakeTransport:
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+        self.closed = False
+
+    async def send(self, method, url, headers=None, params=None, json=None):
+        self.requests.append({
+            'method': method, 'url': url, 'headers': headers, 'params': params, 'json': json,
+        })
+        return self.responses.pop(0)
+
+    async def close(self):
+        self.closed = True
+
+
+def _response(data, status_code=200):
+    return Response(status_code, json.dumps(data).encode('utf-8'))
+
+
+class TestAsyncClient:
+    def test_has_the_attributes_of_the_synchronous_client(self):
+        client = Client('id-123456789', 'secret-123456789', access_token='accesstoken-123456789')
+        async_client = AsyncClient(
+            'id-123456789', 'secret-123456789', access_token='accesstoken-123456789',
+            transport=FakeTransport(),
+        )
+
+        assert vars(async_client).keys() == vars(client).keys()
+        assert async_client.single_flight is None
+
+    def test_can_return_the_details_of_a_single_account(self):
+        transport = FakeTransport(_response({'id': '42'}))
+        client = AsyncClient(
+            'id-123456789', 'secret-123456789', access_token='accesstoken-123456789',
+            transport=transport,
+        )
+
+        result = asyncio.run(client.account.get(42))
+
+        assert result == {'id': '42'}
+        assert transport.requests[0]['method'] == 'GET'
+        assert transport.requests[0]['url'] == 'https://sync.bankin.com/v2/accounts/42'
+        assert transport.requests[0]['params']['client_id'] == 'id-123456789'
+        assert (
+            transport.requests[0]['headers']['Authorization'] == 'Bearer accesstoken-123456789'
+        )
+
+    def test_patches_paginated_responses(self):
+        transport = FakeTransport(_response({
+            'resources': [],
+            'pagination': {'previous_uri': None, 'next_uri': '/v2/banks?after=cursor-1'},
+        }))
+        client = AsyncClient('id-123456789', 'secret-123456789', transport=transport)
+
+        result = asyncio.run(client.bank.list())
+
+        assert result['pagination']['next'] == {'after': 'cursor-1'}
+
+    def test_can_iterate_over_paginated_resources(self):
+        transport = FakeTransport(
+            _response({
+                'resources': [{'id': 1}, {'id': 2}],
+                'pagination': {
+                    'previous_uri': None, 'next_uri': '/v2/transactions?after=cursor-1&limit=2',
+                },
+            }),
+            _response({
+                'resources': [{'id': 3}],
+                'pagination': {'previous_uri': None, 'next_uri': None},
+            }),
+        )
+        client = AsyncClient('id-123456789', 'secret-123456789', transport=transport)
+
+        async def collect():
+            return [t async for t in client.transaction.iter(page_size=2)]
+
+        result = asyncio.run(collect())
+
+        assert [t['id'] for t in result] == [1, 2, 3]
+        assert transport.requests[1]['params']['after'] == 'cursor-1'
+        assert isinstance(client.transaction.iter(), AsyncPaginator)
+
+    def test_can_prefetch_paginated_resources(self):
+        transport = FakeTransport(
+            _response({
+                'resources': [{'id': 1}],
+                'pagination': {'previous_uri': None, 'next_uri': '/v2/banks?after=cursor-1'},
+            }),
+            _response({
+                'resources': [{'id': 2}],
+                'pagination': {'previous_uri': None, 'next_uri': None},
+            }),
+        )
+        client = AsyncClient('id-123456789', 'secret-123456789', transport=transport)
+
+        async def collect():
+            return [b async for b in client.bank.iter(prefetch=1)]
+
+        result = asyncio.run(collect())
+
+        assert [b['id'] for b in result] == [1, 2]
+        assert transport.requests[1]['params']['after'] == 'cursor-1'
+
+    def test_can_wait_for_the_refresh_of_many_items(self):
+        transport = FakeTransport(
+            _response({'status': 'retrieving-data'}),
+            _response({'status': 'info-requested'}),
+            _response({'status': 'finished'}),
+        )
+        client = AsyncClient('id-123456789', 'secret-123456789', transport=transport)
+
+        async def collect():
+            return [
+                r async for r in client.item.wait_for_refresh([1, 2], min_interval=0.001)
+            ]
+
+        result = asyncio.run(collect())
+
+        assert result == [(2, {'status': 'info-requested'}), (1, {'status': 'finished'})]
+        assert transport.requests[2]['url'] == 'https://sync.bankin.com/v2/items/1/refresh/status'
+
+    def test_can_iterate_over_the_transactions_of_a_date_range(self):
+        transport = FakeTransport(_response({
+            'resources': [
+                {'id': 1, 'date': '2019-02-03'},
+                {'id': 2, 'date': '2019-01-31'},
+                {'id': 3, 'date': '2018-12-31'},
+            ],
+            'pagination': {'previous_uri': None, 'next_uri': '/v2/transactions?after=cursor-1'},
+        }))
+        client = AsyncClient('id-123456789', 'secret-123456789', transport=transport)
+
+        async def collect():
+            return [t async for t in client.transaction.iter_range(
+                since=dt.date(2019, 1, 1), until=dt.date(2019, 1, 31),
+            )]
+
+        assert [t['id'] for t in asyncio.run(collect())] == [2]
+        assert len(transport.requests) == 1
+
+    def test_can_aggregate_the_transactions(self):
+        transport = FakeTransport(
+            _response({
+                'resources': [
+                    {'id': 1, 'amount': 100.0, 'date': '2019-02-03', 'account': {'id': 7}},
+                    {'id': 2, 'amount': -30.5, 'date': '2019-01-31', 'account': {'id': 7}},
+                ],
+                'pagination': {'previous_uri': None, 'next_uri': '/v2/transactions?after=c-1'},
+            }),
+            _response({
+                'resources': [
+                    {'id': 3, 'amount': -10.0, 'date': '2019-01-02', 'account': {'id': 7}},
+                ],
+                'pagination': {'previous_uri': None, 'next_uri': None},
+            }),
+        )
+        client = AsyncClient('id-123456789', 'secret-123456789', transport=transport)
+
+        aggregates = asyncio.run(client.transaction.aggregate(page_size=2))
+
+        assert len(aggregates) == 3
+        assert aggregates.balances(7) == [
+            ('2019-01-02', -10.0), ('2019-01-31', -40.5), ('2019-02-03', 59.5),
+        ]
+        assert len(transport.requests) == 2
+
+    def test_can_set_the_access_token_when_authenticating(self):
+        transport = FakeTransport(_response({'access_token': 'accesstoken-123456789'}))
+        client = AsyncClient('id-123456789', 'secret-123456789', transport=transport)
+
+        asyncio.run(client.user.authenticate('test@example.com', 'pwd', set_access_token=True))
+
+        assert client.auth
+
+    def test_raises_a_transport_error_if_an_unsuccessful_is_sent_back_from_the_service(self):
+        transport = FakeTransport(Response(500, b'ERROR'))
+        client = AsyncClient('id-123456789', 'secret-123456789', transport=transport)
+        with pytest.raises(TransportError):
+            asyncio.run(client.item.list())
+
+    def test_raises_a_protocol_error_if_an_error_is_present_in_the_response(self):
+        transport = FakeTransport(_response({'type': 'bad'}, status_code=400))
+        client = AsyncClient('id-123456789', 'secret-123456789', transport=transport)
+        with pytest.raises(ProtocolError):
+            asyncio.run(client.user.authenticate('test@example.com', 'pwd123456'))
+
+    def test_closes_its_transport_when_used_as_a_context_manager(self):
+        transport = FakeTransport()
+
+        async def use():
+            async with AsyncClient('id-123456789', 'secret-123456789', transport=transport):
+                pass
+
+        asyncio.run(use())
+
+        assert transport.closed
+
+
+class FailingSession:
+    """ Emulates an aiohttp session whose connections are always reset. """
+
+    def __init__(self, error_class):
+        self.error_class = error_class
+        self.requests = []
+
+    def request(self, method, url, **kwargs):
+        self.requests.append(method)
+        raise self.error_class()
+
+
+class TestAiohttpTransport:
+    def test_retries_idempotent_requests_on_connection_errors(self):
+        aiohttp = pytest.importorskip('aiohttp')
+        transport = AiohttpTransport(max_retries=2)
+        transport._session = FailingSession(aiohttp.ClientConnectionError)
+
+        with pytest.raises(aiohttp.ClientConnectionError):
+            asyncio.run(transport.send('GET', 'https://sync.bankin.com/v2/items'))
+
+        assert transport._session.requests == ['GET'] * 3
+
+    def test_does_not_retry_non_idempotent_requests_on_connection_errors(self):
+        aiohttp = pytest.importorskip('aiohttp')
+        transport = AiohttpTransport(max_retries=2)
+        transport._session = FailingSession(aiohttp.ClientConnectionError)
+
+        with pytest.raises(aiohttp.ClientConnectionError):
+            asyncio.run(transport.send('POST', 'https://sync.bankin.com/v2/authenticate'))
+
+        assert transport._session.requests == ['POST']
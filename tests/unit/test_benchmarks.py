@@ -0,0 +1,35 @@
+from tests.benchmarks.run import compare
+from tests.benchmarks.server import MockBridgeServer
+
+from bridge import Client
+from bridge.retry import RetryPolicy
+
+
+class TestMockBridgeServer:
+    def test_emulates_the_cursor_pagination(self):
+        with MockBridgeServer(accounts=1, transactions_per_account=25) as server:
+            client = Client('id', 'secret', access_token='token', base_url=server.base_url)
+            result = list(client.transaction.iter_by_account(1, page_size=10))
+
+        assert len(result) == 25
+        assert len({t['id'] for t in result}) == 25
+        assert server.requests == 3
+
+    def test_emulates_throttling(self):
+        with MockBridgeServer(throttle_every=2) as server:
+            client = Client(
+                'id', 'secret', base_url=server.base_url,
+                retry=RetryPolicy(backoff_factor=0.001),
+            )
+            assert client.bank.get(1) == {'id': 1, 'name': 'Resource 1'}
+            assert client.bank.get(2) == {'id': 2, 'name': 'Resource 2'}
+
+        assert server.throttled == 1
+
+
+class TestCompare:
+    def test_detects_throughput_regressions(self):
+        baseline = {'results': {'a': {'ops_per_second': 100}, 'b': {'ops_per_second': 100}}}
+        results = {'results': {'a': {'ops_per_second': 85}, 'b': {'ops_per_second': 75}}}
+
+        assert compare(results, baseline, tolerance=0.2) == ['b']
@@ -0,0 +1,151 @@
+import fnmatch
+import unittest.mock
+
+import pytest
+
+from bridge import Client
+from bridge.cache import KeyValueCacheBackend, MemoryCacheBackend, ResponseCache, SQLiteCacheBackend
+from bridge.client import BankinBridgeOAuth
+
+
+class FakeKeyValueStore:
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value):
+        self.values[key] = value.encode('utf-8')
+
+    def delete(self, key):
+        self.values.pop(key, None)
+
+
+class ScannableKeyValueStore(FakeKeyValueStore):
+    def scan_iter(self, match):
+        return (key for key in list(self.values) if fnmatch.fnmatchcase(key, match))
+
+
+def _response(data, status_code=200, headers=None):
+    mocked_response = unittest.mock.Mock(
+        status_code=status_code, content='{}' if data is not None else '', headers=headers or {},
+    )
+    mocked_response.json.return_value = data
+    return mocked_response
+
+
+class TestCacheBackends:
+    @pytest.mark.parametrize('backend_factory', [
+        lambda tmp_path: MemoryCacheBackend(max_size=2),
+        lambda tmp_path: SQLiteCacheBackend(str(tmp_path / 'cache.db'), max_size=2),
+    ])
+    def test_evict_the_least_recently_used_entries(self, backend_factory, tmp_path):
+        backend = backend_factory(tmp_path)
+        backend.set('a', {'data': '1'})
+        backend.set('b', {'data': '2'})
+        assert backend.get('a') == {'data': '1'}
+        backend.set('c', {'data': '3'})
+        assert backend.get('b') is None
+        assert backend.get('a') == {'data': '1'}
+        assert backend.get('c') == {'data': '3'}
+
+    def test_can_use_a_shared_key_value_store(self):
+        store = FakeKeyValueStore()
+        backend = KeyValueCacheBackend(store)
+        backend.set('GET banks?#', {'data': '{}'})
+        assert backend.get('GET banks?#') == {'data': '{}'}
+        assert all(key.startswith('bridge:') for key in store.values)
+        backend.delete('GET banks?#')
+        assert backend.get('GET banks?#') is None
+
+    def test_clears_the_entries_written_to_a_key_value_store(self):
+        store = FakeKeyValueStore()
+        store.values['other'] = b'1'
+        backend = KeyValueCacheBackend(store)
+        backend.set('GET banks?#', {'data': '{}'})
+        backend.set('GET categories?#', {'data': '{}'})
+
+        ResponseCache(backend).clear()
+
+        assert store.values == {'other': b'1'}
+
+    def test_clears_every_prefixed_key_of_a_scannable_key_value_store(self):
+        store = ScannableKeyValueStore()
+        store.values['bridge:written-by-another-process'] = b'{}'
+        store.values['other'] = b'1'
+        backend = KeyValueCacheBackend(store)
+        backend.set('GET banks?#', {'data': '{}'})
+
+        backend.clear()
+
+        assert store.values == {'other': b'1'}
+
+
+class TestResponseCache:
+    def test_never_uses_secrets_in_cache_keys(self):
+        cache = ResponseCache()
+        key = cache.get_key('GET', 'banks', {'client_secret': 'secret-123456789', 'limit': 10})
+        assert 'secret' not in key
+        assert 'limit=10' in key
+
+    def test_only_caches_get_requests_of_configured_endpoints(self):
+        cache = ResponseCache()
+        assert cache.get_key('GET', 'categories/42') is not None
+        assert cache.get_key('GET', 'transactions') is None
+        assert cache.get_key('DELETE', 'banks/42') is None
+
+    def test_uses_the_user_identity_for_user_specific_endpoints(self):
+        cache = ResponseCache(ttls={'accounts': 60, 'banks': 60})
+        first_auth = BankinBridgeOAuth('accesstoken-1')
+        second_auth = BankinBridgeOAuth('accesstoken-2')
+        assert (
+            cache.get_key('GET', 'accounts', auth=first_auth) !=
+            cache.get_key('GET', 'accounts', auth=second_auth)
+        )
+        assert 'accesstoken' not in cache.get_key('GET', 'accounts', auth=first_auth)
+        assert (
+            cache.get_key('GET', 'banks', auth=first_auth) ==
+            cache.get_key('GET', 'banks', auth=second_auth)
+        )
+
+
+class TestClientCache:
+    @unittest.mock.patch('requests.Session.get')
+    def test_serves_reference_data_from_the_cache(self, mocked_get):
+        mocked_get.return_value = _response({'resources': [{'id': 1}]})
+        client = Client('id-123456789', 'secret-123456789', cache=ResponseCache())
+
+        first_result = client.bank.list()
+        first_result['resources'].append({'id': 2})
+        second_result = client.bank.list()
+
+        assert second_result['resources'] == [{'id': 1}]
+        assert mocked_get.call_count == 1
+
+    @unittest.mock.patch('requests.Session.get')
+    def test_does_not_cache_non_configured_endpoints(self, mocked_get):
+        mocked_get.return_value = _response({'id': 42})
+        client = Client('id-123456789', 'secret-123456789', cache=ResponseCache())
+
+        client.transaction.get(42)
+        client.transaction.get(42)
+
+        assert mocked_get.call_count == 2
+
+    @unittest.mock.patch('requests.Session.get')
+    def test_revalidates_stale_entries_using_their_etag(self, mocked_get):
+        mocked_get.side_effect = [
+            _response({'id': 42}, headers={'ETag': '"v1"'}),
+            _response(None, status_code=304),
+        ]
+        client = Client('id-123456789', 'secret-123456789', cache=ResponseCache(ttls={
+            'banks/{id}': 60,
+        }))
+
+        assert client.bank.get(42) == {'id': 42}
+        with unittest.mock.patch('bridge.cache.time.time', return_value=10 ** 10):
+            assert client.bank.get(42) == {'id': 42}
+
+        assert mocked_get.call_count == 2
+        assert mocked_get.call_args[1]['headers']['If-None-Match'] == '"v1"'
@@ -0,0 +1,41 @@
+import pytest
+
+from bridge.checkpoints import JSONFileCheckpointStore, MemoryCheckpointStore, SQLiteCheckpointStore
+
+
+@pytest.fixture(params=['memory', 'json', 'sqlite'])
+def store_factory(request, tmp_path):
+    factories = {
+        'memory': lambda: MemoryCheckpointStore(),
+        'json': lambda: JSONFileCheckpointStore(str(tmp_path / 'checkpoints.json')),
+        'sqlite': lambda: SQLiteCheckpointStore(str(tmp_path / 'checkpoints.db')),
+    }
+    return factories[request.param]
+
+
+class TestCheckpointStores:
+    def test_returns_none_for_unknown_keys(self, store_factory):
+        assert store_factory().get('user:transactions:*') is None
+
+    def test_can_set_and_delete_checkpoints(self, store_factory):
+        store = store_factory()
+        store.set('user:transactions:*', {'since': '2019-01-01', 'after': 'cursor-1'})
+        assert store.get('user:transactions:*') == {'since': '2019-01-01', 'after': 'cursor-1'}
+        store.delete('user:transactions:*')
+        assert store.get('user:transactions:*') is None
+
+    def test_returns_copies_of_the_checkpoints(self, store_factory):
+        store = store_factory()
+        checkpoint = {'since': '2019-01-01', 'after': None}
+        store.set('user:stocks:*', checkpoint)
+        checkpoint['after'] = 'cursor-1'
+        store.get('user:stocks:*')['since'] = None
+        assert store.get('user:stocks:*') == {'since': '2019-01-01', 'after': None}
+
+    @pytest.mark.parametrize('store_class', [JSONFileCheckpointStore, SQLiteCheckpointStore])
+    def test_persists_the_checkpoints(self, store_class, tmp_path):
+        path = str(tmp_path / 'checkpoints')
+        store_class(path).set('user:transactions:42', {'since': '2019-01-01', 'after': None})
+        assert store_class(path).get('user:transactions:42') == {
+            'since': '2019-01-01', 'after': None,
+        }
@@ -1,4 +1,5 @@
 import unittest.mock
+from concurrent.futures import ThreadPoolExecutor
 
 import pytest
 from requests.exceptions import HTTPError
@@ -51,3 +52,73 @@ class TestClient:
         client.set_access_token('accesstoken-123456789')
         client.remove_auth()
         assert not client.auth
+
+    def test_can_return_a_view_authenticated_as_a_specific_user(self):
+        client = Client('id-123456789', 'secret-123456789')
+        user_client = client.as_user('accesstoken-123456789')
+        assert user_client.session is client.session
+        assert user_client.auth
+        assert not client.auth
+        assert user_client.account._client is user_client
+        assert client.account._client is client
+
+    @unittest.mock.patch('requests.Session.get')
+    def test_views_do_not_share_their_authentication(self, mocked_get):
+        mocked_response = unittest.mock.Mock(status_code=200, content='{}')
+        mocked_response.json.return_value = {}
+        mocked_get.return_value = mocked_response
+        client = Client('id-123456789', 'secret-123456789')
+        first_client = client.as_user('accesstoken-1')
+        second_client = client.as_user('accesstoken-2')
+        first_client.item.get(1)
+        second_client.remove_auth()
+        first_client.item.get(2)
+        r = unittest.mock.MagicMock()
+        r.headers = {}
+        mocked_get.call_args[1]['auth'](r)
+        assert r.headers['Authorization'] == 'Bearer accesstoken-1'
+        assert not second_client.auth
+
+    def test_can_configure_its_connection_pool(self):
+        client = Client('id-123456789', 'secret-123456789', pool_size=64, pool_block=True)
+        adapter = client.session.get_adapter(client.api_endpoint)
+        assert adapter._pool_maxsize == 64
+        assert adapter._pool_block
+
+    @unittest.mock.patch('requests.Session.get')
+    def test_sends_requests_with_the_configured_timeout(self, mocked_get):
+        mocked_response = unittest.mock.Mock(status_code=200, content='{}')
+        mocked_response.json.return_value = {}
+        mocked_get.return_value = mocked_response
+        client = Client('id-123456789', 'secret-123456789', timeout=(1, 5))
+        client.item.get(42)
+        assert mocked_get.call_args[1]['timeout'] == (1, 5)
+
+    def test_can_use_a_custom_transport(self):
+        mocked_response = unittest.mock.Mock(status_code=200, content='{}')
+        mocked_response.json.return_value = {'id': '42'}
+        transport = unittest.mock.Mock()
+        transport.send.return_value = mocked_response
+        client = Client('id-123456789', 'secret-123456789', transport=transport)
+        assert client.item.get(42) == {'id': '42'}
+        assert transport.send.call_args[0] == ('GET', 'https://sync.bankin.com/v2/items/42')
+
+    @unittest.mock.patch('requests.Session.get')
+    def test_can_be_shared_between_threads(self, mocked_get):
+        def get(url, **kwargs):
+            r = unittest.mock.MagicMock()
+            r.headers = {}
+            kwargs['auth'](r)
+            mocked_response = unittest.mock.Mock(status_code=200, content='{}')
+            mocked_response.json.return_value = {'authorization': r.headers['Authorization']}
+            return mocked_response
+
+        mocked_get.side_effect = get
+        client = Client('id-123456789', 'secret-123456789', pool_size=16)
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            results = list(executor.map(
+                lambda i: client.as_user('accesstoken-{}'.format(i)).item.get(i), range(200),
+            ))
+        assert [r['authorization'] for r in results] == [
+            'Bearer accesstoken-{}'.format(i) for i in range(200)
+        ]
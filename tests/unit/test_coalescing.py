@@ -0,0 +1,144 @@
+import copy
+import threading
+import time
+import unittest.mock
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from bridge import Client
+from bridge.client import BankinBridgeOAuth
+from bridge.coalescing import SingleFlight
+
+
+def _wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+class TestSingleFlight:
+    def test_builds_keys_for_get_requests_only(self):
+        single_flight = SingleFlight()
+
+        assert single_flight.get_key('POST', 'items/42/mfa') is None
+        assert (
+            single_flight.get_key('GET', 'banks', {'limit': 2, 'client_secret': 'secret'}) ==
+            'GET banks?limit=2#'
+        )
+
+    def test_builds_keys_depending_on_the_authenticated_user(self):
+        single_flight = SingleFlight()
+
+        assert (
+            single_flight.get_key('GET', 'items/42', auth=BankinBridgeOAuth('token-1')) !=
+            single_flight.get_key('GET', 'items/42', auth=BankinBridgeOAuth('token-2'))
+        )
+
+    def test_shares_the_result_of_in_flight_calls(self):
+        single_flight = SingleFlight()
+        release = threading.Event()
+        function = unittest.mock.Mock(side_effect=lambda: release.wait() and {'id': 42})
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(single_flight.call, 'key', function) for _ in range(4)]
+            _wait_for(lambda: single_flight.hits == 3)
+            release.set()
+            results = [f.result() for f in futures]
+
+        assert results == [{'id': 42}] * 4
+        assert len({id(r) for r in results}) == 4
+        assert function.call_count == 1
+        assert single_flight.misses == 1
+
+    def test_copies_a_snapshot_that_the_caller_performing_the_call_cannot_modify(self):
+        single_flight = SingleFlight()
+        release = threading.Event()
+        modified = threading.Event()
+        deepcopy = copy.deepcopy
+        leader_threads = []
+
+        def function():
+            release.wait()
+            return {'resources': [{'id': 1}], 'pagination': {}}
+
+        def delayed_deepcopy(value):
+            # Waiters only copy the result once the leader has modified its own result.
+            if threading.current_thread() not in leader_threads:
+                modified.wait(1)
+            return deepcopy(value)
+
+        def lead():
+            leader_threads.append(threading.current_thread())
+            result = single_flight.call('key', function)
+            result['resources'].append({'id': 2})
+            result['pagination']['next'] = {'after': 'cursor'}
+            modified.set()
+            return result
+
+        with unittest.mock.patch('bridge.coalescing.copy.deepcopy', delayed_deepcopy):
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                leader_future = executor.submit(lead)
+                _wait_for(lambda: single_flight.misses == 1)
+                futures = [
+                    executor.submit(single_flight.call, 'key', function) for _ in range(3)
+                ]
+                _wait_for(lambda: single_flight.hits == 3)
+                release.set()
+                results = [f.result() for f in futures]
+
+        assert leader_future.result()['resources'] == [{'id': 1}, {'id': 2}]
+        assert results == [{'resources': [{'id': 1}], 'pagination': {}}] * 3
+
+    def test_shares_the_exception_of_in_flight_calls(self):
+        single_flight = SingleFlight()
+        release = threading.Event()
+
+        def function():
+            release.wait()
+            raise ValueError('error')
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [executor.submit(single_flight.call, 'key', function) for _ in range(2)]
+            _wait_for(lambda: single_flight.hits == 1)
+            release.set()
+            for future in futures:
+                with pytest.raises(ValueError):
+                    future.result()
+
+    def test_does_not_share_completed_calls(self):
+        single_flight = SingleFlight()
+
+        single_flight.call('key', dict)
+        single_flight.call('key', dict)
+
+        assert single_flight.hits == 0
+        assert single_flight.misses == 2
+
+
+class TestClientCoalescing:
+    @unittest.mock.patch('requests.Session.get')
+    def test_coalesces_identical_concurrent_requests(self, mocked_get):
+        release = threading.Event()
+
+        def get(url, **kwargs):
+            release.wait()
+            mocked_response = unittest.mock.Mock(status_code=200, content='{}')
+            mocked_response.json.return_value = {'status': 'finished'}
+            return mocked_response
+
+        mocked_get.side_effect = get
+        client = Client(
+            'id-123456789', 'secret-123456789', access_token='accesstoken-123456789',
+            single_flight=SingleFlight(),
+        )
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futures = [executor.submit(client.item.get_refresh_status, 42) for _ in range(8)]
+            _wait_for(lambda: client.single_flight.hits == 7)
+            release.set()
+            results = [f.result() for f in futures]
+
+        assert results == [{'status': 'finished'}] * 8
+        assert mocked_get.call_count == 1
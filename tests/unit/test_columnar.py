@@ -0,0 +1,97 @@
+import unittest.mock
+
+import pytest
+
+from bridge import Client
+from bridge.columnar import TransactionColumns
+
+
+TRANSACTIONS = [
+    {
+        'id': 1, 'amount': -24.1, 'date': '2019-03-12', 'description': 'Groceries',
+        'currency_code': 'EUR', 'is_deleted': False, 'category': {'id': 273}, 'account': {'id': 7},
+    },
+    {
+        'id': 2, 'amount': 1500.0, 'date': '2019-03-01', 'description': 'Salary',
+        'currency_code': 'EUR', 'is_deleted': False, 'category': None, 'account': {'id': 7},
+    },
+    {
+        'id': 3, 'amount': -3.99, 'date': '2019-03-12', 'description': 'Groceries',
+        'currency_code': 'EUR', 'is_deleted': True, 'category': {'id': 273}, 'account': {'id': 8},
+    },
+]
+
+
+class TestTransactionColumns:
+    def test_appends_transactions_to_compact_buffers(self):
+        columns = TransactionColumns()
+        columns.extend(TRANSACTIONS)
+
+        assert len(columns) == 3
+        assert columns.id.tolist() == [1, 2, 3]
+        assert columns.amount.tolist() == [-2410, 150000, -399]
+        assert columns.date.tolist() == [17967, 17956, 17967]
+        assert columns.category_id.tolist() == [273, -1, 273]
+        assert columns.is_deleted.tolist() == [0, 0, 1]
+
+    def test_interns_strings(self):
+        columns = TransactionColumns()
+        columns.extend(TRANSACTIONS)
+
+        assert columns.description.values == ['Groceries', 'Salary']
+        assert columns.description.codes.tolist() == [0, 1, 0]
+        assert columns.description.decode() == ['Groceries', 'Salary', 'Groceries']
+
+    def test_can_be_converted_to_numpy_arrays(self):
+        np = pytest.importorskip('numpy')
+        columns = TransactionColumns()
+        columns.extend(TRANSACTIONS)
+
+        arrays = columns.to_numpy()
+
+        assert arrays['id'].dtype == np.int64
+        assert arrays['date'][0] == np.datetime64('2019-03-12')
+        assert arrays['description'].tolist() == ['Groceries', 'Salary', 'Groceries']
+        assert arrays['is_deleted'].tolist() == [False, False, True]
+
+    def test_can_be_converted_to_a_pandas_dataframe(self):
+        pytest.importorskip('pandas')
+        columns = TransactionColumns()
+        columns.extend(TRANSACTIONS)
+
+        df = columns.to_pandas()
+
+        assert df['amount'].tolist() == [-24.1, 1500.0, -3.99]
+        assert df['description'].tolist() == ['Groceries', 'Salary', 'Groceries']
+
+    def test_can_be_converted_to_an_arrow_table(self):
+        pytest.importorskip('pyarrow')
+        columns = TransactionColumns()
+        columns.extend(TRANSACTIONS)
+
+        table = columns.to_arrow()
+
+        assert table.column('id').to_pylist() == [1, 2, 3]
+        assert table.column('description').to_pylist() == ['Groceries', 'Salary', 'Groceries']
+
+
+class TestTransactionToColumns:
+    @unittest.mock.patch('requests.Session.get')
+    def test_streams_all_the_pages_into_columns(self, mocked_get):
+        first_response = unittest.mock.Mock(status_code=200, content='{}')
+        first_response.json.return_value = {
+            'resources': TRANSACTIONS[:2],
+            'pagination': {'previous_uri': None, 'next_uri': '/v2/transactions?after=cursor-1'},
+        }
+        last_response = unittest.mock.Mock(status_code=200, content='{}')
+        last_response.json.return_value = {
+            'resources': TRANSACTIONS[2:],
+            'pagination': {'previous_uri': None, 'next_uri': None},
+        }
+        mocked_get.side_effect = [first_response, last_response]
+
+        client = Client('id-123456789', 'secret-123456789', access_token='accesstoken-123456789')
+        columns = client.transaction.to_columns()
+
+        assert columns.id.tolist() == [1, 2, 3]
+        assert mocked_get.call_args_list[0][1]['params']['limit'] == 500
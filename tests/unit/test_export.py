@@ -0,0 +1,170 @@
+import csv
+import gzip
+import json
+
+import pytest
+from tests.unit.fake_bridge import FakeBridgeTransport
+
+from bridge import Client
+from bridge.checkpoints import JSONFileCheckpointStore
+from bridge.export import Exporter, main
+
+
+def _read_ndjson(paths):
+    resources = []
+    for path in sorted(paths):
+        with gzip.open(str(path), 'rt') if path.ext == '.gz' else path.open() as f:
+            resources.extend(json.loads(line) for line in f)
+    return resources
+
+
+class TestExporter:
+    def test_exports_the_resources_of_every_user_to_part_files(self, tmpdir):
+        exporter = Exporter(
+            Client('id', 'secret', transport=FakeBridgeTransport(accounts=1, transactions=5)),
+            str(tmpdir), max_workers=2, page_size=2, pages_per_part=2,
+        )
+
+        report = exporter.run([
+            {'user_id': 1, 'access_token': 'token-a'},
+            {'user_id': 2, 'email': 'b', 'password': 'pwd'},
+        ])
+
+        assert report.completed == 2
+        assert report.failed == {}
+        assert report.counts == {'items': 2, 'accounts': 2, 'transactions': 10, }
+        assert report.files == 8
+        assert 'Exported 14 resources' in report.summary()
+        user_directory = tmpdir.join('2')
+        assert sorted(p.basename for p in user_directory.listdir()) == [
+            'accounts-00000.ndjson', 'items-00000.ndjson', 'transactions-00000.ndjson',
+            'transactions-00001.ndjson',
+        ]
+        assert [t['id'] for t in _read_ndjson(
+            [p for p in user_directory.listdir() if p.basename.startswith('transactions')],
+        )] == [100, 101, 102, 103, 104]
+
+    def test_reports_the_users_without_user_id_as_failed(self, tmpdir):
+        exporter = Exporter(
+            Client('id', 'secret', transport=FakeBridgeTransport(accounts=1, transactions=1)),
+            str(tmpdir), resource_types=('transactions', ),
+        )
+
+        report = exporter.run([{'access_token': 'token-a'}, {'user_id': 1, 'access_token': 'b'}])
+
+        assert report.completed == 1
+        assert list(report.failed) == ['#1']
+        assert isinstance(report.failed['#1'], ValueError)
+        assert report.counts == {'transactions': 1, }
+
+    def test_can_write_compressed_csv_files(self, tmpdir):
+        exporter = Exporter(
+            Client('id', 'secret', transport=FakeBridgeTransport(accounts=1, transactions=3)),
+            str(tmpdir), format='csv', compression='gzip', resource_types=('transactions', ),
+        )
+
+        exporter.run([{'user_id': 'u', 'access_token': 'token-a'}])
+
+        with gzip.open(str(tmpdir.join('u', 'transactions-00000.csv.gz')), 'rt') as f:
+            rows = list(csv.DictReader(f))
+        assert [(r['id'], r['amount'], r['account.id']) for r in rows] == [
+            ('100', '0.0', '1'), ('101', '-1.0', '1'), ('102', '-2.0', '1'),
+        ]
+
+    def test_can_write_parquet_files(self, tmpdir):
+        pq = pytest.importorskip('pyarrow.parquet')
+        exporter = Exporter(
+            Client('id', 'secret', transport=FakeBridgeTransport(accounts=1, transactions=3)),
+            str(tmpdir), format='parquet', compression='gzip',
+            resource_types=('accounts', 'transactions', ),
+        )
+
+        exporter.run([{'user_id': 'u', 'access_token': 'token-a'}])
+
+        table = pq.read_table(str(tmpdir.join('u', 'transactions-00000.parquet')))
+        assert table.column('id').to_pylist() == [100, 101, 102]
+        assert table.column('account.id').to_pylist() == [1, 1, 1]
+        table = pq.read_table(str(tmpdir.join('u', 'accounts-00000.parquet')))
+        assert table.column('balance').to_pylist() == [10.5]
+
+    def test_resumes_an_interrupted_export_from_the_last_completed_part(self, tmpdir):
+        checkpoints = JSONFileCheckpointStore(str(tmpdir.join('checkpoints.json')))
+        output = tmpdir.join('output')
+        transport = FakeBridgeTransport(accounts=1, transactions=10, failing_after=6)
+        exporter = Exporter(
+            Client('id', 'secret', transport=transport), str(output), page_size=2,
+            pages_per_part=2, checkpoints=checkpoints,
+        )
+
+        report = exporter.run([{'user_id': 'u', 'access_token': 'token-a'}])
+
+        assert list(report.failed) == ['u']
+        assert report.counts == {'items': 1, 'accounts': 1, 'transactions': 4, }
+        assert sorted(p.basename for p in output.join('u').listdir()) == [
+            'accounts-00000.ndjson', 'items-00000.ndjson', 'transactions-00000.ndjson',
+        ]
+
+        transport.failing_after = None
+        transport.requests = []
+        report = exporter.run([{'user_id': 'u', 'access_token': 'token-a'}])
+
+        assert report.completed == 1
+        assert report.counts == {'transactions': 6, }
+        assert transport.requests[0] == (['transactions'], {
+            'limit': 2, 'after': '4', 'client_id': 'id', 'client_secret': 'secret',
+        })
+        assert [t['id'] for t in _read_ndjson(
+            [p for p in output.join('u').listdir() if p.basename.startswith('transactions')],
+        )] == list(range(100, 110))
+
+    def test_cannot_be_used_with_an_unknown_format(self, tmpdir):
+        with pytest.raises(ValueError):
+            Exporter(Client('id', 'secret'), str(tmpdir), format='xml')
+
+    def test_cannot_be_used_with_an_invalid_date_range(self, tmpdir):
+        with pytest.raises(ValueError):
+            Exporter(Client('id', 'secret'), str(tmpdir), since='2019-02-01', until='2019-01-01')
+
+
+class TestMain:
+    def test_exports_the_users_of_a_json_lines_file(self, tmpdir, monkeypatch, capsys):
+        monkeypatch.setattr(
+            'bridge.client.RequestsTransport.from_settings',
+            lambda *args, **kwargs: FakeBridgeTransport(accounts=1),
+        )
+        users = tmpdir.join('users.jsonl')
+        users.write('{"user_id": 1, "access_token": "token-a"}\n\n')
+
+        exit_code = main([
+            str(users), '-o', str(tmpdir.join('output')), '--client-id', 'id',
+            '--client-secret', 'secret', '-c', 'gzip', '--resources', 'items,transactions',
+        ])
+
+        assert exit_code == 0
+        assert 'Exported 6 resources (items: 1, transactions: 5) of 1 users' in (
+            capsys.readouterr().err
+        )
+        assert tmpdir.join('output', '1', 'transactions-00000.ndjson.gz').check()
+
+    @pytest.mark.parametrize('args', [
+        ['--since', 'last week'],
+        ['--until', '2019-13-45'],
+        ['--since', '2019-02-01', '--until', '2019-01-01'],
+    ])
+    def test_rejects_invalid_dates_before_exporting(self, tmpdir, monkeypatch, capsys, args):
+        transport = FakeBridgeTransport(accounts=1)
+        monkeypatch.setattr(
+            'bridge.client.RequestsTransport.from_settings', lambda *args, **kwargs: transport,
+        )
+        users = tmpdir.join('users.jsonl')
+        users.write('{"user_id": 1, "access_token": "token-a"}\n')
+
+        with pytest.raises(SystemExit) as excinfo:
+            main([
+                str(users), '-o', str(tmpdir.join('output')), '--client-id', 'id',
+                '--client-secret', 'secret',
+            ] + args)
+
+        assert excinfo.value.code == 2
+        assert 'usage: bridge-export' in capsys.readouterr().err
+        assert transport.requests == []
@@ -0,0 +1,134 @@
+import asyncio
+import unittest.mock
+
+import pytest
+from requests.exceptions import HTTPError
+
+from bridge import Client
+from bridge.aio import AsyncClient, Response
+from bridge.exceptions import TransportError
+from bridge.instrumentation import (ClientMetrics, Histogram, Instrumentation, OpenTelemetryHooks,
+                                    RequestEvent)
+
+
+def _response(data, content='{"id": 42}', status_code=200):
+    mocked_response = unittest.mock.Mock(status_code=status_code, content=content)
+    mocked_response.json.return_value = data
+    return mocked_response
+
+
+class TestHistogram:
+    def test_can_approximate_quantiles(self):
+        histogram = Histogram(buckets=(0.1, 1, 10))
+        for value in (0.05, 0.5, 0.5, 5, 50):
+            histogram.observe(value)
+
+        assert histogram.counts == [1, 2, 1, 1]
+        assert histogram.count == 5
+        assert histogram.quantile(0.5) == 1
+        assert histogram.quantile(1) == float('inf')
+        assert Histogram().quantile(0.5) is None
+
+
+class TestClientMetrics:
+    def test_aggregates_events_per_endpoint_template(self):
+        metrics = ClientMetrics()
+        for path in ('accounts/42', 'accounts/43'):
+            event = RequestEvent('get', path)
+            event.duration = 0.2
+            event.bytes_received = 10
+            metrics.record(event)
+
+        snapshot = metrics.snapshot()
+
+        assert list(snapshot) == ['GET accounts/{id}']
+        assert snapshot['GET accounts/{id}']['requests'] == 2
+        assert snapshot['GET accounts/{id}']['bytes_received'] == 20
+        assert snapshot['GET accounts/{id}']['latency']['p50'] == 0.25
+
+    def test_can_expose_metrics_using_the_prometheus_format(self):
+        metrics = ClientMetrics(buckets=(0.1, 1))
+        event = RequestEvent('GET', 'banks')
+        event.duration = 0.5
+        metrics.record(event)
+
+        lines = metrics.to_prometheus().splitlines()
+
+        assert 'bridge_client_requests_total{method="GET",endpoint="banks"} 1' in lines
+        assert (
+            'bridge_client_request_duration_seconds_bucket{method="GET",endpoint="banks",le="1"} 1'
+            in lines
+        )
+        assert (
+            'bridge_client_request_duration_seconds_count{method="GET",endpoint="banks"} 1' in lines
+        )
+
+
+class TestInstrumentation:
+    @unittest.mock.patch('requests.Session.get')
+    def test_records_the_metrics_of_the_api_calls(self, mocked_get):
+        mocked_get.return_value = _response({'id': 42})
+        instrumentation = Instrumentation()
+
+        client = Client('id-123456789', 'secret-123456789', instrumentation=instrumentation)
+        client.account.get(42)
+        client.account.get(43)
+
+        metrics = instrumentation.metrics.snapshot()['GET accounts/{id}']
+        assert metrics['requests'] == 2
+        assert metrics['errors'] == 0
+        assert metrics['bytes_received'] == 20
+        assert metrics['latency']['count'] == 2
+
+    @unittest.mock.patch('requests.Session.get')
+    def test_calls_the_hooks_before_and_after_each_call(self, mocked_get):
+        mocked_response = _response({}, content='', status_code=500)
+        mocked_response.raise_for_status.side_effect = HTTPError()
+        mocked_get.return_value = mocked_response
+        before_request, after_request = unittest.mock.Mock(), unittest.mock.Mock()
+
+        client = Client('id-123456789', 'secret-123456789', instrumentation=Instrumentation(
+            before_request=[before_request], after_request=[after_request],
+        ))
+        with pytest.raises(TransportError):
+            client.item.get_refresh_status(42)
+
+        event = after_request.call_args[0][0]
+        assert before_request.call_args[0][0] is event
+        assert event.endpoint == 'items/{id}/refresh/status'
+        assert event.status_code == 500
+        assert isinstance(event.error, TransportError)
+        assert event.duration >= 0
+
+    def test_can_instrument_asyncio_clients(self):
+        class FakeTransport:
+            async def send(self, method, url, headers=None, params=None, json=None):
+                return Response(200, b'{"id": 42}')
+
+        instrumentation = Instrumentation()
+        client = AsyncClient(
+            'id-123456789', 'secret-123456789', transport=FakeTransport(),
+            instrumentation=instrumentation,
+        )
+
+        asyncio.run(client.bank.get(42))
+
+        assert instrumentation.metrics.snapshot()['GET banks/{id}']['bytes_received'] == 10
+
+
+class TestOpenTelemetryHooks:
+    @unittest.mock.patch('requests.Session.get')
+    def test_traces_api_calls_as_spans(self, mocked_get):
+        mocked_get.return_value = _response({'id': 42})
+        tracer = unittest.mock.Mock()
+        hooks = OpenTelemetryHooks(tracer)
+        instrumentation = Instrumentation(metrics=False)
+        instrumentation.add_hooks(hooks.before_request, hooks.after_request)
+
+        client = Client('id-123456789', 'secret-123456789', instrumentation=instrumentation)
+        client.bank.get(42)
+
+        assert tracer.start_span.call_args[0][0] == 'GET banks/{id}'
+        span = tracer.start_span.return_value
+        span.set_attribute.assert_any_call('http.status_code', 200)
+        assert span.end.called
@@ -0,0 +1,79 @@
+import unittest.mock
+from datetime import date, datetime
+
+import pytest
+
+from bridge import Client
+from bridge.mirror import TransactionMirror
+
+
+def _transaction(id, account_id=1, category_id=10, day='2019-04-02', amount=-10.5,
+                 updated_at='2019-04-02T13:15:51.000Z', is_deleted=False):
+    return {
+        'id': id,
+        'amount': amount,
+        'date': day,
+        'updated_at': updated_at,
+        'is_deleted': is_deleted,
+        'category': {'id': category_id, 'resource_uri': '/v2/categories/{}'.format(category_id)},
+        'account': {'id': account_id, 'resource_uri': '/v2/accounts/{}'.format(account_id)},
+    }
+
+
+@pytest.fixture
+def mirror(tmpdir):
+    with TransactionMirror(str(tmpdir.join('mirror.db'))) as mirror:
+        yield mirror
+
+
+class TestTransactionMirror:
+    def test_answers_queries_from_the_stored_transactions(self, mirror):
+        assert mirror.ingest([
+            _transaction(1, account_id=1, day='2019-03-30'),
+            _transaction(2, account_id=1, day='2019-04-02', category_id=20),
+            _transaction(3, account_id=2, day='2019-04-05'),
+        ]) == 3
+
+        assert [t['id'] for t in mirror.query()] == [3, 2, 1]
+        assert [t['id'] for t in mirror.query(account_id=1, since=date(2019, 4, 1))] == [2]
+        assert [t['id'] for t in mirror.query(category_id=10, until=date(2019, 4, 1))] == [1]
+        assert [t['id'] for t in mirror.query(limit=1)] == [3]
+        assert mirror.count(account_id=1) == 2
+        assert mirror.sum_amounts(account_id=2) == -10.5
+        assert mirror.sum_amounts(group_by='category_id') == {10: -21, 20: -10.5}
+
+    def test_upserts_transactions_unless_they_are_stale(self, mirror):
+        mirror.ingest([_transaction(1, amount=-5, updated_at='2019-04-02T13:00:00.000Z')])
+        mirror.ingest([_transaction(1, amount=-6, updated_at='2019-04-03T13:00:00.000Z')])
+        mirror.ingest([_transaction(1, amount=-7, updated_at='2019-04-01T13:00:00.000Z')])
+
+        assert mirror.get(1)['amount'] == -6
+        assert mirror.count() == 1
+        assert mirror.last_updated_at() == '2019-04-03T13:00:00.000Z'
+        assert [t['id'] for t in mirror.query(updated_since=datetime(2019, 4, 3))] == [1]
+        assert mirror.query(updated_since=datetime(2019, 4, 4)) == []
+
+    def test_excludes_deleted_transactions_by_default(self, mirror):
+        mirror.ingest([_transaction(1), _transaction(2)])
+        mirror.ingest([_transaction(2, updated_at='2019-04-03T00:00:00.000Z', is_deleted=True)])
+
+        assert [t['id'] for t in mirror.query()] == [1]
+        assert [t['id'] for t in mirror.query(include_deleted=True)] == [2, 1]
+        assert mirror.get(2)['is_deleted'] is True
+
+    @unittest.mock.patch('requests.Session.get')
+    def test_can_ingest_pages_and_models(self, mocked_get, mirror):
+        mocked_get.return_value = unittest.mock.Mock(status_code=200, content='{}')
+        mocked_get.return_value.json.return_value = {
+            'resources': [_transaction(1), _transaction(2)],
+            'pagination': {'previous_uri': None, 'next_uri': None},
+        }
+        client = Client('id', 'secret', access_token='token', models=True)
+
+        assert mirror.ingest(Client('id', 'secret').transaction.list_updated()) == 2
+        assert mirror.ingest(client.transaction.iter()) == 2
+        assert mirror.get(1)['category'] == {'id': 10}
+
+    def test_rejects_invalid_groupings(self, mirror):
+        with pytest.raises(ValueError):
+            mirror.sum_amounts(group_by='description')
@@ -0,0 +1,101 @@
+import datetime as dt
+import pickle
+import unittest.mock
+from decimal import Decimal
+
+from bridge import Client
+from bridge.models import Account, Transaction, load_models
+
+
+TRANSACTION = {
+    'id': 42,
+    'resource_uri': '/v2/transactions/42',
+    'resource_type': 'transaction',
+    'description': 'Groceries',
+    'raw_description': 'CB GROCERIES 12/03',
+    'amount': -24.1,
+    'date': '2019-03-12',
+    'updated_at': '2019-03-13T08:12:45.123Z',
+    'currency_code': 'EUR',
+    'is_deleted': False,
+    'is_future': False,
+    'category': {'id': 273, 'resource_uri': '/v2/categories/273', 'resource_type': 'category'},
+    'account': {'id': 7, 'resource_uri': '/v2/accounts/7', 'resource_type': 'account'},
+    'show_client_side': True,
+}
+
+
+class TestModels:
+    def test_do_not_have_an_instance_dictionary(self):
+        assert not hasattr(Transaction(TRANSACTION), '__dict__')
+
+    def test_lazily_parse_amounts_and_dates(self):
+        transaction = Transaction(TRANSACTION)
+        assert transaction._amount == -24.1
+        assert transaction.amount == Decimal('-24.1')
+        assert transaction._amount == Decimal('-24.1')
+        assert transaction.date == dt.date(2019, 3, 12)
+        assert transaction.updated_at == dt.datetime(
+            2019, 3, 13, 8, 12, 45, 123000, tzinfo=dt.timezone.utc,
+        )
+
+    def test_flatten_references(self):
+        transaction = Transaction(TRANSACTION)
+        assert transaction.category_id == 273
+        assert transaction.account_id == 7
+
+    def test_keep_unknown_keys(self):
+        transaction = Transaction(TRANSACTION)
+        assert transaction.show_client_side is True
+        assert transaction.extra == {'show_client_side': True}
+
+    def test_can_be_read_using_the_keys_of_the_original_dictionary(self):
+        transaction = Transaction(TRANSACTION)
+        transaction.updated_at
+        assert transaction.get('updated_at') == '2019-03-13T08:12:45.123Z'
+        assert transaction.get('date') == '2019-03-12'
+        assert transaction.get('category') == {'id': 273}
+        assert transaction.get('unknown', 'default') == 'default'
+
+    def test_can_be_converted_back_to_dictionaries(self):
+        data = Transaction(TRANSACTION).to_dict()
+        assert data['amount'] == -24.1
+        assert data['account'] == {'id': 7}
+        assert data['show_client_side'] is True
+
+    def test_can_be_pickled(self):
+        transaction = Transaction(TRANSACTION)
+        assert pickle.loads(pickle.dumps(transaction)) == transaction
+
+    def test_are_only_loaded_for_get_requests_of_known_endpoints(self):
+        assert isinstance(load_models('GET', 'accounts/42', {'id': 42}), Account)
+        assert load_models('DELETE', 'items/42', {}) == {}
+        assert load_models('GET', 'items/add/url', {'redirect_url': 'x'}) == {'redirect_url': 'x'}
+
+
+class TestClientModels:
+    @unittest.mock.patch('requests.Session.get')
+    def test_returns_models_when_enabled(self, mocked_get):
+        mocked_response = unittest.mock.Mock(status_code=200, content='{}')
+        mocked_response.json.return_value = {
+            'resources': [TRANSACTION],
+            'pagination': {'previous_uri': None, 'next_uri': None},
+        }
+        mocked_get.return_value = mocked_response
+
+        client = Client('id-123456789', 'secret-123456789', models=True)
+        result = client.transaction.list()
+
+        assert isinstance(result['resources'][0], Transaction)
+        assert result['resources'][0].amount == Decimal('-24.1')
+        assert [t.id for t in client.transaction.iter()] == [42]
+
+    @unittest.mock.patch('requests.Session.get')
+    def test_returns_dictionaries_by_default(self, mocked_get):
+        mocked_response = unittest.mock.Mock(status_code=200, content='{}')
+        mocked_response.json.return_value = TRANSACTION
+        mocked_get.return_value = mocked_response
+
+        client = Client('id-123456789', 'secret-123456789')
+
+        assert client.transaction.get(42) == TRANSACTION
@@ -0,0 +1,58 @@
+from tests.unit.fake_bridge import FakeBridgeTransport
+
+from bridge import Client
+from bridge.orchestrator import MemorySyncSink, SyncOrchestrator
+
+
+class TestSyncOrchestrator:
+    def test_synchronizes_the_data_of_every_user(self):
+        transport = FakeBridgeTransport(accounts=2, transactions=5)
+        sink = MemorySyncSink()
+        orchestrator = SyncOrchestrator(
+            Client('id', 'secret', transport=transport), sink, max_workers=4, page_size=2,
+        )
+
+        report = orchestrator.run([
+            {'user_id': 1, 'access_token': 'token-a'},
+            {'user_id': 2, 'email': 'b', 'password': 'pwd'},
+        ])
+
+        assert report.completed == 2
+        assert report.failed == {}
+        assert report.counts == {'items': 2, 'accounts': 4, 'transactions': 20, }
+        assert sorted(sink.completed) == [1, 2]
+        assert sorted(t['id'] for t in sink.resources[2]['transactions']) == [
+            100, 101, 102, 103, 104, 200, 201, 202, 203, 204,
+        ]
+
+    def test_bounds_the_concurrency_globally_and_per_user(self):
+        transport = FakeBridgeTransport(accounts=8, transactions=4, latency=0.005)
+        orchestrator = SyncOrchestrator(
+            Client('id', 'secret', transport=transport), MemorySyncSink(), max_workers=6,
+            max_tasks_per_user=2, page_size=2,
+        )
+
+        report = orchestrator.run(
+            {'user_id': i, 'access_token': 'token-{}'.format(i)} for i in range(6)
+        )
+
+        assert report.completed == 6
+        assert transport.max_running_total <= 6
+        assert max(transport.max_running.values()) <= 2
+
+    def test_isolates_the_failures_of_a_user(self):
+        transport = FakeBridgeTransport(failing_tokens=('token-1', ))
+        sink = MemorySyncSink()
+        orchestrator = SyncOrchestrator(
+            Client('id', 'secret', transport=transport, http_max_retries=0), sink, max_workers=2,
+        )
+
+        report = orchestrator.run(
+            {'user_id': i, 'access_token': 'token-{}'.format(i)} for i in range(3)
+        )
+
+        assert report.completed == 2
+        assert list(report.failed) == [1]
+        assert list(sink.failed) == [1]
+        assert sorted(sink.completed) == [0, 2]
+        assert len(sink.resources[2]['transactions']) == 10
@@ -0,0 +1,218 @@
+import json
+import threading
+import unittest.mock
+
+import pytest
+from requests.exceptions import HTTPError
+
+from bridge import Client
+from bridge.exceptions import TransportError
+
+
+def _page(resources, next_uri=None):
+    mocked_response = unittest.mock.Mock(status_code=200, content='{}')
+    mocked_response.json.return_value = {
+        'resources': resources,
+        'pagination': {'previous_uri': None, 'next_uri': next_uri, },
+    }
+    return mocked_response
+
+
+class TestPaginator:
+    @unittest.mock.patch('requests.Session.get')
+    def test_follows_the_next_cursors_until_the_last_page(self, mocked_get):
+        mocked_get.side_effect = [
+            _page([{'id': 1}, {'id': 2}], '/v2/transactions?after=cursor-1&limit=2'),
+            _page([{'id': 3}, {'id': 4}], '/v2/transactions?after=cursor-2&limit=2'),
+            _page([{'id': 5}]),
+        ]
+
+        client = Client('id-123456789', 'secret-123456789', access_token='accesstoken-123456789')
+        result = list(client.transaction.iter(page_size=2))
+
+        assert [r['id'] for r in result] == [1, 2, 3, 4, 5]
+        assert mocked_get.call_count == 3
+        assert mocked_get.call_args_list[0][1]['params']['limit'] == 2
+        assert 'after' not in mocked_get.call_args_list[0][1]['params']
+        assert mocked_get.call_args_list[1][1]['params']['after'] == 'cursor-1'
+        assert mocked_get.call_args_list[2][1]['params']['after'] == 'cursor-2'
+
+    @unittest.mock.patch('requests.Session.get')
+    def test_is_lazy(self, mocked_get):
+        mocked_get.side_effect = [
+            _page([{'id': 1}, {'id': 2}], '/v2/transactions?after=cursor-1&limit=2'),
+            _page([{'id': 3}]),
+        ]
+
+        client = Client('id-123456789', 'secret-123456789', access_token='accesstoken-123456789')
+        iterator = iter(client.transaction.iter())
+
+        assert mocked_get.call_count == 0
+        assert next(iterator) == {'id': 1}
+        assert next(iterator) == {'id': 2}
+        assert mocked_get.call_count == 1
+        assert next(iterator) == {'id': 3}
+        assert mocked_get.call_count == 2
+
+    @unittest.mock.patch('requests.Session.get')
+    def test_stops_once_max_items_resources_were_yielded(self, mocked_get):
+        mocked_get.side_effect = [
+            _page([{'id': 1}, {'id': 2}], '/v2/accounts/42/transactions?after=cursor-1&limit=2'),
+            _page([{'id': 3}], '/v2/accounts/42/transactions?after=cursor-2&limit=2'),
+        ]
+
+        client = Client('id-123456789', 'secret-123456789', access_token='accesstoken-123456789')
+        result = list(client.transaction.iter_by_account(42, max_items=3, page_size=2))
+
+        assert [r['id'] for r in result] == [1, 2, 3]
+        assert mocked_get.call_count == 2
+        assert mocked_get.call_args_list[1][1]['params']['limit'] == 1
+        assert (
+            mocked_get.call_args_list[0][0][0] ==
+            'https://sync.bankin.com/v2/accounts/42/transactions'
+        )
+
+    @unittest.mock.patch('requests.Session.get')
+    def test_stops_when_an_empty_page_is_returned(self, mocked_get):
+        mocked_get.side_effect = [_page([], '/v2/banks?after=cursor-1')]
+
+        client = Client('id-123456789', 'secret-123456789')
+        result = list(client.bank.iter())
+
+        assert result == []
+        assert mocked_get.call_count == 1
+
+    def test_cannot_be_used_with_an_invalid_page_size(self):
+        client = Client('id-123456789', 'secret-123456789')
+        with pytest.raises(ValueError):
+            client.transaction.iter(page_size=501)
+
+
+class TestPrefetchingPaginator:
+    @unittest.mock.patch('requests.Session.get')
+    def test_yields_the_same_resources(self, mocked_get):
+        mocked_get.side_effect = [
+            _page([{'id': 1}, {'id': 2}], '/v2/transactions?after=cursor-1&limit=2'),
+            _page([{'id': 3}, {'id': 4}], '/v2/transactions?after=cursor-2&limit=2'),
+            _page([{'id': 5}]),
+        ]
+
+        client = Client('id-123456789', 'secret-123456789', access_token='accesstoken-123456789')
+        result = list(client.transaction.iter(page_size=2, prefetch=2))
+
+        assert [r['id'] for r in result] == [1, 2, 3, 4, 5]
+        assert mocked_get.call_args_list[2][1]['params']['after'] == 'cursor-2'
+
+    @unittest.mock.patch('requests.Session.get')
+    def test_fetches_the_next_page_while_the_current_one_is_processed(self, mocked_get):
+        fetched = threading.Event()
+        responses = [
+            _page([{'id': 1}], '/v2/banks?after=cursor-1'),
+            _page([{'id': 2}]),
+        ]
+
+        def _get(*args, **kwargs):
+            if len(responses) == 1:
+                fetched.set()
+            return responses.pop(0)
+
+        mocked_get.side_effect = _get
+
+        client = Client('id-123456789', 'secret-123456789')
+        iterator = iter(client.bank.iter(prefetch=1))
+
+        assert next(iterator) == {'id': 1}
+        assert fetched.wait(timeout=5)
+        assert list(iterator) == [{'id': 2}]
+
+    @unittest.mock.patch('requests.Session.get')
+    def test_raises_the_errors_of_the_background_requests(self, mocked_get):
+        mocked_response = unittest.mock.Mock(status_code=500, content='')
+        mocked_response.raise_for_status.side_effect = HTTPError()
+        mocked_get.side_effect = [_page([{'id': 1}], '/v2/banks?after=cursor-1'), mocked_response]
+
+        client = Client('id-123456789', 'secret-123456789')
+        iterator = iter(client.bank.iter(prefetch=1))
+
+        assert next(iterator) == {'id': 1}
+        with pytest.raises(TransportError):
+            next(iterator)
+
+    def test_cannot_be_used_with_a_negative_prefetch(self):
+        client = Client('id-123456789', 'secret-123456789')
+        with pytest.raises(ValueError):
+            client.bank.iter(prefetch=-1)
+
+
+def _double_id(resource):
+    return resource['id'] * 2
+
+
+def _get_decoder(resource):
+    return resource['decoder']
+
+
+def _tagging_loads(content):
+    data = json.loads(content)
+    for resource in data['resources']:
+        resource['decoder'] = 'custom'
+    return data
+
+
+def _raw_page(resources, next_uri=None):
+    return unittest.mock.Mock(status_code=200, content=json.dumps({
+        'resources': resources,
+        'pagination': {'previous_uri': None, 'next_uri': next_uri, },
+    }).encode('utf-8'))
+
+
+class TestMapParallel:
+    @unittest.mock.patch('requests.Session.get')
+    def test_yields_the_results_of_the_function_in_order(self, mocked_get):
+        mocked_get.side_effect = [
+            _raw_page([{'id': 1}, {'id': 2}], '/v2/transactions?after=cursor-1&limit=2'),
+            _raw_page([{'id': 3}, {'id': 4}], '/v2/transactions?after=cursor-2&limit=2'),
+            _raw_page([{'id': 5}]),
+        ]
+
+        client = Client('id-123456789', 'secret-123456789', access_token='accesstoken-123456789')
+        result = list(client.transaction.iter(page_size=2).map_parallel(
+            _double_id, processes=2, max_pending=1,
+        ))
+
+        assert result == [2, 4, 6, 8, 10]
+        assert mocked_get.call_count == 3
+        assert mocked_get.call_args_list[1][1]['params']['after'] == 'cursor-1'
+        assert mocked_get.call_args_list[2][1]['params']['after'] == 'cursor-2'
+
+    @unittest.mock.patch('requests.Session.get')
+    def test_can_send_several_pages_per_task(self, mocked_get):
+        mocked_get.side_effect = [
+            _raw_page([{'id': 1}], '/v2/transactions?after=cursor-1'),
+            _raw_page([{'id': 2}], '/v2/transactions?after=cursor-2'),
+            _raw_page([{'id': 3}], '/v2/transactions?after=cursor-3'),
+            _raw_page([]),
+        ]
+
+        client = Client('id-123456789', 'secret-123456789', access_token='accesstoken-123456789')
+        result = list(client.transaction.iter().map_parallel(_double_id, processes=1, chunksize=2))
+
+        assert result == [2, 4, 6]
+        assert mocked_get.call_count == 4
+
+    @unittest.mock.patch('requests.Session.get')
+    def test_decodes_the_pages_using_the_decoder_of_the_client(self, mocked_get):
+        mocked_get.side_effect = [_raw_page([{'id': 1}, {'id': 2}])]
+
+        client = Client(
+            'id-123456789', 'secret-123456789', access_token='accesstoken-123456789',
+            json_decoder=_tagging_loads,
+        )
+        result = list(client.transaction.iter().map_parallel(_get_decoder, processes=1))
+
+        assert result == ['custom', 'custom']
+
+    def test_cannot_be_used_with_max_items(self):
+        client = Client('id-123456789', 'secret-123456789', access_token='accesstoken-123456789')
+        with pytest.raises(ValueError):
+            list(client.transaction.iter(max_items=10).map_parallel(_double_id))
@@ -0,0 +1,55 @@
+import pytest
+
+from bridge.exceptions import RefreshTimeoutError
+from bridge.polling import RefreshPoller
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class TestRefreshPoller:
+    def test_polls_every_item_immediately(self):
+        poller = RefreshPoller([1, 2], clock=FakeClock())
+
+        assert poller.get_delay() == 0
+        assert poller.pop_due() == [1, 2]
+        assert poller.get_delay() is None
+
+    def test_backs_off_until_a_terminal_status_is_reached(self):
+        clock = FakeClock()
+        poller = RefreshPoller([1], min_interval=1, max_interval=3, jitter=False, clock=clock)
+        delays = []
+        for status in ('retrieving-data', 'retrieving-data', 'retrieving-data'):
+            clock.now += poller.get_delay()
+            assert poller.pop_due() == [1]
+            assert not poller.update(1, {'status': status})
+            delays.append(poller.get_delay())
+
+        clock.now += poller.get_delay()
+        poller.pop_due()
+
+        assert delays == [1, 2, 3]
+        assert poller.update(1, {'status': 'finished'})
+        assert poller.get_delay() is None
+
+    def test_randomizes_the_intervals(self):
+        poller = RefreshPoller([1], min_interval=10, clock=FakeClock())
+        poller.pop_due()
+        poller.update(1, {'status': 'retrieving-data'})
+
+        assert 5 <= poller.get_delay() <= 10
+
+    def test_raises_once_the_timeout_is_exceeded(self):
+        clock = FakeClock()
+        poller = RefreshPoller([1], timeout=5, min_interval=10, jitter=False, clock=clock)
+        poller.pop_due()
+        poller.update(1, {'status': 'retrieving-data'})
+
+        with pytest.raises(RefreshTimeoutError) as excinfo:
+            poller.get_delay()
+        assert excinfo.value.pending == {1: {'status': 'retrieving-data'}}
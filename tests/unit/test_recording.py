@@ -0,0 +1,116 @@
+import json
+import time
+import unittest.mock
+from datetime import timedelta
+
+import pytest
+
+from bridge import Client
+from bridge.recording import RecordingTransport, ReplayTransport, get_request_key, scrub_body
+from bridge.transport import Response
+
+
+class FakeTransport:
+    def __init__(self):
+        self.requests = []
+
+    def send(self, method, url, headers=None, params=None, json=None, auth=None, timeout=None):
+        self.requests.append((method, url, params))
+        body = {'url': url, 'after': (params or {}).get('after'), 'n': len(self.requests)}
+        return Response(
+            200, _dumps(body), headers={'Content-Type': 'application/json', 'X-Other': '1'},
+            elapsed=timedelta(seconds=0.05),
+        )
+
+
+def _dumps(data):
+    return json.dumps(data).encode('utf-8')
+
+
+class TestGetRequestKey:
+    def test_ignores_secrets_and_parameters_order(self):
+        assert (
+            get_request_key('get', 'https://sync.bankin.com/v2/banks', {
+                'limit': 2, 'client_secret': 'secret', 'after': 'a',
+            }) ==
+            'GET v2/banks?after=a&limit=2'
+        )
+
+
+class TestScrubBody:
+    def test_scrubs_the_secret_fields(self):
+        body = _dumps({'access_token': 'token-"1"', 'user': {'uuid': 'u1'}, 'password': 'p'})
+
+        assert json.loads(scrub_body(body).decode('utf-8')) == {
+            'access_token': '[scrubbed]', 'user': {'uuid': 'u1'}, 'password': '[scrubbed]',
+        }
+
+    def test_leaves_other_bodies_untouched(self):
+        body = _dumps({'id': 42})
+        assert scrub_body(body) is body
+
+
+class TestRecordReplay:
+    def test_can_replay_recorded_responses(self, tmp_path):
+        path = str(tmp_path / 'archive.bin')
+        with RecordingTransport(FakeTransport(), path) as transport:
+            client = Client('id', 'secret', access_token='token', transport=transport)
+            recorded = [client.bank.get(42), client.bank.get(42), client.bank.list(after='a')]
+
+        with ReplayTransport(path) as transport:
+            client = Client('id', 'secret', access_token='other-token', transport=transport)
+            replayed = [client.bank.get(42), client.bank.get(42), client.bank.list(after='a')]
+            replayed.append(client.bank.get(42))
+
+        assert replayed[:3] == recorded
+        assert replayed[3] == recorded[0]
+        assert [r['n'] for r in replayed] == [1, 2, 3, 1]
+
+    def test_does_not_record_secrets(self, tmp_path):
+        path = str(tmp_path / 'archive.bin')
+        inner = unittest.mock.Mock()
+        inner.send.return_value = Response(200, _dumps({'access_token': 'secret-token'}))
+        with RecordingTransport(inner, path) as transport:
+            client = Client('id-123456789', 'secret-123456789', transport=transport)
+            client.user.authenticate('john@example.com', 'secret-password')
+
+        with open(path + '.idx') as f:
+            index = f.read()
+        assert 'secret-123456789' not in index
+        assert 'secret-password' not in index
+        with ReplayTransport(path) as transport:
+            response = transport.send(
+                'POST', 'https://sync.bankin.com/v2/authenticate',
+                params={'email': 'john@example.com', 'password': 'other-password'},
+            )
+        assert response.json() == {'access_token': '[scrubbed]'}
+
+    def test_only_records_some_headers(self, tmp_path):
+        path = str(tmp_path / 'archive.bin')
+        with RecordingTransport(FakeTransport(), path) as transport:
+            transport.send('GET', 'https://sync.bankin.com/v2/banks/42')
+
+        with ReplayTransport(path) as transport:
+            response = transport.send('GET', 'https://sync.bankin.com/v2/banks/42')
+
+        assert response.headers == {'Content-Type': 'application/json'}
+        assert response.elapsed == timedelta(seconds=0.05)
+
+    def test_can_replay_with_the_recorded_timing(self, tmp_path):
+        path = str(tmp_path / 'archive.bin')
+        with RecordingTransport(FakeTransport(), path) as transport:
+            transport.send('GET', 'https://sync.bankin.com/v2/banks/42')
+
+        with ReplayTransport(path, realtime=True, speed=0.5) as transport:
+            started_at = time.monotonic()
+            transport.send('GET', 'https://sync.bankin.com/v2/banks/42')
+
+        assert time.monotonic() - started_at >= 0.1
+
+    def test_cannot_replay_unknown_requests(self, tmp_path):
+        path = str(tmp_path / 'archive.bin')
+        RecordingTransport(FakeTransport(), path).close()
+
+        with ReplayTransport(path) as transport:
+            with pytest.raises(LookupError):
+                transport.send('GET', 'https://sync.bankin.com/v2/banks/42')
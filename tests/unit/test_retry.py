@@ -0,0 +1,169 @@
+import unittest.mock
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+from requests.exceptions import ConnectionError, HTTPError
+
+from bridge import Client
+from bridge.exceptions import TransportError
+from bridge.retry import RateLimiter, RetryPolicy
+
+
+def _response(status_code, headers=None, data=None):
+    mocked_response = unittest.mock.Mock(
+        status_code=status_code, content='{}', headers=headers or {},
+    )
+    mocked_response.json.return_value = data or {}
+    if status_code >= 400:
+        mocked_response.raise_for_status.side_effect = HTTPError(response=mocked_response)
+    return mocked_response
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestRetryPolicy:
+    def test_only_retries_idempotent_methods_by_default(self):
+        policy = RetryPolicy()
+        assert policy.should_retry('GET', 0, response=_response(503))
+        assert policy.should_retry('DELETE', 0, response=_response(429))
+        assert not policy.should_retry('POST', 0, response=_response(503))
+
+    def test_does_not_retry_more_than_the_maximum_number_of_retries(self):
+        policy = RetryPolicy(max_retries=2)
+        assert policy.should_retry('GET', 1, response=_response(503))
+        assert not policy.should_retry('GET', 2, response=_response(503))
+
+    def test_does_not_retry_client_errors(self):
+        assert not RetryPolicy().should_retry('GET', 0, response=_response(404))
+
+    def test_retries_connection_errors(self):
+        assert RetryPolicy().should_retry('GET', 0, error=ConnectionError())
+
+    def test_uses_an_exponential_backoff(self):
+        policy = RetryPolicy(backoff_factor=1, max_backoff=5, jitter=False)
+        assert [policy.get_delay(i) for i in range(4)] == [1, 2, 4, 5]
+
+    def test_uses_jittered_delays_bounded_by_the_backoff(self):
+        policy = RetryPolicy(backoff_factor=1)
+        assert all(0 <= policy.get_delay(3) <= 8 for _ in range(100))
+
+    def test_honours_retry_after_headers_expressed_in_seconds(self):
+        policy = RetryPolicy()
+        assert policy.get_delay(0, _response(429, headers={'Retry-After': '7'})) == 7
+
+    def test_honours_retry_after_headers_expressed_as_dates(self):
+        retry_date = datetime.now(timezone.utc) + timedelta(seconds=30)
+        headers = {'Retry-After': format_datetime(retry_date, usegmt=True)}
+        delay = RetryPolicy().get_delay(0, _response(503, headers=headers))
+        assert 25 <= delay <= 30
+
+    def test_does_not_retry_earlier_than_requested_by_retry_after_headers(self):
+        policy = RetryPolicy(max_backoff=60)
+        response = _response(429, headers={'Retry-After': '120'})
+        assert not policy.should_retry('GET', 0, response=response)
+        assert policy.get_delay(0, response) == 120
+        assert policy.should_retry('GET', 0, response=_response(429, headers={'Retry-After': '60'}))
+
+    def test_ignores_invalid_retry_after_headers(self):
+        policy = RetryPolicy(backoff_factor=1, jitter=False)
+        assert policy.get_delay(1, _response(503, headers={'Retry-After': 'soon'})) == 2
+
+
+class TestRateLimiter:
+    def test_allows_bursts_then_spreads_requests(self):
+        clock = FakeClock()
+        limiter = RateLimiter(2, burst=2, clock=clock)
+        assert limiter.reserve() == 0
+        assert limiter.reserve() == 0
+        assert limiter.reserve() == pytest.approx(0.5)
+        assert limiter.reserve() == pytest.approx(1)
+        clock.now += 10
+        assert limiter.reserve() == 0
+
+    def test_can_be_paused(self):
+        clock = FakeClock()
+        limiter = RateLimiter(100, clock=clock)
+        limiter.pause(3)
+        assert limiter.reserve() == pytest.approx(3)
+        clock.now += 3
+        assert limiter.reserve() == 0
+
+    def test_cannot_be_created_with_an_invalid_rate(self):
+        with pytest.raises(ValueError):
+            RateLimiter(0)
+
+
+class TestClientRetries:
+    @unittest.mock.patch('bridge.retry.time.sleep')
+    @unittest.mock.patch('requests.Session.get')
+    def test_retries_throttled_requests(self, mocked_get, mocked_sleep):
+        mocked_get.side_effect = [
+            _response(429, headers={'Retry-After': '2'}),
+            _response(200, data={'id': '42'}),
+        ]
+        client = Client('id-123456789', 'secret-123456789', retry=RetryPolicy())
+
+        assert client.item.get(42) == {'id': '42'}
+        assert mocked_get.call_count == 2
+        mocked_sleep.assert_called_once_with(2)
+
+    @unittest.mock.patch('bridge.retry.time.sleep')
+    @unittest.mock.patch('requests.Session.get')
+    def test_gives_up_when_retry_after_exceeds_the_maximum_backoff(self, mocked_get, mocked_sleep):
+        mocked_get.side_effect = [_response(429, headers={'Retry-After': '3600'})]
+        client = Client('id-123456789', 'secret-123456789', retry=RetryPolicy(max_backoff=60))
+
+        with pytest.raises(TransportError):
+            client.item.get(42)
+        assert mocked_get.call_count == 1
+        assert not mocked_sleep.called
+
+    @unittest.mock.patch('bridge.retry.time.sleep')
+    @unittest.mock.patch('requests.Session.get')
+    def test_retries_connection_errors(self, mocked_get, mocked_sleep):
+        mocked_get.side_effect = [ConnectionError(), _response(200, data={'id': '42'})]
+        client = Client('id-123456789', 'secret-123456789', retry=RetryPolicy())
+
+        assert client.item.get(42) == {'id': '42'}
+
+    @unittest.mock.patch('bridge.retry.time.sleep')
+    @unittest.mock.patch('requests.Session.get')
+    def test_raises_a_transport_error_once_retries_are_exhausted(self, mocked_get, mocked_sleep):
+        mocked_get.return_value = _response(503)
+        client = Client('id-123456789', 'secret-123456789', retry=RetryPolicy(max_retries=2))
+
+        with pytest.raises(TransportError):
+            client.item.get(42)
+        assert mocked_get.call_count == 3
+
+    @unittest.mock.patch('requests.Session.post')
+    def test_does_not_retry_non_idempotent_requests(self, mocked_post):
+        mocked_post.return_value = _response(503)
+        client = Client('id-123456789', 'secret-123456789', retry=RetryPolicy())
+
+        with pytest.raises(TransportError):
+            client.item.send_mfa(42, 'otp')
+        assert mocked_post.call_count == 1
+
+    @unittest.mock.patch('bridge.retry.time.sleep')
+    @unittest.mock.patch('requests.Session.get')
+    def test_pauses_the_rate_limiter_when_throttled(self, mocked_get, mocked_sleep):
+        mocked_get.side_effect = [
+            _response(429, headers={'Retry-After': '2'}),
+            _response(200),
+        ]
+        rate_limiter = RateLimiter(100)
+        client = Client(
+            'id-123456789', 'secret-123456789', retry=RetryPolicy(), rate_limiter=rate_limiter,
+        )
+
+        with unittest.mock.patch.object(rate_limiter, 'pause') as mocked_pause:
+            client.item.get(42)
+        mocked_pause.assert_called_once_with(2)
@@ -0,0 +1,122 @@
+import json
+import unittest.mock
+
+import pytest
+from requests.exceptions import HTTPError
+
+from bridge import Client
+from bridge.exceptions import TransportError
+from bridge.serialization import StreamingPage, get_json_loads
+
+
+BODY = json.dumps({
+    'resources': [
+        {'id': 1, 'description': 'Café', 'amount': -12.5},
+        {'id': 2, 'description': 'Loyer', 'amount': -1234567},
+    ],
+    'pagination': {'previous_uri': None, 'next_uri': None, },
+}, ensure_ascii=False).encode('utf-8')
+
+
+def _chunks(body, size):
+    return [body[i:i + size] for i in range(0, len(body), size)]
+
+
+def _streamed_page(resources, next_uri=None, chunk_size=7):
+    body = json.dumps({
+        'resources': resources,
+        'pagination': {'previous_uri': None, 'next_uri': next_uri, },
+    }).encode('utf-8')
+    mocked_response = unittest.mock.Mock(status_code=200)
+    mocked_response.iter_content.return_value = iter(_chunks(body, chunk_size))
+    return mocked_response
+
+
+class TestGetJsonLoads:
+    def test_can_return_the_standard_library_decoder(self):
+        assert get_json_loads('json') is json.loads
+
+    def test_can_return_the_orjson_decoder(self):
+        orjson = pytest.importorskip('orjson')
+        assert get_json_loads('orjson') is orjson.loads
+        assert get_json_loads('auto') is orjson.loads
+
+    def test_can_return_a_custom_decoder(self):
+        loads = unittest.mock.Mock()
+        assert get_json_loads(loads) is loads
+        assert get_json_loads(None) is None
+
+    def test_cannot_return_an_unknown_decoder(self):
+        with pytest.raises(ValueError):
+            get_json_loads('unknown')
+
+
+class TestStreamingPage:
+    @pytest.mark.parametrize('chunk_size', [1, 2, 3, 5, 16, 1024])
+    def test_yields_the_resources_regardless_of_the_chunk_boundaries(self, chunk_size):
+        page = StreamingPage(_chunks(BODY, chunk_size))
+
+        assert list(page) == json.loads(BODY.decode('utf-8'))['resources']
+        assert page.data == {'pagination': {'previous_uri': None, 'next_uri': None, }, }
+
+    def test_yields_resources_before_the_whole_body_is_received(self):
+        chunks = iter(_chunks(BODY, 4))
+        page = iter(StreamingPage(chunks))
+
+        assert next(page)['id'] == 1
+        assert list(chunks)
+
+    def test_can_parse_members_preceding_the_resources(self):
+        page = StreamingPage([b' { "pagination": {"next_uri": null} , "resources" : [ ] } '])
+
+        assert list(page) == []
+        assert page.data == {'pagination': {'next_uri': None, }, }
+
+    def test_cannot_parse_a_truncated_body(self):
+        with pytest.raises(ValueError):
+            list(StreamingPage(_chunks(BODY[:-10], 5)))
+
+
+class TestClientDecoding:
+    @unittest.mock.patch('requests.Session.get')
+    def test_can_use_a_custom_json_decoder(self, mocked_get):
+        mocked_get.return_value = unittest.mock.Mock(status_code=200, content=b'{"id": 42}')
+
+        client = Client('id-123456789', 'secret-123456789', json_decoder='json')
+
+        assert client.bank.get(42) == {'id': 42, }
+        assert not mocked_get.return_value.json.called
+
+    @unittest.mock.patch('requests.Session.get')
+    def test_can_stream_paginated_resources(self, mocked_get):
+        mocked_get.side_effect = [
+            _streamed_page([{'id': 1}, {'id': 2}], '/v2/transactions?after=cursor-1&limit=2'),
+            _streamed_page([{'id': 3}]),
+        ]
+
+        client = Client('id-123456789', 'secret-123456789', access_token='accesstoken-123456789')
+        result = list(client.transaction.iter(page_size=2).stream())
+
+        assert [r['id'] for r in result] == [1, 2, 3]
+        assert mocked_get.call_args_list[0][1]['stream'] is True
+        assert mocked_get.call_args_list[1][1]['params']['after'] == 'cursor-1'
+
+    @unittest.mock.patch('requests.Session.get')
+    def test_can_stream_models(self, mocked_get):
+        mocked_get.return_value = _streamed_page([{'id': 1, 'amount': 10.5}])
+
+        client = Client('id-123456789', 'secret-123456789', models=True)
+        result = list(client.transaction.iter().stream())
+
+        assert str(result[0].amount) == '10.5'
+
+    @unittest.mock.patch('requests.Session.get')
+    def test_raises_on_unsuccessful_streamed_responses(self, mocked_get):
+        mocked_response = unittest.mock.Mock(status_code=500, content=b'')
+        mocked_response.raise_for_status.side_effect = HTTPError()
+        mocked_get.return_value = mocked_response
+
+        client = Client('id-123456789', 'secret-123456789')
+
+        with pytest.raises(TransportError):
+            list(client.transaction.iter().stream())
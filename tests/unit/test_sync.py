@@ -0,0 +1,156 @@
+import datetime as dt
+import threading
+import time
+import unittest.mock
+from urllib.parse import urlparse
+
+import pytest
+
+from bridge import Client
+from bridge.checkpoints import MemoryCheckpointStore
+from bridge.sync import IncrementalSync, sync_user_transactions
+
+
+def _page(resources, next_uri=None):
+    mocked_response = unittest.mock.Mock(status_code=200, content='{}')
+    mocked_response.json.return_value = {
+        'resources': resources,
+        'pagination': {'previous_uri': None, 'next_uri': next_uri, },
+    }
+    return mocked_response
+
+
+class TestSyncUserTransactions:
+    @unittest.mock.patch('requests.Session.get')
+    def test_merges_the_transactions_of_all_the_accounts_by_date(self, mocked_get):
+        pages = {
+            ('/v2/accounts', None): _page([{'id': 1}, {'id': 2}]),
+            ('/v2/accounts/1/transactions', None): _page(
+                [{'id': 11, 'date': '2019-03-01'}, {'id': 12, 'date': '2019-01-01'}],
+                '/v2/accounts/1/transactions?after=cursor-1',
+            ),
+            ('/v2/accounts/1/transactions', 'cursor-1'): _page([{'id': 13, 'date': '2018-12-01'}]),
+            ('/v2/accounts/2/transactions', None): _page(
+                [{'id': 21, 'date': '2019-02-01'}, {'id': 22, 'date': '2018-12-15'}],
+            ),
+        }
+        mocked_get.side_effect = lambda url, **kwargs: pages[
+            (urlparse(url).path, kwargs['params'].get('after'))
+        ]
+
+        client = Client('id-123456789', 'secret-123456789', access_token='accesstoken-123456789')
+        result = list(sync_user_transactions(client, max_workers=4))
+
+        assert [t['id'] for t in result] == [11, 21, 12, 22, 13]
+
+    @unittest.mock.patch('requests.Session.get')
+    def test_fetches_the_accounts_concurrently(self, mocked_get):
+        barrier = threading.Barrier(3, timeout=5)
+
+        def get(url, **kwargs):
+            barrier.wait()
+            return _page([{'id': urlparse(url).path, 'date': '2019-01-01'}])
+
+        mocked_get.side_effect = get
+
+        client = Client('id-123456789', 'secret-123456789', access_token='accesstoken-123456789')
+        start = time.monotonic()
+        result = list(sync_user_transactions(client, accounts=[1, 2, 3], max_workers=3))
+
+        assert len(result) == 3
+        assert time.monotonic() - start < 5
+
+    @unittest.mock.patch('requests.Session.get')
+    def test_stops_fetching_pages_when_the_consumer_stops_early(self, mocked_get):
+        released = threading.Event()
+
+        def get(url, **kwargs):
+            account_id = urlparse(url).path.split('/')[3]
+            if kwargs['params'].get('after') is None:
+                return _page(
+                    [{'id': account_id, 'date': '2019-01-0' + account_id}],
+                    '/v2/accounts/{}/transactions?after=cursor-1'.format(account_id),
+                )
+            released.wait(5)
+            return _page([])
+
+        mocked_get.side_effect = get
+
+        client = Client('id-123456789', 'secret-123456789', access_token='accesstoken-123456789')
+        transactions = sync_user_transactions(client, accounts=[1, 2, 3], max_workers=1)
+        assert next(transactions)['id'] == '3'
+        transactions.close()
+        released.set()
+        time.sleep(0.1)
+
+        # The first pages and the second page being fetched when the consumer stopped.
+        assert mocked_get.call_count == 4
+
+    @unittest.mock.patch('requests.Session.get')
+    def test_forwards_the_date_range(self, mocked_get):
+        mocked_get.return_value = _page([])
+
+        client = Client('id-123456789', 'secret-123456789', access_token='accesstoken-123456789')
+        list(sync_user_transactions(
+            client, accounts=[{'id': 42}], since=dt.date(2019, 1, 1),
+        ))
+
+        assert mocked_get.call_args[0][0] == 'https://sync.bankin.com/v2/accounts/42/transactions'
+        assert mocked_get.call_args[1]['params']['since'] == '2019-01-01'
+
+
+class TestIncrementalSync:
+    @unittest.mock.patch('requests.Session.get')
+    def test_stores_the_most_recent_update_date_as_the_next_watermark(self, mocked_get):
+        mocked_get.side_effect = [
+            _page(
+                [{'id': 1, 'updated_at': '2019-01-02T00:00:00Z'}],
+                '/v2/transactions/updated?after=cursor-1',
+            ),
+            _page([{'id': 2, 'updated_at': '2019-01-01T00:00:00Z'}]),
+            _page([]),
+        ]
+        client = Client('id-123456789', 'secret-123456789', access_token='accesstoken-123456789')
+        store = MemoryCheckpointStore()
+        sync = IncrementalSync(client, store, 'user-1')
+
+        assert [t['id'] for t in sync.transactions()] == [1, 2]
+        assert store.get('user-1:transactions:*') == {
+            'since': '2019-01-02T00:00:00Z', 'after': None,
+        }
+        assert list(sync.transactions()) == []
+        assert mocked_get.call_args[0][0] == 'https://sync.bankin.com/v2/transactions/updated'
+        assert mocked_get.call_args[1]['params']['since'] == '2019-01-02T00:00:00Z'
+
+    @unittest.mock.patch('requests.Session.get')
+    def test_resumes_an_interrupted_synchronization(self, mocked_get):
+        mocked_get.side_effect = [
+            _page(
+                [{'id': 1, 'updated_at': '2019-01-02T00:00:00Z'}],
+                '/v2/accounts/42/transactions/updated?after=cursor-1',
+            ),
+            Exception('boom'),
+            _page([{'id': 2, 'updated_at': '2019-01-01T00:00:00Z'}]),
+        ]
+        client = Client('id-123456789', 'secret-123456789', access_token='accesstoken-123456789')
+        store = MemoryCheckpointStore()
+        store.set('user-1:transactions:42', {'since': '2018-12-01T00:00:00Z', 'after': None})
+        sync = IncrementalSync(client, store, 'user-1')
+
+        with pytest.raises(Exception):
+            list(sync.transactions(42))
+        assert store.get('user-1:transactions:42')['after'] == 'cursor-1'
+
+        assert [t['id'] for t in sync.transactions(42)] == [2]
+        assert mocked_get.call_args[1]['params']['after'] == 'cursor-1'
+        assert mocked_get.call_args[1]['params']['since'] == '2018-12-01T00:00:00Z'
+        assert store.get('user-1:transactions:42') == {
+            'since': '2019-01-02T00:00:00Z', 'after': None,
+        }
+
+    def test_can_reset_a_checkpoint(self):
+        client = Client('id-123456789', 'secret-123456789')
+        store = MemoryCheckpointStore()
+        store.set('user-1:stocks:*', {'since': '2019-01-01', 'after': None})
+        IncrementalSync(client, store, 'user-1').reset('stocks')
+        assert store.get('user-1:stocks:*') is None
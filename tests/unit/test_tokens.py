@@ -0,0 +1,126 @@
+import json
+import threading
+import time
+import unittest.mock
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from bridge import Client
+from bridge.exceptions import TransportError
+from bridge.tokens import FileTokenStore, MemoryTokenStore, TokenManager
+from bridge.transport import Response
+
+
+class FakeAuthTransport:
+    """ Issues a new token on every authentication and rejects the revoked tokens. """
+
+    def __init__(self, expires_at='2099-01-01T00:00:00.000Z', latency=0):
+        self.expires_at = expires_at
+        self.latency = latency
+        self.authentications = 0
+        self.revoked = set()
+        self.tokens = []
+        self._lock = threading.Lock()
+
+    def send(self, method, url, headers=None, params=None, json=None, auth=None, timeout=None):
+        if url.endswith('authenticate'):
+            time.sleep(self.latency)
+            with self._lock:
+                self.authentications += 1
+                token = 'token-{}'.format(self.authentications)
+            return _response({'access_token': token, 'expires_at': self.expires_at, })
+        self.tokens.append(auth._access_token)
+        if auth._access_token in self.revoked:
+            return _response({'type': 'invalid_token', }, status_code=401)
+        return _response({'id': 1, })
+
+
+def _response(data, status_code=200):
+    return Response(status_code, json.dumps(data).encode('utf-8'))
+
+
+class TestTokenManager:
+    def test_caches_tokens_until_they_expire(self):
+        transport = FakeAuthTransport(expires_at='2019-04-02T12:00:00.000Z')
+        now = [1554206400 - 3600]  # 2019-04-02T11:00:00Z
+        manager = TokenManager(
+            Client('id', 'secret', transport=transport), refresh_margin=60, clock=lambda: now[0],
+        )
+
+        assert manager.get_token(1, 'a@example.com', 'pwd') == 'token-1'
+        assert manager.get_token(1, 'a@example.com', 'pwd') == 'token-1'
+        now[0] += 3600 - 30  # within the refresh margin
+        assert manager.get_token(1, 'a@example.com', 'pwd') == 'token-2'
+        assert manager.authentications == 2
+
+    def test_deduplicates_concurrent_authentications_of_a_user(self):
+        transport = FakeAuthTransport(latency=0.05)
+        manager = TokenManager(Client('id', 'secret', transport=transport))
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            tokens = list(executor.map(
+                lambda i: manager.get_token(i % 2, 'a@example.com', 'pwd'), range(8),
+            ))
+
+        assert transport.authentications == 2
+        assert len(set(tokens)) == 2
+
+    def test_invalidation_keeps_tokens_obtained_in_the_meantime(self):
+        manager = TokenManager(Client('id', 'secret', transport=FakeAuthTransport()))
+        manager.get_token(1, 'a@example.com', 'pwd')
+
+        manager.invalidate(1, 'token-0')
+        assert manager.store.get('1')['access_token'] == 'token-1'
+        manager.invalidate(1, 'token-1')
+        assert manager.store.get('1') is None
+
+    def test_uses_the_token_store(self):
+        store = MemoryTokenStore()
+        store.set('1', {'access_token': 'stored', 'expires_at': time.time() + 3600, })
+        transport = FakeAuthTransport()
+        manager = TokenManager(Client('id', 'secret', transport=transport), store=store)
+
+        assert manager.get_token(1, 'a@example.com', 'pwd') == 'stored'
+        assert transport.authentications == 0
+
+
+class TestManagedTokenAuth:
+    def test_authenticates_again_and_retries_once_on_401_responses(self):
+        transport = FakeAuthTransport()
+        manager = TokenManager(Client('id', 'secret', transport=transport))
+        client = manager.as_user(1, 'a@example.com', 'pwd')
+        transport.revoked.add('token-1')
+
+        assert client.bank.get(1) == {'id': 1, }
+        assert transport.tokens == ['token-1', 'token-2']
+
+    def test_raises_when_the_renewed_token_is_rejected(self):
+        transport = FakeAuthTransport()
+        manager = TokenManager(Client('id', 'secret', transport=transport))
+        client = manager.as_user(1, 'a@example.com', 'pwd')
+        transport.revoked.update(('token-1', 'token-2', ))
+
+        with pytest.raises(TransportError) as excinfo:
+            client.bank.get(1)
+        assert excinfo.value.response.status_code == 401
+        assert transport.tokens == ['token-1', 'token-2']
+
+
+class TestFileTokenStore:
+    def test_persists_the_tokens(self, tmpdir):
+        path = str(tmpdir.join('tokens'))
+        FileTokenStore(path).set('1', {'access_token': 'token', 'expires_at': 1, })
+
+        assert FileTokenStore(path).get('1') == {'access_token': 'token', 'expires_at': 1, }
+
+    def test_can_encrypt_the_tokens(self, tmpdir):
+        path = str(tmpdir.join('tokens'))
+        encrypt = unittest.mock.Mock(side_effect=lambda content: content[::-1])
+        decrypt = unittest.mock.Mock(side_effect=lambda content: content[::-1])
+        FileTokenStore(path, encrypt=encrypt).set('1', {'access_token': 'token', })
+
+        with open(path, 'rb') as f:
+            assert b'"token"' not in f.read()
+        assert FileTokenStore(path, decrypt=decrypt).get('1') == {'access_token': 'token', }
+        assert decrypt.call_count == 1
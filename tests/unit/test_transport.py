@@ -0,0 +1,56 @@
+import requests
+from requests.adapters import HTTPAdapter
+
+from bridge import Client
+from bridge.transport import PreparedRequestsTransport, RequestsTransport
+
+
+class RecordingAdapter(HTTPAdapter):
+    def __init__(self):
+        super().__init__()
+        self.requests = []
+
+    def send(self, request, **kwargs):
+        self.requests.append((request.method, request.url, dict(request.headers), request.body))
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b'{"id": 1}'
+        response.request = request
+        response.url = request.url
+        return response
+
+
+def _build_client(transport_class):
+    adapter = RecordingAdapter()
+    session = requests.Session()
+    session.mount('https://sync.bankin.com/v2/', adapter)
+    return Client('id', 'secret', access_token='token', transport=transport_class(session)), adapter
+
+
+def _send_requests(client):
+    client.bank.get(1)
+    client.bank.get(2)
+    client.transaction.list(limit=2)
+    client.user.authenticate('test@example.com', 'pwd')
+    client.as_user('other-token').item.get(42)
+
+
+class TestPreparedRequestsTransport:
+    def test_sends_the_same_requests_as_the_requests_transport(self):
+        client, adapter = _build_client(RequestsTransport)
+        prepared_client, prepared_adapter = _build_client(PreparedRequestsTransport)
+
+        _send_requests(client)
+        _send_requests(prepared_client)
+
+        assert prepared_adapter.requests == adapter.requests
+        assert len(prepared_client.transport._templates) == 2
+
+    def test_falls_back_to_the_session_when_it_holds_cookies(self):
+        client, adapter = _build_client(PreparedRequestsTransport)
+        client.session.cookies.set('name', 'value')
+
+        client.bank.get(1)
+
+        assert adapter.requests[0][2]['Cookie'] == 'name=value'
+        assert client.transport._templates == {}
@@ -0,0 +1,45 @@
+import os
+from urllib.parse import urljoin
+
+from bridge.utils import get_endpoint_template, join_url, write_atomically
+
+
+class TestGetEndpointTemplate:
+    def test_replaces_identifiers_by_placeholders(self):
+        assert get_endpoint_template('accounts/42/transactions') == 'accounts/{id}/transactions'
+        assert get_endpoint_template('items/42/refresh/status') == 'items/{id}/refresh/status'
+        assert (
+            get_endpoint_template('users/c3b140ad-aa85-49ca-a254-de77de521bbf/password') ==
+            'users/{id}/password'
+        )
+
+    def test_keeps_paths_without_identifiers_unchanged(self):
+        assert get_endpoint_template('/transactions/updated/') == 'transactions/updated'
+
+
+class TestJoinUrl:
+    def test_gives_the_same_results_as_urljoin(self):
+        for base_url in ('https://sync.bankin.com/v2/', 'https://sync.bankin.com/v2', 'http://h'):
+            for path in (
+                'accounts/42', 'items/add/url/', '', '/v3/banks', '../banks', './banks',
+                'https://other.com/banks', 'banks?limit=2',
+            ):
+                assert join_url(base_url, path) == urljoin(base_url, path).strip('/')
+
+
+class TestWriteAtomically:
+    def test_replaces_the_content_of_the_file(self, tmpdir):
+        path = tmpdir.join('data.json')
+        path.write('{"old": true}')
+
+        write_atomically(str(path), b'{"new": true}', mode=0o600)
+
+        assert path.read() == '{"new": true}'
+        assert tmpdir.listdir() == [path]
+
+    def test_creates_the_file_with_the_given_permissions(self, tmpdir):
+        path = tmpdir.join('data.json')
+
+        write_atomically(str(path), b'{}', mode=0o600)
+
+        assert os.stat(str(path)).st_mode & 0o777 == 0o600